@@ -0,0 +1,159 @@
+"""
+Measure django-upgrade's startup cost, which is paid on every run, such as
+in each pre-commit hook invocation.
+
+Run with the package installed in the current environment:
+
+    python benchmarks/startup.py
+
+This measures, taking the fastest of several runs, each in a fresh
+interpreter:
+
+* import_main_us: the cumulative time to import django_upgrade.main, from
+  -X importtime.
+* noop_run_ms: the wall time for running django-upgrade on one file that
+  needs no changes, including interpreter startup.
+
+It then compares them against the baselines in baselines.json, exiting with
+an error if any exceeds its baseline by more than the tolerance. It also
+reports the import time of each fixer module, slowest first, so slow imports
+are easy to find.
+
+Baselines depend on the machine, so record new ones with --update when
+changing machines, or after deliberate changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+importtime_re = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| \s*(?P<module>\S+)$"
+)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Number of runs to take the fastest of. Default: 10.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed fraction above each baseline. Default: 0.25.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of fixer modules to report. Default: 10.",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Record the measurements as the new baselines.",
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "import_main_us": min(
+            import_times("import django_upgrade.main")["django_upgrade.main"][1]
+            for _ in range(args.runs)
+        ),
+        "noop_run_ms": min(noop_run_ms() for _ in range(args.runs)),
+    }
+
+    fixer_times = import_times(
+        "from django_upgrade.data import import_all_fixers; import_all_fixers()"
+    )
+    # Sort by self time, as cumulative times include shared modules that the
+    # first fixer to be imported happens to import.
+    fixer_rows = sorted(
+        (
+            (self_us, cumulative_us, module)
+            for module, (self_us, cumulative_us) in fixer_times.items()
+            if module.startswith("django_upgrade.fixers.")
+        ),
+        reverse=True,
+    )
+    print(f"Slowest fixer imports (of {len(fixer_rows)}):")
+    print(f"  {'self [us]':>10}  {'cumulative':>10}  module")
+    for self_us, cumulative_us, module in fixer_rows[: args.top]:
+        print(f"  {self_us:>10}  {cumulative_us:>10}  {module}")
+    print()
+
+    if args.update:
+        with open(BASELINES_PATH, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+        for name, value in results.items():
+            print(f"{name}: {value}")
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    with open(BASELINES_PATH) as fp:
+        baselines = json.load(fp)
+
+    ret = 0
+    for name, value in results.items():
+        baseline = baselines[name]
+        budget = baseline * (1 + args.tolerance)
+        status = "ok" if value <= budget else "OVER BUDGET"
+        print(f"{name}: {value} (baseline {baseline}, budget {budget:.0f}) {status}")
+        if value > budget:
+            ret = 1
+    return ret
+
+
+def import_times(code: str) -> dict[str, tuple[int, int]]:
+    """
+    Run the code in a fresh interpreter with -X importtime, and return the
+    self and cumulative import times of each module in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> dict[str, tuple[int, int]]:
+    times = {}
+    for line in output.splitlines():
+        match = importtime_re.match(line)
+        if match is not None:
+            times[match["module"]] = (int(match["self"]), int(match["cumulative"]))
+    return times
+
+
+def noop_run_ms() -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "example.py")
+        with open(path, "w") as fp:
+            fp.write("x = 1\n")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "django_upgrade", "--no-cache", path],
+            check=True,
+        )
+        return round((time.perf_counter() - start) * 1000)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Compare applying callbacks that insert tokens to a list and to a GapBuffer,
+to find where the GapBuffer starts to pay off.
+
+Run with the package installed in the current environment:
+
+    python benchmarks/tokens.py
+
+The model is generated with one NullBooleanField per field, each of which
+null_boolean_field rewrites by inserting a null=True argument. Each size
+reports the fastest of several runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Sequence
+from unittest import mock
+
+from tokenize_rt import src_to_tokens
+
+from django_upgrade.ast import ast_parse
+from django_upgrade.data import Settings, visit
+from django_upgrade.main import apply_callbacks
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--fields",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 3000, 10000],
+        help="Numbers of fields in the generated model. Default: 100 1000 3000 10000.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of runs to take the fastest of. Default: 5.",
+    )
+    args = parser.parse_args(argv)
+
+    settings = Settings(target_version=(3, 1), only_fixers={"null_boolean_field"})
+    for fields in args.fields:
+        source = (
+            "from django.db import models\n\nclass Book(models.Model):\n"
+            + "".join(
+                f"    field_{i} = models.NullBooleanField(default=True)\n"
+                for i in range(fields)
+            )
+        )
+        callbacks = visit(ast_parse(source), settings, "models.py")
+        tokens = src_to_tokens(source)
+        timings = {}
+        for name, threshold in (("list", float("inf")), ("gap buffer", 0)):
+            best = float("inf")
+            with mock.patch("django_upgrade.main.GAP_BUFFER_THRESHOLD", threshold):
+                for _ in range(args.runs):
+                    run_tokens = list(tokens)
+                    start = time.perf_counter()
+                    apply_callbacks(run_tokens, callbacks)
+                    best = min(best, time.perf_counter() - start)
+            timings[name] = f"{best * 1000:.1f} ms"
+        print(
+            f"{fields} fields, {len(tokens)} tokens: "
+            + ", ".join(f"{name} {timing}" for name, timing in timings.items())
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Measure the time visit() takes to walk a large module and collect fixers'
+callbacks, which is most of the cost of checking a file that needs few or no
+changes.
+
+Run with the package installed in the current environment:
+
+    python benchmarks/visit.py
+
+The module is generated, mixing settings, models, views, and tests, so
+every fixer has something to look at. Each configuration reports the fastest
+of several runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import time
+from collections.abc import Sequence
+
+from django_upgrade.data import Settings, visit
+
+SECTION = """
+from django.conf import settings
+from django.db import models
+from django.http import HttpResponse
+from django.test import TestCase
+
+DATABASES_{i} = {{
+    "default": {{
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": "db_{i}",
+        "OPTIONS": {{"options": {{"timeout": [1, 2, 3, {i}]}}}},
+    }},
+}}
+
+
+class Book{i}(models.Model):
+    title = models.CharField(max_length=100)
+    author = models.ForeignKey("Author", on_delete=models.CASCADE)
+    pages = models.IntegerField(default={i} * 2 + 1)
+
+    def __str__(self):
+        return f"{{self.title}} ({{self.pages}})"
+
+
+def view_{i}(request, pk):
+    book = Book{i}.objects.filter(pk=pk, pages__gt={i}).first()
+    if book is not None and book.pages > 10 or request.user.is_staff:
+        data = [x * 2 for x in range(book.pages) if x % 3 == 0]
+        return HttpResponse(str(sum(data)), status=200)
+    return HttpResponse("missing", status=404)
+
+
+class Book{i}Tests(TestCase):
+    def test_view(self):
+        response = self.client.get("/books/{i}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("title", response.content.decode())
+"""
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sections",
+        type=int,
+        default=200,
+        help="Number of generated sections in the module. Default: 200.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Number of runs to take the fastest of. Default: 10.",
+    )
+    args = parser.parse_args(argv)
+
+    source = "".join(SECTION.format(i=i) for i in range(args.sections))
+    tree = ast.parse(source)
+    print(
+        f"Module: {len(source.splitlines())} lines, {len(list(ast.walk(tree)))} nodes"
+    )
+
+    configurations = {
+        "all fixers": Settings(target_version=(6, 1)),
+        "one fixer": Settings(target_version=(6, 1), only_fixers={"request_headers"}),
+        "import fixer": Settings(
+            target_version=(6, 1), only_fixers={"compatibility_imports"}
+        ),
+    }
+    for name, settings in configurations.items():
+        # Warm up, importing fixers and building dispatch tables.
+        visit(tree, settings, "example.py")
+        best = float("inf")
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            visit(tree, settings, "example.py")
+            best = min(best, time.perf_counter() - start)
+        print(f"{name}: {best * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
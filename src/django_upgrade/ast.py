@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import ast
+import re
 import warnings
-from typing import TYPE_CHECKING, Literal, cast
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from functools import cache
+from typing import TYPE_CHECKING, Literal, cast, overload
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset
@@ -11,54 +15,228 @@ if TYPE_CHECKING:
     from django_upgrade.data import State
 
 
-_module_names: WeakKeyDictionary[ast.Module, frozenset[str]] = WeakKeyDictionary()
+class Parents(Sequence[ast.AST]):
+    """
+    The ancestors of a node, from the module down to its direct parent.
 
+    This is a persistent linked list, so each node's parents share the chain
+    of its parent's parents rather than copying it. Indexing the first item
+    or items near the end, and len(), take constant time.
+    """
 
-def get_module_names(module: ast.Module) -> frozenset[str]:
+    __slots__ = ("_last", "_up", "_first", "_len")
+
+    _last: ast.AST
+    _up: Parents
+    _first: ast.AST
+
+    def __init__(self) -> None:
+        self._len = 0
+
+    def push(self, node: ast.AST) -> Parents:
+        """
+        Return the parents of a child of node, whose parents are these.
+        """
+        pushed = Parents.__new__(Parents)
+        pushed._last = node
+        pushed._up = self
+        pushed._first = self._first if self._len else node
+        pushed._len = self._len + 1
+        return pushed
+
+    def __len__(self) -> int:
+        return self._len
+
+    @overload
+    def __getitem__(self, index: int) -> ast.AST: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> tuple[ast.AST, ...]: ...
+
+    def __getitem__(self, index: int | slice) -> ast.AST | tuple[ast.AST, ...]:
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("Parents index out of range")
+        if index == 0:
+            return self._first
+        parents = self
+        for _ in range(self._len - 1 - index):
+            parents = parents._up
+        return parents._last
+
+    def __iter__(self) -> Iterator[ast.AST]:
+        return reversed(tuple(reversed(self)))
+
+    def __reversed__(self) -> Iterator[ast.AST]:
+        parents = self
+        while parents._len:
+            yield parents._last
+            parents = parents._up
+
+    def __repr__(self) -> str:
+        return f"Parents({tuple(self)!r})"
+
+
+class ModuleFacts:
+    """
+    Facts about a module that fixers need beyond the node they are visiting,
+    collected in one walk and shared between fixers:
+
+    * names: every name bound or used in the module.
+    * name_usages: Name nodes by their id, with their parents.
+    * calls: calls of plain names by the called name, with their parents.
+    """
+
+    __slots__ = ("names", "name_usages", "calls")
+
+    def __init__(self, module: ast.Module) -> None:
+        names: set[str] = set()
+        name_usages: defaultdict[str, list[tuple[ast.Name, Parents]]] = defaultdict(
+            list
+        )
+        calls: defaultdict[str, list[tuple[ast.Call, Parents]]] = defaultdict(list)
+
+        nodes: list[tuple[ast.AST, Parents]] = [(module, Parents())]
+        while nodes:
+            node, parents = nodes.pop()
+
+            if isinstance(node, ast.Name):
+                names.add(node.id)
+                name_usages[node.id].append((node, parents))
+            elif isinstance(node, ast.Call):
+                if isinstance(node.func, ast.Name):
+                    calls[node.func.id].append((node, parents))
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname is not None:
+                        names.add(alias.asname)
+                    else:
+                        names.add(alias.name.partition(".")[0])
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    names.add(alias.asname if alias.asname is not None else alias.name)
+            elif isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            ):
+                names.add(node.name)
+            elif isinstance(node, ast.arg):
+                names.add(node.arg)
+            elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+                if node.name is not None:
+                    names.add(node.name)
+            elif isinstance(node, ast.MatchMapping) and node.rest is not None:
+                names.add(node.rest)
+
+            subparents = parents.push(node)
+            for child in ast.iter_child_nodes(node):
+                nodes.append((child, subparents))
+
+        self.names = frozenset(names)
+        self.name_usages = dict(name_usages)
+        self.calls = dict(calls)
+
+
+_module_facts: WeakKeyDictionary[ast.Module, ModuleFacts] = WeakKeyDictionary()
+
+
+def get_module_facts(module: ast.Module) -> ModuleFacts:
     try:
-        return _module_names[module]
+        return _module_facts[module]
     except KeyError:
         pass
+    facts = _module_facts[module] = ModuleFacts(module)
+    return facts
+
+
+def get_module_names(module: ast.Module) -> frozenset[str]:
+    return get_module_facts(module).names
+
+
+signature_re = re.compile(r"(\w+)\((.*)\)")
+
+
+@cache
+def get_ast_grammar() -> dict[
+    type[ast.AST], dict[str, tuple[type[ast.AST], ...] | None]
+]:
+    """
+    Return, for every AST node type, the node types that each of its fields
+    can hold, or None if unknown. Node types are read from the ASDL
+    signatures in their docstrings, such as "BinOp(expr left, operator op,
+    expr right)". Fields holding identifiers, strings, or constants map to
+    empty tuples.
+    """
+    grammar = {}
+    for type_ in _all_subclasses(ast.AST):
+        field_types = _parse_signature(type_)
+        if field_types is None:
+            grammar[type_] = dict.fromkeys(type_._fields)
+        else:
+            grammar[type_] = {
+                name: _resolve_asdl_type(asdl_type)
+                for name, asdl_type in field_types.items()
+            }
+    return grammar
+
+
+def _all_subclasses(type_: type[ast.AST]) -> list[type[ast.AST]]:
+    subclasses = []
+    for subclass in type_.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(_all_subclasses(subclass))
+    return subclasses
+
+
+def _parse_signature(type_: type[ast.AST]) -> dict[str, str] | None:
+    if not type_._fields:
+        return {}
+    match = signature_re.fullmatch(type_.__doc__ or "")
+    if match is None or match[1] != type_.__name__:
+        return None
+    field_types = {}
+    for field in match[2].split(","):
+        asdl_type, _, name = field.strip().rpartition(" ")
+        field_types[name] = asdl_type.rstrip("*?")
+    if tuple(field_types) != type_._fields:
+        return None
+    return field_types
 
-    names: set[str] = set()
-    for node in ast.walk(module):
-        if isinstance(node, ast.Name):
-            names.add(node.id)
-        elif isinstance(node, ast.Import):
-            for alias in node.names:
-                if alias.asname is not None:
-                    names.add(alias.asname)
-                else:
-                    names.add(alias.name.partition(".")[0])
-        elif isinstance(node, ast.ImportFrom):
-            for alias in node.names:
-                names.add(alias.asname if alias.asname is not None else alias.name)
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-            names.add(node.name)
-        elif isinstance(node, ast.arg):
-            names.add(node.arg)
-        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
-            if node.name is not None:
-                names.add(node.name)
-        elif isinstance(node, ast.MatchMapping) and node.rest is not None:
-            names.add(node.rest)
 
-    result = frozenset(names)
-    _module_names[module] = result
-    return result
+def _resolve_asdl_type(asdl_type: str) -> tuple[type[ast.AST], ...] | None:
+    type_ = getattr(ast, asdl_type, None)
+    if not isinstance(type_, type) or not issubclass(type_, ast.AST):
+        # A builtin type, like identifier or constant.
+        return ()
+    if not type_._fields and (subclasses := type_.__subclasses__()):
+        # A sum type, like expr, whose direct subclasses are its variants.
+        return tuple(subclasses)
+    if _parse_signature(type_) is None:
+        # A product type whose fields are unknown, so it may hold any node.
+        return None
+    return (type_,)
 
 
-def ast_parse(contents_text: str) -> ast.Module:
+def ast_parse(contents: str | bytes) -> ast.Module:
+    if isinstance(contents, str):
+        contents = contents.encode()
     # intentionally ignore warnings, we can't do anything about them
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
-        return ast.parse(contents_text.encode())
+        return ast.parse(contents)
 
 
 def ast_start_offset(node: ast.expr | ast.keyword | ast.stmt) -> Offset:
     return Offset(node.lineno, node.col_offset)
 
 
+def ast_end_offset(node: ast.expr | ast.keyword | ast.stmt) -> Offset:
+    assert node.end_lineno is not None and node.end_col_offset is not None
+    return Offset(node.end_lineno, node.end_col_offset)
+
+
 def is_rewritable_import_from(node: ast.ImportFrom) -> bool:
     # Not relative import or import *
     return node.level == 0 and not (len(node.names) == 1 and node.names[0].name == "*")
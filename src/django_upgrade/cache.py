@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import time
+from importlib import metadata
+
+from django_upgrade.data import Settings
+
+# Entries are pruned back down to this fraction of the maximum, so that a full
+# cache is not pruned again on every run.
+PRUNE_TO = 0.9
+
+# Seconds between checks of the cache's size, since listing a large cache
+# costs as much as a small run.
+PRUNE_INTERVAL = 24 * 60 * 60
+
+
+def default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "django-upgrade")
+
+
+class Cache:
+    """
+    An on-disk record of files that need no changes, so later runs can skip
+    them without parsing.
+
+    Each entry is an empty file named after a hash of the file’s name and
+    contents, the settings, and the versions of django-upgrade, Python, and
+    tokenize-rt. Entries’ modification times track when they were last used,
+    for least recently used eviction.
+    """
+
+    __slots__ = ("directory", "max_entries", "salt", "added")
+
+    def __init__(
+        self, directory: str, settings: Settings, max_entries: int = 100_000
+    ) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.salt = "\0".join(
+            (
+                metadata.version("django-upgrade"),
+                # Parsing and tokenizing, such as which files are skipped as
+                # syntax errors, depend on these.
+                ".".join(str(part) for part in sys.version_info[:2]),
+                metadata.version("tokenize-rt"),
+                ".".join(str(part) for part in settings.target_version),
+                ",".join(sorted(settings.enabled_fixers)),
+            )
+        ).encode()
+        # Entries added by this run, including those added by worker
+        # processes, which report their counts back.
+        self.added = 0
+
+    def key(self, filename: str, contents_bytes: bytes) -> str:
+        # The filename is part of the key as some fixers only run on certain
+        # files, like settings files.
+        hasher = hashlib.sha256(self.salt)
+        hasher.update(b"\0")
+        hasher.update(filename.encode("utf-8", "surrogateescape"))
+        hasher.update(b"\0")
+        hasher.update(contents_bytes)
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            # Mark the entry as recently used.
+            os.utime(self._path(key))
+        except OSError:
+            return False
+        return True
+
+    def add(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab"):
+                pass
+            self.added += 1
+        except OSError:
+            # The cache is only an optimization, so ignore unwritable
+            # directories.
+            pass
+
+    def prune(self) -> None:
+        """
+        Remove the least recently used entries if the cache is over its
+        maximum size. The size is only checked if this run added entries, at
+        most once per PRUNE_INTERVAL, unless this run added more entries than
+        a prune leaves room for.
+        """
+        if not self.added:
+            return
+        marker = os.path.join(self.directory, "pruned")
+        if self.added < self.max_entries - int(self.max_entries * PRUNE_TO):
+            try:
+                if time.time() - os.stat(marker).st_mtime < PRUNE_INTERVAL:
+                    return
+            except OSError:
+                pass
+        try:
+            with open(marker, "ab"):
+                pass
+            os.utime(marker)
+        except OSError:
+            return
+
+        try:
+            subdirs = [e.path for e in os.scandir(self.directory) if e.is_dir()]
+        except OSError:
+            return
+
+        paths: list[str] = []
+        for subdir in subdirs:
+            with os.scandir(subdir) as it:
+                paths.extend(entry.path for entry in it)
+
+        if len(paths) <= self.max_entries:
+            return
+
+        mtimes: dict[str, float] = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+        excess = len(mtimes) - int(self.max_entries * PRUNE_TO)
+        for path in sorted(mtimes, key=mtimes.__getitem__)[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
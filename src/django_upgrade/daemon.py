@@ -0,0 +1,277 @@
+"""
+A long-running process that keeps fixers loaded, for editor integrations and
+other callers that would otherwise pay django-upgrade's startup cost per file.
+
+The protocol is newline-delimited JSON over a Unix socket. Each request line
+is an object with the keys:
+
+* "path": the file's path, used for filename-based fixer conditions.
+* "source": the file's contents.
+* "target_version": optional, a version string like "5.2", default "2.2".
+* "only": optional, a list of fixer names to run.
+* "skip": optional, a list of fixer names to skip.
+
+Each response line is an object with the keys "source" and "changed", or
+"error" if the request was invalid or fixing failed.
+
+This module avoids importing the fixers at import time, so client code can
+use request() cheaply.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from django_upgrade.data import Settings
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "django-upgrade.sock")
+    # The temporary directory is shared, so use a private directory within it.
+    return os.path.join(
+        tempfile.gettempdir(), f"django-upgrade-{os.getuid()}", "django-upgrade.sock"
+    )
+
+
+class InsecureSocket(Exception):
+    pass
+
+
+def make_private_directory(directory: str) -> None:
+    """
+    Create the directory, accessible only to the current user, or check that
+    an existing one is, since another user could otherwise replace the
+    socket within it.
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        raise InsecureSocket(
+            f"{directory} must be a directory accessible only to the current user"
+        )
+
+
+def check_socket_owner(socket_path: str) -> None:
+    """
+    Check that the socket belongs to the current user, so sources are not
+    sent to, or answered by, another user's process.
+    """
+    if os.lstat(socket_path).st_uid != os.getuid():
+        raise InsecureSocket(f"{socket_path} is owned by another user")
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(prog="django-upgrade daemon")
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help=(
+            "Path of the Unix socket to listen on. Defaults to "
+            "django-upgrade.sock in $XDG_RUNTIME_DIR, or the temporary directory."
+        ),
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds without requests after which to exit. Defaults to 15 minutes.",
+    )
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+        parser.error("Unix sockets are not supported on this platform.")
+
+    socket_path = args.socket or default_socket_path()
+    try:
+        if args.socket is None:
+            make_private_directory(os.path.dirname(socket_path))
+        serve(socket_path, idle_timeout=args.idle_timeout)
+    except AlreadyRunning:
+        print(f"A daemon is already listening on {socket_path}", file=sys.stderr)
+        return 1
+    except InsecureSocket as exc:
+        print(f"Refusing to listen: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+class AlreadyRunning(Exception):
+    pass
+
+
+def serve(socket_path: str, idle_timeout: float) -> None:
+    """
+    Listen on the socket and answer requests until no connection is open and
+    there has been no activity for idle_timeout seconds.
+    """
+    # Imported here rather than at the top to keep request() cheap.
+    from django_upgrade.data import FIXERS, Settings
+    from django_upgrade.main import SUPPORTED_TARGET_VERSIONS, apply_fixers
+
+    # Import all fixers up front, rather than on the first request for each.
+    for _ in FIXERS.values():
+        pass
+
+    if os.path.lexists(socket_path):
+        check_socket_owner(socket_path)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that didn't exit cleanly.
+            os.unlink(socket_path)
+        else:
+            raise AlreadyRunning()
+
+    settings_cache: dict[tuple[Any, ...], Settings] = {}
+
+    def get_settings(request: dict[str, Any]) -> Settings:
+        target_version_str = request.get("target_version", "2.2")
+        try:
+            major, minor = (int(x) for x in target_version_str.split("."))
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid target_version: {target_version_str!r}")
+        if (major, minor) not in SUPPORTED_TARGET_VERSIONS:
+            raise ValueError(f"Unsupported target_version: {target_version_str!r}")
+
+        only = request.get("only")
+        skip = request.get("skip")
+        for name in (*(only or ()), *(skip or ())):
+            if name not in FIXERS:
+                raise ValueError(f"Unknown fixer: {name!r}")
+
+        key = (
+            (major, minor),
+            None if only is None else frozenset(only),
+            None if skip is None else frozenset(skip),
+        )
+        try:
+            return settings_cache[key]
+        except KeyError:
+            pass
+        settings = settings_cache[key] = Settings(
+            target_version=(major, minor),
+            only_fixers=set(only) if only is not None else None,
+            skip_fixers=set(skip) if skip is not None else None,
+        )
+        return settings
+
+    def respond(line: bytes) -> dict[str, Any]:
+        try:
+            request = json.loads(line)
+            path = request["path"]
+            source = request["source"]
+            if not isinstance(path, str) or not isinstance(source, str):
+                raise ValueError("path and source must be strings")
+            settings = get_settings(request)
+        except (KeyError, TypeError, ValueError) as exc:
+            return {"error": f"Invalid request: {exc}"}
+
+        try:
+            fixed = apply_fixers(source, settings, path)
+        except Exception as exc:
+            # Keep serving other requests, whatever goes wrong with this one.
+            return {"error": f"Failed to fix source: {exc!r}"}
+        return {"source": fixed, "changed": fixed is not source}
+
+    # Serve connections on their own threads, so a client that stalls doesn't
+    # hold up others.
+    lock = threading.Lock()
+    open_connections = 0
+    last_activity = time.monotonic()
+
+    def handle(conn: socket.socket) -> None:
+        nonlocal open_connections, last_activity
+        try:
+            with conn, conn.makefile("rwb") as stream:
+                conn.settimeout(idle_timeout)
+                try:
+                    for line in stream:
+                        stream.write(json.dumps(respond(line)).encode() + b"\n")
+                        stream.flush()
+                        last_activity = time.monotonic()
+                except OSError:
+                    # Client went away or stalled, drop it.
+                    pass
+        finally:
+            with lock:
+                open_connections -= 1
+                last_activity = time.monotonic()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        try:
+            os.chmod(socket_path, 0o600)
+            server.listen()
+            while True:
+                with lock:
+                    if open_connections:
+                        timeout = idle_timeout
+                    else:
+                        timeout = last_activity + idle_timeout - time.monotonic()
+                if timeout <= 0:
+                    break
+                server.settimeout(timeout)
+                try:
+                    conn, _ = server.accept()
+                except TimeoutError:
+                    continue
+                with lock:
+                    open_connections += 1
+                    last_activity = time.monotonic()
+                threading.Thread(target=handle, args=(conn,), daemon=True).start()
+        finally:
+            os.unlink(socket_path)
+
+
+def request(
+    socket_path: str,
+    path: str,
+    source: str,
+    *,
+    target_version: str | None = None,
+    only: Sequence[str] | None = None,
+    skip: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Send one file to the daemon and return its response.
+    """
+    message: dict[str, Any] = {"path": path, "source": source}
+    if target_version is not None:
+        message["target_version"] = target_version
+    if only is not None:
+        message["only"] = list(only)
+    if skip is not None:
+        message["skip"] = list(skip)
+
+    check_socket_owner(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(message).encode() + b"\n")
+            stream.flush()
+            client.shutdown(socket.SHUT_WR)
+            response: dict[str, Any] = json.loads(stream.readline())
+    return response
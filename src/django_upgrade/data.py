@@ -1,22 +1,31 @@
 from __future__ import annotations
 
 import ast
+import importlib
 import pkgutil
 import re
 from collections import defaultdict
-from collections.abc import Callable, Iterable
-from functools import cached_property
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableSequence
+from functools import cache, cached_property
 from typing import TYPE_CHECKING, Any, TypeVar
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade import fixers
+from django_upgrade import fixers, manifest
+from django_upgrade.ast import Parents, get_ast_grammar
+from django_upgrade.manifest import MANIFEST
 
 
 class Settings:
     __slots__ = (
         "target_version",
         "enabled_fixers",
+        "triggers_re",
+        "condition_names",
+        "ast_funcs_tables",
+        "whole_file_funcs",
+        "fixer_names",
+        "rerun_settings",
     )
 
     def __init__(
@@ -32,6 +41,30 @@ class Settings:
             if (only_fixers is None or name in only_fixers)
             and (skip_fixers is None or name not in skip_fixers)
         }
+        self.triggers_re = get_triggers_re(self)
+        # The State attributes that the conditions of runnable fixers check.
+        self.condition_names = tuple(
+            sorted(
+                {
+                    info.condition
+                    for name, info in MANIFEST.items()
+                    if name in self.enabled_fixers
+                    and info.min_version <= target_version
+                    and info.condition is not None
+                }
+            )
+        )
+        # Dispatch tables from get_ast_funcs(), keyed by which of
+        # condition_names are true for a file.
+        self.ast_funcs_tables: dict[int, ASTFuncTable] = {}
+        # AST functions in the tables from fixers that set whole_file.
+        self.whole_file_funcs: set[ASTFunc[Any]] = set()
+        # The name of the fixer of each AST function in the tables.
+        self.fixer_names: dict[ASTFunc[Any], str] = {}
+        # Settings for later passes of --until-stable, keyed by the fixers
+        # they enable, so their dispatch tables are reused across passes and
+        # files.
+        self.rerun_settings: dict[frozenset[str], Settings] = {}
 
 
 apps_re = re.compile(r"(^|[\\/])apps\.py$")
@@ -87,9 +120,35 @@ class State:
 
 
 AST_T = TypeVar("AST_T", bound=ast.AST)
-TokenFunc = Callable[[list[Token], int], None]
+TokenFunc = Callable[[MutableSequence[Token], int], None]
+
+
+class TextEdit:
+    """
+    A replacement of the source between two offsets. Fixers can yield these
+    instead of token functions when they know the change from the AST alone,
+    so files that only need text edits are never tokenized.
+    """
+
+    __slots__ = ("start", "end", "src")
+
+    def __init__(self, start: Offset, end: Offset, src: str) -> None:
+        self.start = start
+        self.end = end
+        self.src = src
+
+    def __repr__(self) -> str:
+        return f"TextEdit({self.start!r}, {self.end!r}, {self.src!r})"
+
+
 ASTFunc = Callable[
-    [State, AST_T, tuple[ast.AST, ...]], Iterable[tuple[Offset, TokenFunc]]
+    [State, AST_T, Parents], Iterable[tuple[Offset, TokenFunc | TextEdit]]
+]
+# For each node type, the functions to run on every node, and the functions
+# to run on nodes with particular dispatch names, from get_dispatch_name().
+ASTFuncTable = dict[
+    type[ast.AST],
+    tuple[tuple[ASTFunc[Any], ...], dict[str, tuple[ASTFunc[Any], ...]]],
 ]
 
 if TYPE_CHECKING:
@@ -106,26 +165,57 @@ class ASTCallbackMapping(Protocol):
         ...
 
 
+class Callbacks(defaultdict[Offset, list[TokenFunc]]):
+    """
+    Token functions to run by offset, and text edits, from visit(), with the
+    name of the fixer each edit comes from. whole_file is set if any come
+    from fixers that need the whole file tokenized, and fixers holds the
+    names of the fixers they come from.
+    """
+
+    __slots__ = ("whole_file", "edits", "fixers")
+
+    def __init__(self) -> None:
+        super().__init__(list)
+        self.whole_file = False
+        self.edits: dict[TextEdit, str] = {}
+        self.fixers: set[str] = set()
+
+
 def visit(
     tree: ast.Module,
     settings: Settings,
     filename: str,
-) -> dict[Offset, list[TokenFunc]]:
+) -> Callbacks:
     state = State(
         settings=settings,
         filename=filename,
         from_imports=defaultdict(set),
     )
     ast_funcs = get_ast_funcs(state, settings)
+    whole_file_funcs = settings.whole_file_funcs
+    fixer_names = settings.fixer_names
+    fields_by_type, skip_types = plan_traversal(frozenset(ast_funcs))
 
-    nodes: list[tuple[ast.AST, tuple[ast.AST, ...]]] = [(tree, ())]
-    ret = defaultdict(list)
+    nodes: list[tuple[ast.AST, Parents]] = [(tree, Parents())]
+    ret = Callbacks()
     while nodes:
         node, parents = nodes.pop()
 
-        for ast_func in ast_funcs[type(node)]:
-            for offset, token_func in ast_func(state, node, parents):
-                ret[offset].append(token_func)
+        entry = ast_funcs.get(type(node))
+        if entry is not None:
+            type_funcs, funcs_by_name = entry
+            if funcs_by_name:
+                type_funcs = funcs_by_name.get(get_dispatch_name(node), type_funcs)
+            for ast_func in type_funcs:
+                for offset, callback in ast_func(state, node, parents):
+                    if isinstance(callback, TextEdit):
+                        ret.edits[callback] = fixer_names[ast_func]
+                    else:
+                        ret[offset].append(callback)
+                    if ast_func in whole_file_funcs:
+                        ret.whole_file = True
+                    ret.fixers.add(fixer_names[ast_func])
 
         if (
             isinstance(node, ast.ImportFrom)
@@ -144,54 +234,195 @@ def visit(
                 if name.asname is None and name.name != "*"
             )
 
-        subparents = parents + (node,)
-        for name in reversed(node._fields):
+        fields = fields_by_type[type(node)]
+        if not fields:
+            continue
+        subparents = parents.push(node)
+        for name in fields:
             value = getattr(node, name)
 
             if isinstance(value, ast.AST):
-                nodes.append((value, subparents))
+                if type(value) not in skip_types:
+                    nodes.append((value, subparents))
             elif isinstance(value, list):
                 for subvalue in reversed(value):
-                    if isinstance(subvalue, ast.AST):
+                    if (
+                        isinstance(subvalue, ast.AST)
+                        and type(subvalue) not in skip_types
+                    ):
                         nodes.append((subvalue, subparents))
     return ret
 
 
+def get_dispatch_name(node: ast.AST) -> str:
+    """
+    Return the name that functions registered with names are dispatched on:
+    the callee's terminal name for calls, the id for names, the attribute
+    name for attributes, and the module for from imports. Return "" if there
+    is no such name, such as for a call of a subscript.
+    """
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.ImportFrom):
+        return node.module or ""
+    return ""
+
+
+DISPATCH_NAME_TYPES = (ast.Call, ast.Name, ast.Attribute, ast.ImportFrom)
+
+
+@cache
+def plan_traversal(
+    target_types: frozenset[type[ast.AST]],
+) -> tuple[dict[type[ast.AST], tuple[str, ...]], frozenset[type[ast.AST]]]:
+    """
+    Plan a walk of the AST that reaches every node of the target types, and
+    ImportFrom nodes for tracking imports, while skipping subtrees that
+    cannot contain them. Return, for each node type, the fields to descend
+    into, in reverse order for pushing onto a stack, and the node types that
+    never need visiting.
+    """
+    targets = target_types | {ast.ImportFrom}
+    grammar = get_ast_grammar()
+
+    def may_hold_target(field_types: tuple[type[ast.AST], ...] | None) -> bool:
+        return field_types is None or any(
+            type_ in targets or type_ in containers for type_ in field_types
+        )
+
+    # Find the types that can contain target nodes, repeating until no more
+    # are found as the grammar is recursive.
+    containers: set[type[ast.AST]] = set()
+    found = True
+    while found:
+        found = False
+        for type_, field_types in grammar.items():
+            if type_ not in containers and any(
+                may_hold_target(types) for types in field_types.values()
+            ):
+                containers.add(type_)
+                found = True
+
+    fields_by_type = {
+        type_: tuple(
+            name
+            for name, types in reversed(field_types.items())
+            if may_hold_target(types)
+        )
+        for type_, field_types in grammar.items()
+    }
+    skip_types = frozenset(
+        type_ for type_ in grammar if type_ not in targets and type_ not in containers
+    )
+    return fields_by_type, skip_types
+
+
 class Fixer:
     __slots__ = (
         "name",
         "min_version",
         "ast_funcs",
-        "condition",
+        "ast_func_names",
+        "condition_attr",
+        "triggers",
+        "whole_file",
     )
 
     def __init__(
         self,
         module_name: str,
         min_version: tuple[int, int],
-        condition: Callable[[State], bool] | None = None,
+        condition_attr: str | None = None,
+        triggers: Iterable[str] | None = None,
+        whole_file: bool = False,
     ) -> None:
         self.name = module_name.rpartition(".")[2]
         self.min_version = min_version
         self.ast_funcs: ASTCallbackMapping = defaultdict(list)
-        self.condition = condition
-
-        FIXERS[self.name] = self
+        # Names that registered functions are limited to, by type and function.
+        self.ast_func_names: dict[
+            tuple[type[ast.AST], ASTFunc[Any]], frozenset[str]
+        ] = {}
+        if condition_attr is not None and not isinstance(
+            getattr(State, condition_attr, None), cached_property
+        ):
+            raise ValueError(f"State has no condition {condition_attr!r}.")
+        # The name of a State attribute that must be true for the fixer to
+        # run on a file, if any. Naming it, rather than taking a function,
+        # lets the manifest record it so it can be checked without importing
+        # the fixer.
+        self.condition_attr = condition_attr
+        # Strings, at least one of which must appear in a file's source for
+        # the fixer to change it, or None if the fixer could change any file.
+        self.triggers = frozenset(triggers) if triggers is not None else None
+        # Whether the fixer's token functions may change tokens outside the
+        # top-level statement containing their offset, so the whole file must
+        # be tokenized, rather than just the statements that change.
+        self.whole_file = whole_file
+
+        FIXERS.loaded[self.name] = self
 
     def register(
-        self, type_: type[AST_T]
+        self, type_: type[AST_T], names: Iterable[str] | None = None
     ) -> Callable[[ASTFunc[AST_T]], ASTFunc[AST_T]]:
+        """
+        Register a function to run on nodes of the given type. If names are
+        given, it only runs on nodes whose dispatch name, from
+        get_dispatch_name(), is one of them.
+        """
+        if names is not None and type_ not in DISPATCH_NAME_TYPES:
+            raise ValueError(f"Cannot register {type_.__name__} by name.")
+
         def decorator(func: ASTFunc[AST_T]) -> ASTFunc[AST_T]:
             self.ast_funcs[type_].append(func)
+            if names is not None:
+                self.ast_func_names[(type_, func)] = frozenset(names)
             return func
 
         return decorator
 
 
-FIXERS: dict[str, Fixer] = {}
+class Fixers(Mapping[str, Fixer]):
+    """
+    All fixers by name. Each fixer's module is only imported when the fixer is
+    first accessed, so runs only pay for importing the fixers that can apply.
+    Details needed to select fixers without importing them are available
+    from MANIFEST.
+    """
+
+    __slots__ = ("loaded",)
+
+    def __init__(self) -> None:
+        self.loaded: dict[str, Fixer] = {}
+
+    def __getitem__(self, name: str) -> Fixer:
+        try:
+            return self.loaded[name]
+        except KeyError:
+            pass
+        if name not in MANIFEST:
+            raise KeyError(name)
+        importlib.import_module(f"{fixers.__name__}.{name}")
+        return self.loaded[name]
 
+    def __contains__(self, name: object) -> bool:
+        return name in MANIFEST
 
-def _import_fixers() -> None:
+    def __iter__(self) -> Iterator[str]:
+        return iter(MANIFEST)
+
+    def __len__(self) -> int:
+        return len(MANIFEST)
+
+
+FIXERS = Fixers()
+
+
+def import_all_fixers() -> None:
     # https://github.com/python/mypy/issues/1422
     fixers_path: str = fixers.__path__  # type: ignore [assignment]
     mod_infos = pkgutil.walk_packages(fixers_path, f"{fixers.__name__}.")
@@ -199,17 +430,165 @@ def _import_fixers() -> None:
         __import__(name, fromlist=["_trash"])
 
 
-_import_fixers()
+def render_manifest() -> str:
+    """
+    Return the source of the manifest module, describing every fixer in the
+    fixers package.
+    """
+    import_all_fixers()
+
+    lines = [
+        MANIFEST_HEADER,
+        "MANIFEST: dict[str, FixerInfo] = {",
+    ]
+    for name in sorted(FIXERS.loaded):
+        fixer = FIXERS.loaded[name]
+        node_types = sorted(type_.__name__ for type_, _ in fixer.ast_funcs.items())
+        lines.extend(
+            (
+                f'    "{name}": FixerInfo(',
+                f"        min_version={fixer.min_version!r},",
+                "        condition="
+                + (
+                    "None"
+                    if fixer.condition_attr is None
+                    else f'"{fixer.condition_attr}"'
+                )
+                + ",",
+                *render_strings("node_types", node_types),
+                *(
+                    ["        triggers=None,"]
+                    if fixer.triggers is None
+                    else render_strings("triggers", sorted(fixer.triggers))
+                ),
+                "    ),",
+            )
+        )
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def write_manifest() -> None:
+    """
+    Regenerate the manifest module from the fixers package.
+    """
+    with open(manifest.__file__, "w") as f:
+        f.write(render_manifest())
+
+
+def render_strings(keyword: str, strings: list[str]) -> list[str]:
+    # Match the formatter's style, which puts short tuples on one line.
+    if not strings:
+        return [f"        {keyword}=(),"]
+    if len(strings) == 1:
+        return [f'        {keyword}=("{strings[0]}",),']
+    return [
+        f"        {keyword}=(",
+        *(f'            "{string}",' for string in strings),
+        "        ),",
+    ]
+
 
+MANIFEST_HEADER = '''"""
+Details of every fixer, for selecting fixers without importing them.
 
-def get_ast_funcs(state: State, settings: Settings) -> ASTCallbackMapping:
-    ast_funcs: ASTCallbackMapping = defaultdict(list)
-    for fixer in FIXERS.values():
-        if fixer.name not in settings.enabled_fixers:
+Generated by render_manifest() in data.py - do not edit. Regenerate it after
+adding or changing fixers with:
+
+python -c "from django_upgrade.data import write_manifest; write_manifest()"
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class FixerInfo(NamedTuple):
+    min_version: tuple[int, int]
+    # Name of the State attribute that must be true for the fixer to apply,
+    # if any.
+    condition: str | None
+    node_types: tuple[str, ...]
+    triggers: tuple[str, ...] | None
+
+'''
+
+
+def get_triggers_re(settings: Settings) -> re.Pattern[bytes] | None:
+    """
+    Combine the triggers of all fixers enabled for the settings into one
+    pattern, so files that match none of them can skip parsing. The pattern
+    matches bytes, so files are checked before decoding. Return None if any
+    enabled fixer lacks triggers, so every file must be parsed.
+    """
+    triggers: set[str] = set()
+    for name in settings.enabled_fixers:
+        info = MANIFEST[name]
+        if info.min_version > settings.target_version:
             continue
-        if fixer.min_version <= state.settings.target_version and (
-            fixer.condition is None or fixer.condition(state)
+        if info.triggers is None:
+            return None
+        triggers.update(info.triggers)
+
+    if not triggers:
+        # No fixers can run, so match nothing.
+        return re.compile(rb"(?!)")
+
+    return re.compile(b"|".join(re.escape(t.encode()) for t in sorted(triggers)))
+
+
+def get_ast_funcs(state: State, settings: Settings) -> ASTFuncTable:
+    """
+    Return the AST functions to run on the state's file, by node type.
+    Fixers' conditions only depend on the file's classification, so a table
+    is built once per classification and cached on the settings.
+    """
+    key = 0
+    for bit, name in enumerate(settings.condition_names):
+        if getattr(state, name):
+            key |= 1 << bit
+    try:
+        return settings.ast_funcs_tables[key]
+    except KeyError:
+        pass
+
+    ast_funcs: defaultdict[type[ast.AST], list[ASTFunc[Any]]] = defaultdict(list)
+    func_names: dict[tuple[type[ast.AST], ASTFunc[Any]], frozenset[str]] = {}
+    for name, info in MANIFEST.items():
+        if (
+            name not in settings.enabled_fixers
+            or info.min_version > settings.target_version
+            # Avoid importing fixers that cannot apply to this file.
+            or (info.condition is not None and not getattr(state, info.condition))
         ):
-            for type_, type_funcs in fixer.ast_funcs.items():
-                ast_funcs[type_].extend(type_funcs)
-    return ast_funcs
+            continue
+        fixer = FIXERS[name]
+        for type_, type_funcs in fixer.ast_funcs.items():
+            ast_funcs[type_].extend(type_funcs)
+            settings.fixer_names.update(dict.fromkeys(type_funcs, name))
+        func_names.update(fixer.ast_func_names)
+        if fixer.whole_file:
+            for _, type_funcs in fixer.ast_funcs.items():
+                settings.whole_file_funcs.update(type_funcs)
+
+    table: ASTFuncTable = {}
+    for type_, type_funcs in ast_funcs.items():
+        # Build the function tuple for each dispatch name up front, keeping
+        # registration order so callbacks at the same offset apply in the
+        # same order as without names.
+        all_names = set().union(
+            *(func_names.get((type_, func), ()) for func in type_funcs)
+        )
+        table[type_] = (
+            tuple(func for func in type_funcs if (type_, func) not in func_names),
+            {
+                name: tuple(
+                    func
+                    for func in type_funcs
+                    if name in func_names.get((type_, func), (name,))
+                )
+                for name in sorted(all_names)
+            },
+        )
+    settings.ast_funcs_tables[key] = table
+    return table
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from fnmatch import fnmatchcase
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+DEFAULT_EXCLUDES = (
+    ".bzr",
+    ".direnv",
+    ".git",
+    ".hg",
+    ".mypy_cache",
+    ".nox",
+    ".svn",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "node_modules",
+    "venv",
+)
+
+
+def iter_filenames(paths: Iterable[str], excludes: Iterable[str]) -> Iterator[str]:
+    """
+    Yield the files to fix for the given paths. Files are yielded as given,
+    and directories are walked for Python files, skipping any entries that
+    match the exclude glob patterns, or that are virtual environments.
+    Filenames are yielded as soon as they are found, so callers can start work
+    before the walk is complete.
+    """
+    excludes = tuple(excludes)
+    for path in paths:
+        if path != "-" and os.path.isdir(path):
+            yield from _walk(path, "", excludes)
+        else:
+            yield path
+
+
+def _walk(directory: str, relative: str, excludes: tuple[str, ...]) -> Iterator[str]:
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        relative_path = f"{relative}{entry.name}"
+        if is_excluded(entry.name, relative_path, excludes):
+            continue
+
+        if entry.is_dir(follow_symlinks=False):
+            if os.path.exists(os.path.join(entry.path, "pyvenv.cfg")):
+                continue
+            yield from _walk(entry.path, f"{relative_path}/", excludes)
+        elif entry.name.endswith(".py") and entry.is_file():
+            yield entry.path
+
+
+def is_excluded(name: str, relative_path: str, excludes: tuple[str, ...]) -> bool:
+    """
+    Return whether an entry matches any exclude pattern, by its name or its
+    path relative to the walked directory, using forward slashes.
+    """
+    return any(
+        fnmatchcase(name, pattern) or fnmatchcase(relative_path, pattern)
+        for pattern in excludes
+    )
+
+
+def get_changed_filenames(ref: str, paths: Sequence[str]) -> list[str]:
+    """
+    Return the Python files that have been changed, added, or renamed since
+    the given git ref, including untracked files, relative to the current
+    directory. If paths are given, limit the search to them.
+    """
+    changed = _git_filenames(
+        "diff-index",
+        "-z",
+        "--name-only",
+        "--diff-filter=ACMR",
+        "--relative",
+        ref,
+        "--",
+        *paths,
+    )
+    untracked = _git_filenames(
+        "ls-files", "-z", "--others", "--exclude-standard", "--", *paths
+    )
+    return sorted(
+        filename for filename in {*changed, *untracked} if filename.endswith(".py")
+    )
+
+
+def _git_filenames(*args: str) -> list[str]:
+    # Imported here as most runs don't use git.
+    import subprocess
+
+    result = subprocess.run(["git", *args], check=True, capture_output=True)
+    return [os.fsdecode(name) for name in result.stdout.split(b"\0") if name]
+
+
+class OverlappedIO:
+    """
+    Read files ahead of, and write them behind, the thread that fixes them,
+    so that waiting on slow file systems overlaps with parsing and fixing.
+
+    Reads are scheduled in order, on a pool of threads, while the bytes read
+    but not yet taken, plus those waiting to be written, fit in the budget.
+    Writes run in order on a single thread. Errors from reading a file are
+    raised when it is taken, and errors from writing when the next file is
+    written, or on exit.
+    """
+
+    def __init__(self, budget: int, readers: int = 4) -> None:
+        # Imported here as single-file runs don't read ahead.
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.budget = budget
+        self.readers = readers
+        self._lock = threading.Lock()
+        self._buffered = 0
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="django-upgrade-read"
+        )
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="django-upgrade-write"
+        )
+        self._writes: deque[Future[None]] = deque()
+
+    def __enter__(self) -> OverlappedIO:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._read_executor.shutdown(cancel_futures=True)
+        self._write_executor.shutdown()
+        if exc_type is None:
+            self._flush_writes()
+
+    def read(self, filenames: Iterable[str]) -> Iterator[tuple[str, bytes]]:
+        """
+        Yield the name and contents of each file, in order.
+        """
+        filenames = iter(filenames)
+        reads: deque[tuple[str, Future[bytes]]] = deque()
+        # Files read since writes were last flushed, to detect a file given
+        # twice, which must be read after its earlier copy is written.
+        seen: set[str] = set()
+        filename: str | None = None
+        while True:
+            while len(reads) < 2 * self.readers and (
+                not reads or self._buffered < self.budget
+            ):
+                if filename is None:
+                    filename = next(filenames, None)
+                    if filename is None:
+                        break
+                if filename in seen:
+                    if reads:
+                        break
+                    self._flush_writes()
+                    seen.clear()
+                elif not reads:
+                    self._wait_for_writes()
+                seen.add(filename)
+                reads.append(
+                    (filename, self._read_executor.submit(self._read, filename))
+                )
+                filename = None
+
+            if not reads:
+                return
+            name, future = reads.popleft()
+            contents = future.result()
+            with self._lock:
+                self._buffered -= len(contents)
+            yield name, contents
+
+    def write(self, filename: str, contents: bytes) -> None:
+        """
+        Schedule writing the contents to the file.
+        """
+        self._check_writes()
+        with self._lock:
+            self._buffered += len(contents)
+        self._writes.append(
+            self._write_executor.submit(self._write, filename, contents)
+        )
+
+    def _read(self, filename: str) -> bytes:
+        with open(filename, "rb") as fb:
+            contents = fb.read()
+        with self._lock:
+            self._buffered += len(contents)
+        return contents
+
+    def _write(self, filename: str, contents: bytes) -> None:
+        try:
+            with open(filename, "wb") as fb:
+                fb.write(contents)
+        finally:
+            with self._lock:
+                self._buffered -= len(contents)
+
+    def _check_writes(self) -> None:
+        # Raise the error from any finished write that failed.
+        while self._writes and self._writes[0].done():
+            self._writes.popleft().result()
+
+    def _wait_for_writes(self) -> None:
+        # Wait for the oldest writes until the rest fit in the budget.
+        while self._writes and self._buffered > self.budget:
+            self._writes.popleft().result()
+
+    def _flush_writes(self) -> None:
+        while self._writes:
+            self._writes.popleft().result()
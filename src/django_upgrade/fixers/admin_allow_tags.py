@@ -12,13 +12,14 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset, is_sole_statement_in_block
+from django_upgrade.ast import Parents, ast_start_offset, is_sole_statement_in_block
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import erase_node
 
 fixer = Fixer(
     __name__,
     min_version=(2, 0),
+    triggers=("allow_tags",),
 )
 
 
@@ -26,7 +27,7 @@ fixer = Fixer(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
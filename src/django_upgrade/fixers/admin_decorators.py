@@ -8,13 +8,13 @@ https://docs.djangoproject.com/en/3.2/ref/contrib/admin/#django.contrib.admin.di
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import Literal
 
 from tokenize_rt import Offset, Token, tokens_to_src
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     OP,
@@ -28,6 +28,13 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 2),
+    triggers=(
+        "admin_order_field",
+        "allowed_permissions",
+        "boolean",
+        "empty_value_display",
+        "short_description",
+    ),
 )
 
 
@@ -35,7 +42,7 @@ fixer = Fixer(
 def visit_Module(
     state: State,
     node: ast.Module,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     yield from visit_Module_or_ClassDef(state, node, parents)
 
@@ -44,7 +51,7 @@ def visit_Module(
 def visit_ClassDef(
     state: State,
     node: ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     yield from visit_Module_or_ClassDef(state, node, parents)
 
@@ -81,7 +88,7 @@ class FunctionDetails:
 def visit_Module_or_ClassDef(
     state: State,
     node: ast.Module | ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     # Potential action and display functions to details of assigned attributes
     funcs: dict[str, FunctionDetails] = {}
@@ -205,7 +212,11 @@ def visit_Module_or_ClassDef(
 
 
 def decorate_function(
-    tokens: list[Token], i: int, *, funcdetails: FunctionDetails, decorated: bool
+    tokens: MutableSequence[Token],
+    i: int,
+    *,
+    funcdetails: FunctionDetails,
+    decorated: bool,
 ) -> None:
     if decorated:
         i = reverse_find(tokens, i, name=OP, src="@")
@@ -228,7 +239,7 @@ def decorate_function(
 
 
 def store_value_src(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.expr,
@@ -11,13 +11,14 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_and_replace_name, update_import_names
 
 fixer = Fixer(
     __name__,
     min_version=(4, 0),
+    triggers=("lookup_needs_distinct",),
 )
 
 MODULE = "django.contrib.admin.utils"
@@ -26,11 +27,11 @@ RENAMES = {
 }
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.module == MODULE and is_rewritable_import_from(node):
         name_map = {}
@@ -49,11 +50,11 @@ def visit_ImportFrom(
             )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=RENAMES)
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (name := node.id) in RENAMES and name in state.from_imports[MODULE]:
         new_name = RENAMES[name]
@@ -6,20 +6,21 @@ https://docs.djangoproject.com/en/stable/releases/1.7/#minor-features
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from typing import Literal, cast
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import OP, erase_node, extract_indent, insert, reverse_find
 
 fixer = Fixer(
     __name__,
     min_version=(1, 7),
+    triggers=("register",),
 )
 
 # Keep track of classes that could be decorated with `@admin.register()`
@@ -57,7 +58,7 @@ def _is_django_admin_imported(state: State) -> bool:
 def visit_ClassDef(
     state: State,
     node: ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if _is_django_admin_imported(state) and not uses_full_super_in_init_or_new(node):
         admin_detailses = decorable_admins.setdefault(state, {})
@@ -123,7 +124,7 @@ class FullSuperVisitor(ast.NodeVisitor):
 
 
 def update_class_def(
-    tokens: list[Token], i: int, *, name: str, state: State, decorated: bool
+    tokens: MutableSequence[Token], i: int, *, name: str, state: State, decorated: bool
 ) -> None:
     admin_details = decorable_admins.get(state, {})[name]
     if admin_details is None or not admin_details.model_names_per_site:
@@ -142,11 +143,11 @@ def update_class_def(
     insert(tokens, j, new_src=new_src)
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("register", "unregister"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         _is_django_admin_imported(state)
@@ -280,7 +281,7 @@ def visit_Call(
 
 
 def remove_register(
-    tokens: list[Token], i: int, *, name: str, state: State, node: ast.Expr
+    tokens: MutableSequence[Token], i: int, *, name: str, state: State, node: ast.Expr
 ) -> None:
     admin_details = decorable_admins.get(state, {})[name]
     if admin_details is None:
@@ -8,13 +8,13 @@ https://docs.djangoproject.com/en/4.1/releases/4.1/#tests
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import Any
 
 from tokenize_rt import UNIMPORTANT_WS, Offset, Token, tokens_to_src
 
-from django_upgrade.ast import ast_start_offset, looks_like_test_client_call
+from django_upgrade.ast import Parents, ast_start_offset, looks_like_test_client_call
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     OP,
@@ -29,15 +29,16 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(4, 1),
-    condition=lambda state: state.looks_like_test_file,
+    condition_attr="looks_like_test_file",
+    triggers=("assertFormError", "assertFormsetError"),
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("assertFormError", "assertFormsetError"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Attribute)
@@ -177,7 +178,7 @@ class ResponseAssignmentVisitor(ast.NodeVisitor):
 
 
 def is_response_from_client(
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
     node: ast.Call,
     name: str,
 ) -> bool:
@@ -195,7 +196,7 @@ def is_response_from_client(
 
 
 def rewrite_args(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     response_arg: ast.Name,
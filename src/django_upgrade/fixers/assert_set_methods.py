@@ -12,14 +12,15 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_and_replace_name
 
 fixer = Fixer(
     __name__,
     min_version=(4, 2),
-    condition=lambda state: state.looks_like_test_file,
+    condition_attr="looks_like_test_file",
+    triggers=("assertFormsetError", "assertQuerysetEqual"),
 )
 
 MODULE = "django.test.testcase"
@@ -29,11 +30,11 @@ NAMES = {
 }
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=NAMES)
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(func := node.func, ast.Attribute)
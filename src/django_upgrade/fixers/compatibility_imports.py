@@ -7,13 +7,14 @@ from functools import cache, partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import update_import_modules
 
 fixer = Fixer(
     __name__,
     min_version=(0, 0),
+    triggers=("django",),
 )
 
 REPLACEMENTS_EXACT = {
@@ -131,6 +132,16 @@ REPLACEMENTS_EXCEPT_MIGRATIONS = {
     }
 }
 
+# Every module that has replacements at some target version.
+MODULES = frozenset(
+    module
+    for replacements in (
+        *REPLACEMENTS_EXACT.values(),
+        *REPLACEMENTS_EXCEPT_MIGRATIONS.values(),
+    )
+    for module in replacements
+)
+
 
 @cache
 def _get_replacements(
@@ -155,11 +166,11 @@ def _get_replacements(
     return replacements
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=MODULES)
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if not is_rewritable_import_from(node) or node.module is None:
         return
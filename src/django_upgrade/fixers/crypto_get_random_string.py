@@ -6,29 +6,30 @@ https://docs.djangoproject.com/en/3.1/releases/3.1/#features-deprecated-in-3-1
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import CODE, OP, find
 
 fixer = Fixer(
     __name__,
     min_version=(3, 1),
+    triggers=("get_random_string",),
 )
 
 MODULE = "django.utils.crypto"
 NAME = "get_random_string"
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(NAME,))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -57,7 +58,9 @@ def visit_Call(
         )
 
 
-def add_length_argument(tokens: list[Token], i: int, *, has_kwargs: bool) -> None:
+def add_length_argument(
+    tokens: MutableSequence[Token], i: int, *, has_kwargs: bool
+) -> None:
     j = find(tokens, i, name=OP, src="(")
     new_src = "length=12"
     if has_kwargs:
@@ -11,14 +11,15 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import erase_node
 
 fixer = Fixer(
     __name__,
     min_version=(3, 2),
-    condition=lambda state: state.looks_like_dunder_init_file,
+    condition_attr="looks_like_dunder_init_file",
+    triggers=("default_app_config",),
 )
 
 
@@ -26,7 +27,7 @@ fixer = Fixer(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(parents[-1], ast.Module)
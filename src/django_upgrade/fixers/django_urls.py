@@ -7,13 +7,13 @@ from __future__ import annotations
 
 import ast
 import re
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     STRING,
@@ -29,6 +29,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(2, 0),
+    triggers=("re_path", "url"),
 )
 
 # Track which names are used for translation functions in a given state.
@@ -41,11 +42,14 @@ state_re_path_used: MutableMapping[State, bool] = WeakKeyDictionary()
 state_added_names: MutableMapping[State, set[str]] = WeakKeyDictionary()
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(
+    ast.ImportFrom,
+    names=("django.conf.urls", "django.urls", "django.utils.translation"),
+)
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == "django.conf.urls"
@@ -81,7 +85,7 @@ def visit_ImportFrom(
 
 
 def update_django_conf_import(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, state: State
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, state: State
 ) -> None:
     re_path_imported = "re_path" in state.from_imports["django.urls"]
     added_names = state_added_names.pop(state, set())
@@ -113,7 +117,7 @@ def update_django_conf_import(
 
 
 def update_django_urls_import(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, state: State
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, state: State
 ) -> None:
     re_path_used = state_re_path_used.get(state, False)
     added_names = state_added_names.pop(state, set())
@@ -141,11 +145,11 @@ def update_django_urls_import(
         )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("include", "re_path", "url"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if isinstance(node.func, ast.Name):
         if (
@@ -202,7 +206,7 @@ def visit_Call(
 
 
 def fix_url_call(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     regex_path: ast.Constant | None,
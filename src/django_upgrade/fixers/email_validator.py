@@ -11,13 +11,14 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import replace_argument_names
 
 fixer = Fixer(
     __name__,
     min_version=(3, 2),
+    triggers=("whitelist",),
 )
 
 MODULE = "django.core.validators"
@@ -25,11 +26,11 @@ NAME = "EmailValidator"
 KWARGS = {"whitelist": "allowlist"}
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(NAME,))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -8,12 +8,12 @@ https://docs.djangoproject.com/en/5.0/releases/5.0/#features-deprecated-in-5-0
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CALL_ARGUMENT_PREFIX_TOKENS,
@@ -27,14 +27,15 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(5, 0),
+    triggers=("format_html",),
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("format_html",))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         "format_html" in state.from_imports["django.utils.html"]
@@ -54,7 +55,7 @@ def visit_Call(
 
 
 def rewrite_str_format(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.Call,
@@ -6,25 +6,26 @@ https://docs.djangoproject.com/en/3.1/releases/3.1/#id2
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import replace
 
 fixer = Fixer(
     __name__,
     min_version=(3, 1),
+    triggers=("ModelMultipleChoiceField",),
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("ModelMultipleChoiceField",))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -53,7 +54,7 @@ def visit_Call(
         yield ast_start_offset(list_node), replace_list_key
 
 
-def replace_list_key(tokens: list[Token], i: int) -> None:
+def replace_list_key(tokens: MutableSequence[Token], i: int) -> None:
     if ast.literal_eval(tokens[i].src) != "list":
         # Implicitly concatenated string, cannot rewrite one token
         return
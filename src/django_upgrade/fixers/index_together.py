@@ -7,12 +7,12 @@ https://docs.djangoproject.com/en/4.2/releases/4.2/#index-together-option-is-dep
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import UNIMPORTANT_WS, Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     DEDENT,
@@ -29,7 +29,8 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(4, 2),
-    condition=lambda state: state.looks_like_models_file,
+    condition_attr="looks_like_models_file",
+    triggers=("index_together",),
 )
 
 
@@ -37,7 +38,7 @@ fixer = Fixer(
 def visit_ClassDef(
     state: State,
     node: ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.name != "Meta"
@@ -172,7 +173,7 @@ def visit_ClassDef(
 
 
 def remove_index_together_and_maybe_add_indexes(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     index_together: ast.Assign,
@@ -186,7 +187,7 @@ def remove_index_together_and_maybe_add_indexes(
 
 
 def extend_indexes(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     indexes: ast.Assign,
@@ -6,18 +6,27 @@ https://docs.djangoproject.com/en/6.0/releases/6.0/#positional-arguments-in-djan
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import CODE, OP, find, parse_call_args
 
 fixer = Fixer(
     __name__,
     min_version=(6, 0),
+    triggers=(
+        "EmailMessage",
+        "EmailMultiAlternatives",
+        "get_connection",
+        "mail_admins",
+        "mail_managers",
+        "send_mail",
+        "send_mass_mail",
+    ),
 )
 
 
@@ -82,11 +91,11 @@ API_CONFIGS = {
 MESSAGE_MODULE_NAMES = frozenset({"EmailMessage", "EmailMultiAlternatives"})
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=API_CONFIGS)
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     # Check for direct import or module import and get function config
     if (
@@ -150,7 +159,7 @@ def visit_Call(
 
 
 def migrate_api_args(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     api_config: APIConfig,
@@ -6,12 +6,12 @@ https://docs.djangoproject.com/en/6.1/howto/mailers-migration/#replacing-fail-si
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     OP,
@@ -25,6 +25,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(6, 1),
+    triggers=("fail_silently",),
 )
 
 MAIL_MODULE = "django.core.mail"
@@ -49,11 +50,11 @@ EMAIL_MESSAGE_CLASSES = frozenset(
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(*MAIL_SEND_FUNCTIONS, "send"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         # Mail send functions
@@ -111,7 +112,7 @@ def visit_Call(
 
 
 def remove_fail_silently_kwarg(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.Call,
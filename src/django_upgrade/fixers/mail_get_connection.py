@@ -7,13 +7,18 @@ https://docs.djangoproject.com/en/6.1/howto/mailers-migration/#replacing-get-con
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import (
+    Parents,
+    ast_start_offset,
+    get_module_facts,
+    is_rewritable_import_from,
+)
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CODE,
@@ -29,6 +34,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(6, 1),
+    triggers=("get_connection",),
 )
 
 MAIL_MODULE = "django.core.mail"
@@ -47,11 +53,11 @@ MAIL_SEND_FUNCTIONS = frozenset(
 )
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MAIL_MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == MAIL_MODULE
@@ -75,11 +81,11 @@ def visit_ImportFrom(
             )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(GET_CONNECTION, *MAIL_SEND_FUNCTIONS))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     # Replace mail.get_connection() → mail.mailers.default
     if (
@@ -148,7 +154,7 @@ def visit_Call(
                 break
 
 
-def _is_inline_connection_kwarg(parents: tuple[ast.AST, ...]) -> bool:
+def _is_inline_connection_kwarg(parents: Parents) -> bool:
     """Return True if the node is a connection= kwarg in a mail send function call."""
     return (
         len(parents) >= 2
@@ -179,8 +185,8 @@ def _direct_get_connection_usage(
     module: ast.Module,
 ) -> tuple[int, int]:
     """
-    Walk the module counting usages of get_connection via direct import
-    (Name('get_connection') references).
+    Count usages of get_connection via direct import (Name('get_connection')
+    references).
 
     Returns (unrewritable_count, standalone_no_arg_count).
     'unrewritable' counts calls with arguments and bare (non-call) references.
@@ -191,35 +197,22 @@ def _direct_get_connection_usage(
     except KeyError:
         pass
 
+    facts = get_module_facts(module)
     unrewritable = 0
     standalone_no_arg = 0
 
-    stack: list[tuple[ast.AST, tuple[ast.AST, ...]]] = [(module, ())]
-    while stack:
-        node, parents = stack.pop()
-        if (
-            isinstance(node, ast.Call)
-            and isinstance(node.func, ast.Name)
-            and node.func.id == GET_CONNECTION
-        ):
-            if len(node.args) > 0 or len(node.keywords) > 0:
-                unrewritable += 1
-            elif not _is_inline_connection_kwarg(parents):
-                standalone_no_arg += 1
-        elif (
-            isinstance(node, ast.Name)
-            and node.id == GET_CONNECTION
-            and not (
-                parents
-                and isinstance(parents[-1], ast.Call)
-                and parents[-1].func is node
-            )
-        ):
+    calls = facts.calls.get(GET_CONNECTION, ())
+    for call, parents in calls:
+        if len(call.args) > 0 or len(call.keywords) > 0:
+            unrewritable += 1
+        elif not _is_inline_connection_kwarg(parents):
+            standalone_no_arg += 1
+
+    call_funcs = {call.func for call, _ in calls}
+    for node, _ in facts.name_usages.get(GET_CONNECTION, ()):
+        if node not in call_funcs:
             # Bare reference, e.g. assigned to a variable
             unrewritable += 1
-        subparents = parents + (node,)
-        for child in ast.iter_child_nodes(node):
-            stack.append((child, subparents))
 
     result = unrewritable, standalone_no_arg
     _direct_get_connection_usage_cache[module] = result
@@ -249,13 +242,15 @@ def _is_no_arg_get_connection(node: ast.expr, state: State) -> bool:
     )
 
 
-def replace_call(tokens: list[Token], i: int, *, node: ast.Call, new_src: str) -> None:
+def replace_call(
+    tokens: MutableSequence[Token], i: int, *, node: ast.Call, new_src: str
+) -> None:
     j = find_last_token(tokens, i, node=node)
     tokens[i : j + 1] = [Token(name=CODE, src=new_src)]
 
 
 def remove_connection_kwarg(
-    tokens: list[Token], i: int, *, node: ast.Call, kwarg: ast.keyword
+    tokens: MutableSequence[Token], i: int, *, node: ast.Call, kwarg: ast.keyword
 ) -> None:
     open_paren = find(tokens, i, name=OP, src="(")
     func_args, _ = parse_call_args(tokens, open_paren)
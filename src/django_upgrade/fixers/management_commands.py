@@ -7,18 +7,17 @@ from __future__ import annotations
 
 import ast
 from collections.abc import Iterable
-from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset
-from django_upgrade.data import Fixer, State, TokenFunc
-from django_upgrade.tokens import replace
+from django_upgrade.ast import Parents, ast_end_offset, ast_start_offset
+from django_upgrade.data import Fixer, State, TextEdit
 
 fixer = Fixer(
     __name__,
     min_version=(3, 2),
-    condition=lambda state: state.looks_like_command_file,
+    condition_attr="looks_like_command_file",
+    triggers=("requires_system_checks",),
 )
 
 
@@ -26,8 +25,8 @@ fixer = Fixer(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
-) -> Iterable[tuple[Offset, TokenFunc]]:
+    parents: Parents,
+) -> Iterable[tuple[Offset, TextEdit]]:
     if (
         isinstance(parents[-1], ast.ClassDef)
         and len(node.targets) == 1
@@ -40,4 +39,5 @@ def visit_Assign(
             new_src = '"__all__"'
         else:
             new_src = "[]"
-        yield ast_start_offset(node.value), partial(replace, src=new_src)
+        start = ast_start_offset(node.value)
+        yield start, TextEdit(start, ast_end_offset(node.value), new_src)
@@ -7,21 +7,22 @@ from __future__ import annotations
 
 import ast
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import cast
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import OP, find_last_token, reverse_find
 
 fixer = Fixer(
     __name__,
     min_version=(5, 0),
-    condition=lambda state: state.looks_like_models_file,
+    condition_attr="looks_like_models_file",
+    triggers=("Choices",),
 )
 
 # Cache defined enumeration types by module
@@ -101,7 +102,7 @@ def _is_django_choices_type(
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -127,7 +128,7 @@ def visit_Call(
         yield ast_start_offset(target_node), partial(remove_choices, node=target_node)
 
 
-def remove_choices(tokens: list[Token], i: int, node: ast.Attribute) -> None:
+def remove_choices(tokens: MutableSequence[Token], i: int, node: ast.Attribute) -> None:
     j = find_last_token(tokens, i, node=node)
     i = reverse_find(tokens, j, name=OP, src=".")
     del tokens[i : j + 1]
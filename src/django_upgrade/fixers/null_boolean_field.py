@@ -6,13 +6,18 @@ https://docs.djangoproject.com/en/3.1/releases/3.1/#features-deprecated-in-3-1
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import (
+    Parents,
+    ast_start_offset,
+    get_module_facts,
+    is_rewritable_import_from,
+)
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CODE,
@@ -26,7 +31,8 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 1),
-    condition=lambda state: state.looks_like_models_file,
+    condition_attr="looks_like_models_file",
+    triggers=("NullBooleanField",),
 )
 
 
@@ -40,34 +46,21 @@ def _all_nullbooleanfield_name_usages_are_calls(module: ast.AST) -> bool:
     except KeyError:
         pass
 
-    call_func_nodes: set[ast.Name] = set()
-    for node in ast.walk(module):
-        # Calls are yielded before their children, including 'func'. So if we
-        # encounter a Name that wasn’t set in a previous Call node’s func attr,
-        # it’s used for a different purpose.
-        if (
-            isinstance(node, ast.Call)
-            and isinstance(node.func, ast.Name)
-            and node.func.id == "NullBooleanField"
-        ):
-            call_func_nodes.add(node.func)
-        elif (
-            isinstance(node, ast.Name)
-            and node.id == "NullBooleanField"
-            and node not in call_func_nodes
-        ):
-            _nullbooleanfield_check_cache[module] = False
-            return False
-
-    _nullbooleanfield_check_cache[module] = True
-    return True
-
-
-@fixer.register(ast.ImportFrom)
+    result = all(
+        isinstance(parent := parents[-1], ast.Call) and parent.func is node
+        for node, parents in get_module_facts(module).name_usages.get(
+            "NullBooleanField", ()
+        )
+    )
+    _nullbooleanfield_check_cache[module] = result
+    return result
+
+
+@fixer.register(ast.ImportFrom, names=("django.db.models",))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         is_rewritable_import_from(node)
@@ -84,11 +77,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("NullBooleanField",))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Name)
@@ -105,7 +98,9 @@ def visit_Call(
         yield ast_start_offset(node), partial(fix_null_boolean_field, node=node)
 
 
-def fix_null_boolean_field(tokens: list[Token], i: int, *, node: ast.Call) -> None:
+def fix_null_boolean_field(
+    tokens: MutableSequence[Token], i: int, *, node: ast.Call
+) -> None:
     if not any(k.arg == "null" for k in node.keywords):
         j = find(tokens, i, name=OP, src="(")
         func_args, j = parse_call_args(tokens, j)
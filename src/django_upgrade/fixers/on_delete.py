@@ -6,29 +6,30 @@ https://docs.djangoproject.com/en/stable/releases/1.9/#features-deprecated-in-1-
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import OP, extract_indent, find, insert, parse_call_args
 
 fixer = Fixer(
     __name__,
     min_version=(1, 9),
+    triggers=("ForeignKey", "OneToOneField"),
 )
 
 RELATION_FIELD_NAMES = frozenset({"ForeignKey", "OneToOneField"})
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=("django.db.models",))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == "django.db.models"
@@ -50,7 +51,7 @@ should_update_import: MutableMapping[State, bool] = WeakKeyDictionary()
 
 
 def update_django_models_import(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, state: State
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, state: State
 ) -> None:
     if should_update_import.get(state, False):
         should_update_import[state] = False
@@ -62,11 +63,11 @@ def update_django_models_import(
         )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=RELATION_FIELD_NAMES)
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -102,7 +103,7 @@ def visit_Call(
 
 
 def add_on_delete_keyword(
-    tokens: list[Token], i: int, *, num_pos_args: int, models_imported: bool
+    tokens: MutableSequence[Token], i: int, *, num_pos_args: int, models_imported: bool
 ) -> None:
     open_idx = find(tokens, i, name=OP, src="(")
     func_args, close_idx = parse_call_args(tokens, open_idx)
@@ -6,12 +6,12 @@ https://docs.djangoproject.com/en/3.1/releases/3.1/#django-contrib-auth
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CODE,
@@ -25,7 +25,8 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 1),
-    condition=lambda state: state.looks_like_settings_file,
+    condition_attr="looks_like_settings_file",
+    triggers=("PASSWORD_RESET_TIMEOUT_DAYS",),
 )
 
 OLD_NAME = "PASSWORD_RESET_TIMEOUT_DAYS"
@@ -36,7 +37,7 @@ NEW_NAME = "PASSWORD_RESET_TIMEOUT"
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(node.targets) == 1
@@ -46,7 +47,9 @@ def visit_Assign(
         yield ast_start_offset(node), partial(rewrite_setting, node=node)
 
 
-def rewrite_setting(tokens: list[Token], i: int, *, node: ast.Assign) -> None:
+def rewrite_setting(
+    tokens: MutableSequence[Token], i: int, *, node: ast.Assign
+) -> None:
     tokens[i] = tokens[i]._replace(name=CODE, src=NEW_NAME)
     j = find(tokens, i, name=OP, src="=")
     if not isinstance(
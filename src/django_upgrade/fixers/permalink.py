@@ -6,13 +6,13 @@ https://docs.djangoproject.com/en/1.11/releases/1.11/#features-deprecated-in-1-1
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import UNIMPORTANT_WS, Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CODE,
@@ -33,6 +33,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(1, 11),
+    triggers=("permalink",),
 )
 
 # Set when a @models.permalink method is detected, so the django.db import
@@ -44,7 +45,7 @@ _state_needs_reverse: MutableMapping[State, bool] = WeakKeyDictionary()
 def visit_FunctionDef(
     state: State,
     node: ast.FunctionDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(node.decorator_list) == 1
@@ -80,11 +81,11 @@ def visit_FunctionDef(
         )
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=("django.db",))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == "django.db"
@@ -97,11 +98,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=("django.db.models",))
 def visit_ImportFrom_direct_permalink(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == "django.db.models"
@@ -115,7 +116,7 @@ def visit_ImportFrom_direct_permalink(
 
 
 def fix_models_import(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, state: State
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, state: State
 ) -> None:
     if not _state_needs_reverse.pop(state, False):
         return
@@ -127,7 +128,7 @@ def fix_models_import(
 
 
 def fix_permalink_direct_import(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, state: State
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, state: State
 ) -> None:
     if not _state_needs_reverse.pop(state, False):
         return
@@ -137,7 +138,9 @@ def fix_permalink_direct_import(
         insert(tokens, j, new_src=f"{indent}from django.urls import reverse\n")
 
 
-def fix_permalink_decorator(tokens: list[Token], i: int, *, node: ast.expr) -> None:
+def fix_permalink_decorator(
+    tokens: MutableSequence[Token], i: int, *, node: ast.expr
+) -> None:
     j = find_last_token(tokens, i, node=node)
     k = j + 1
     while tokens[k].name not in ("NEWLINE", "NL"):
@@ -152,7 +155,7 @@ def fix_permalink_decorator(tokens: list[Token], i: int, *, node: ast.expr) -> N
 
 
 def fix_permalink_return(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     ret_node: ast.Return,
@@ -7,26 +7,25 @@ from __future__ import annotations
 
 import ast
 from collections.abc import Iterable
-from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset
-from django_upgrade.data import Fixer, State, TokenFunc
-from django_upgrade.tokens import replace
+from django_upgrade.ast import Parents, ast_start_offset
+from django_upgrade.data import Fixer, State, TextEdit
 
 fixer = Fixer(
     __name__,
     min_version=(5, 2),
+    triggers=("ordering",),
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("ArrayAgg", "JSONBAgg", "StringAgg"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
-) -> Iterable[tuple[Offset, TokenFunc]]:
+    parents: Parents,
+) -> Iterable[tuple[Offset, TextEdit]]:
     if (
         (
             (
@@ -60,4 +59,6 @@ def visit_Call(
         and "order_by" not in kwarg_names
     ):
         check_kwarg = [k for k in node.keywords if k.arg == "ordering"][0]
-        yield ast_start_offset(check_kwarg), partial(replace, src="order_by")
+        start = ast_start_offset(check_kwarg)
+        end = Offset(start.line, start.utf8_byte_offset + len("ordering"))
+        yield start, TextEdit(start, end, "order_by")
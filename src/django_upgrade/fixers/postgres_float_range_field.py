@@ -11,13 +11,14 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_and_replace_name, update_import_names
 
 fixer = Fixer(
     __name__,
     min_version=(2, 2),
+    triggers=("FloatRangeField",),
 )
 
 MODULES = frozenset(
@@ -33,11 +34,11 @@ NAME_MAP = {
 }
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=MODULES)
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module in MODULES
@@ -50,11 +51,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=NAME_MAP)
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (name := node.id) in NAME_MAP and any(
         name in state.from_imports[m] for m in MODULES
@@ -6,7 +6,7 @@ https://docs.djangoproject.com/en/2.0/releases/2.0/#miscellaneous:~:text=django%
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import cast
 from weakref import WeakKeyDictionary
@@ -14,7 +14,9 @@ from weakref import WeakKeyDictionary
 from tokenize_rt import Offset, Token
 
 from django_upgrade.ast import (
+    Parents,
     ast_start_offset,
+    get_module_facts,
     get_module_names,
     is_rewritable_import_from,
 )
@@ -30,6 +32,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(2, 0),
+    triggers=("render_to_response",),
 )
 
 MODULE = "django.shortcuts"
@@ -37,11 +40,11 @@ OLD_NAME = "render_to_response"
 NEW_NAME = "render"
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == MODULE
@@ -60,11 +63,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(OLD_NAME,))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Name)
@@ -89,49 +92,40 @@ def _all_render_to_response_calls_rewritable(module: ast.AST) -> bool:
     except KeyError:
         pass
 
-    result = True
-
-    def _walk(
-        node: ast.AST,
-        innermost: ast.FunctionDef | ast.AsyncFunctionDef | None,
-    ) -> None:
-        nonlocal result
-        if not result:
-            return
-
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            innermost = node
-
-        if isinstance(node, ast.Name) and node.id == OLD_NAME:
-            result = False
-            return
-
-        if (
-            isinstance(node, ast.Call)
-            and isinstance(node.func, ast.Name)
-            and node.func.id == OLD_NAME
-            and (node.args or node.keywords)
-            and innermost is not None
-            and innermost.args.args
-            and innermost.args.args[0].arg == "request"
-            and not any(isinstance(a, ast.Starred) for a in node.args)
-            and not any(kw.arg is None for kw in node.keywords)
-        ):
-            for child in ast.iter_child_nodes(node):
-                if child is not node.func:
-                    _walk(child, innermost)
-            return
-
-        for child in ast.iter_child_nodes(node):
-            _walk(child, innermost)
-
-    _walk(module, None)
-
+    result = all(
+        _is_rewritable_call(node, parents)
+        for node, parents in get_module_facts(module).name_usages.get(OLD_NAME, ())
+    )
     _check_cache[module] = result
     return result
 
 
-def add_request_argument(tokens: list[Token], i: int) -> None:
+def _is_rewritable_call(node: ast.Name, parents: Parents) -> bool:
+    call = parents[-1]
+    if not (
+        isinstance(call, ast.Call)
+        and call.func is node
+        and (call.args or call.keywords)
+        and not any(isinstance(a, ast.Starred) for a in call.args)
+        and not any(kw.arg is None for kw in call.keywords)
+    ):
+        return False
+    innermost = next(
+        (
+            parent
+            for parent in reversed(parents)
+            if isinstance(parent, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ),
+        None,
+    )
+    return (
+        innermost is not None
+        and bool(innermost.args.args)
+        and innermost.args.args[0].arg == "request"
+    )
+
+
+def add_request_argument(tokens: MutableSequence[Token], i: int) -> None:
     j = find(tokens, i, name=OP, src="(")
     tokens.insert(j + 1, Token(name=CODE, src="request, "))
     find_and_replace_name(tokens, i, name=OLD_NAME, new=NEW_NAME)
@@ -6,18 +6,19 @@ https://docs.djangoproject.com/en/2.2/releases/2.2/#requests-and-responses
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import NAME, STRING, find, replace, str_repr_matching
 
 fixer = Fixer(
     __name__,
     min_version=(2, 2),
+    triggers=("META",),
 )
 
 SPECIAL_HEADERS = frozenset({"CONTENT_LENGTH", "CONTENT_TYPE"})
@@ -27,7 +28,7 @@ SPECIAL_HEADERS = frozenset({"CONTENT_LENGTH", "CONTENT_TYPE"})
 def visit_Subscript(
     state: State,
     node: ast.Subscript,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         is_request_or_self_request_meta(node.value)
@@ -43,11 +44,11 @@ def visit_Subscript(
         )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("get",))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Attribute)
@@ -70,7 +71,7 @@ def visit_Call(
 def visit_Compare(
     state: State,
     node: ast.Compare,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(node.ops) == 1
@@ -126,7 +127,7 @@ def get_header_name(meta_name: str) -> str | None:
 
 
 def rewrite_header_access(
-    tokens: list[Token], i: int, *, meta_name: str, header_name: str
+    tokens: MutableSequence[Token], i: int, *, meta_name: str, header_name: str
 ) -> None:
     meta_idx = find(tokens, i, name=NAME, src="META")
     str_idx = find(tokens, meta_idx, name=STRING)
@@ -139,7 +140,7 @@ def rewrite_header_access(
 
 
 def rewrite_in_statement(
-    tokens: list[Token], i: int, *, meta_name: str, header_name: str
+    tokens: MutableSequence[Token], i: int, *, meta_name: str, header_name: str
 ) -> None:
     str_idx = find(tokens, i, name=STRING)
     if ast.literal_eval(tokens[str_idx].src) != meta_name:
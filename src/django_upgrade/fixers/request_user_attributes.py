@@ -8,26 +8,27 @@ https://docs.djangoproject.com/en/1.10/releases/1.10/#using-user-is-authenticate
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import NAME, OP, find
 
 fixer = Fixer(
     __name__,
     min_version=(1, 10),
+    triggers=("is_anonymous", "is_authenticated"),
 )
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("is_anonymous", "is_authenticated"))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Attribute)
@@ -58,7 +59,9 @@ def is_request_or_self_request_user(node: ast.AST) -> bool:
     )
 
 
-def rewrite_user_attribute(tokens: list[Token], i: int, *, attr: str) -> None:
+def rewrite_user_attribute(
+    tokens: MutableSequence[Token], i: int, *, attr: str
+) -> None:
     j = find(tokens, i, name=NAME, src=attr)
     y = find(tokens, j, name=OP, src="(")
     z = find(tokens, y, name=OP, src=")")
@@ -6,19 +6,20 @@ https://docs.djangoproject.com/en/6.0/releases/6.0/#positional-arguments-in-djan
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_first_token, find_last_token
 
 fixer = Fixer(
     __name__,
     min_version=(6, 0),
-    condition=lambda state: state.looks_like_settings_file,
+    condition_attr="looks_like_settings_file",
+    triggers=("ADMINS", "MANAGERS"),
 )
 
 
@@ -26,7 +27,7 @@ fixer = Fixer(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(node.targets) == 1
@@ -49,7 +50,7 @@ def visit_Assign(
 
 
 def update_setting(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.Assign,
@@ -7,18 +7,19 @@ https://docs.djangoproject.com/en/2.0/releases/2.0/#id1
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import replace, str_repr_matching
 
 fixer = Fixer(
     __name__,
     min_version=(1, 9),
-    condition=lambda state: state.looks_like_settings_file,
+    condition_attr="looks_like_settings_file",
+    triggers=("DATABASES",),
 )
 
 
@@ -26,7 +27,7 @@ fixer = Fixer(
 def visit_Dict(
     state: State,
     node: ast.Dict,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(parents) >= 2
@@ -49,7 +50,7 @@ def visit_Dict(
         yield ast_start_offset(target_node), replace_engine
 
 
-def replace_engine(tokens: list[Token], i: int) -> None:
+def replace_engine(tokens: MutableSequence[Token], i: int) -> None:
     if ast.literal_eval(tokens[i].src) != "django.db.backends.postgresql_psycopg2":
         # Implicitly concatenated string, cannot rewrite one token
         return
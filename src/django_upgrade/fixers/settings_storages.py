@@ -6,20 +6,21 @@ https://docs.djangoproject.com/en/4.2/releases/4.2/#custom-file-storages
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import STRING, erase_node, find, insert, str_repr_matching
 
 fixer = Fixer(
     __name__,
     min_version=(4, 2),
-    condition=lambda state: state.looks_like_settings_file,
+    condition_attr="looks_like_settings_file",
+    triggers=("DEFAULT_FILE_STORAGE", "STATICFILES_STORAGE"),
 )
 
 # Keep track of seen assignments
@@ -59,7 +60,7 @@ settings_details: MutableMapping[State, SettingsDetails] = WeakKeyDictionary()
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.names[0].name == "*"
@@ -72,11 +73,11 @@ def visit_ImportFrom(
     return ()
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=NAME_MAP)
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.id in NAME_MAP:
         parent = parents[-1]
@@ -96,7 +97,7 @@ def visit_Name(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         len(node.targets) == 1
@@ -127,7 +128,7 @@ def visit_Assign(
 
 
 def replace_storages(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     details: SettingsDetails,
@@ -6,12 +6,12 @@ https://docs.djangoproject.com/en/3.1/releases/3.1/#features-deprecated-in-3-1
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     CODE,
@@ -25,17 +25,18 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 1),
+    triggers=("Signal",),
 )
 
 MODULE = "django.dispatch"
 NAME = "Signal"
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(NAME,))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Name)
@@ -69,7 +70,7 @@ def visit_Call(
 
 
 def remove_providing_args(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.Call,
@@ -8,30 +8,37 @@ https://docs.djangoproject.com/en/dev/releases/6.0/#models
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_last_token, insert, update_import_modules
 
 fixer = Fixer(
     __name__,
     min_version=(6, 0),
+    triggers=("StringAgg",),
 )
 
 
 do_rewrite: WeakKeyDictionary[ast.Module, bool] = WeakKeyDictionary()
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(
+    ast.ImportFrom,
+    names=(
+        "django.contrib.postgres.aggregates",
+        "django.contrib.postgres.aggregates.general",
+    ),
+)
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -53,11 +60,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=("StringAgg",))
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.id == "StringAgg" and (
         node.id in state.from_imports["django.contrib.postgres.aggregates"]
@@ -74,11 +81,11 @@ def visit_Name(
     return ()
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=("StringAgg",))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.func, ast.Name)
@@ -140,7 +147,7 @@ def visit_Call(
 
 
 def rewrite_import_from(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, module: ast.Module
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, module: ast.Module
 ) -> None:
     if do_rewrite.get(module) is not True:
         return
@@ -151,7 +158,12 @@ def rewrite_import_from(
 
 
 def wrap_delimiter(
-    tokens: list[Token], i: int, *, wrap: str, node: ast.expr, module: ast.Module
+    tokens: MutableSequence[Token],
+    i: int,
+    *,
+    wrap: str,
+    node: ast.expr,
+    module: ast.Module,
 ) -> None:
     if do_rewrite.get(module) is not True:
         return
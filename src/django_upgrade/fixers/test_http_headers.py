@@ -8,13 +8,18 @@ from __future__ import annotations
 
 import ast
 from bisect import bisect
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import cast
 
 from tokenize_rt import UNIMPORTANT_WS, Offset, Token
 
-from django_upgrade.ast import ast_start_offset, looks_like_test_client_call
+from django_upgrade.ast import (
+    TEST_CLIENT_REQUEST_METHODS,
+    Parents,
+    ast_start_offset,
+    looks_like_test_client_call,
+)
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     COMMENT,
@@ -30,18 +35,28 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(4, 2),
-    condition=lambda state: state.looks_like_test_file,
+    condition_attr="looks_like_test_file",
+    triggers=("HTTP_",),
 )
 
 HEADERS_KWARG = "headers"
 HTTP_PREFIX = "HTTP_"
 
 
-@fixer.register(ast.Call)
+@fixer.register(
+    ast.Call,
+    names=(
+        "AsyncClient",
+        "AsyncRequestFactory",
+        "Client",
+        "RequestFactory",
+        *TEST_CLIENT_REQUEST_METHODS,
+    ),
+)
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         (
@@ -87,7 +102,11 @@ class Delete:
 
 
 def combine_http_headers_kwargs(
-    tokens: list[Token], i: int, *, node: ast.Call, headers_keyword: ast.keyword | None
+    tokens: MutableSequence[Token],
+    i: int,
+    *,
+    node: ast.Call,
+    headers_keyword: ast.keyword | None,
 ) -> None:
     if headers_keyword is not None:
         # Insert converted headers at the start of the existing dict:
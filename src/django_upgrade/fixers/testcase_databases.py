@@ -6,19 +6,20 @@ https://docs.djangoproject.com/en/2.2/releases/2.2/#features-deprecated-in-2-2
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import CODE, find_last_token
 
 fixer = Fixer(
     __name__,
     min_version=(2, 2),
-    condition=lambda state: state.looks_like_test_file,
+    condition_attr="looks_like_test_file",
+    triggers=("allow_database_queries", "multi_db"),
 )
 
 
@@ -26,7 +27,7 @@ fixer = Fixer(
 def visit_Assign(
     state: State,
     node: ast.Assign,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(parents[-1], ast.ClassDef)
@@ -50,7 +51,7 @@ def visit_Assign(
 
 
 def replace_assignment(
-    tokens: list[Token], i: int, *, node: ast.Assign, new_value: str
+    tokens: MutableSequence[Token], i: int, *, node: ast.Assign, new_value: str
 ) -> None:
     j = find_last_token(tokens, i, node=node)
     tokens[i : j + 1] = [Token(name=CODE, src=f"databases = {new_value}")]
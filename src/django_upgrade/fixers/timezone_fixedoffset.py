@@ -6,13 +6,13 @@ https://docs.djangoproject.com/en/2.2/releases/2.2/#features-deprecated-in-2-2
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     OP,
@@ -28,6 +28,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(2, 2),
+    triggers=("FixedOffset",),
 )
 
 MODULE = "django.utils.timezone"
@@ -37,11 +38,11 @@ OLD_NAME = "FixedOffset"
 do_rewrite: WeakKeyDictionary[ast.Module, bool] = WeakKeyDictionary()
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == MODULE
@@ -56,7 +57,7 @@ def visit_ImportFrom(
 
 
 def fix_import_from(
-    tokens: list[Token], i: int, *, node: ast.ImportFrom, module: ast.Module
+    tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom, module: ast.Module
 ) -> None:
     if not do_rewrite.get(module, True):
         return
@@ -71,11 +72,11 @@ def get_offset_arg(node: ast.Call) -> ast.expr | ast.keyword | None:
     return next((k for k in node.keywords if k.arg == "offset"), None)
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=(OLD_NAME,))
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.id == OLD_NAME and OLD_NAME in state.from_imports[MODULE]:
         parent = parents[-1]
@@ -93,11 +94,11 @@ def visit_Name(
     return ()
 
 
-@fixer.register(ast.Call)
+@fixer.register(ast.Call, names=(OLD_NAME,))
 def visit_Call(
     state: State,
     node: ast.Call,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         OLD_NAME in state.from_imports[MODULE]
@@ -115,7 +116,7 @@ def visit_Call(
 
 
 def fix_offset_arg(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     arg: ast.expr | ast.keyword,
@@ -11,13 +11,14 @@ from functools import partial
 
 from tokenize_rt import Offset
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import find_and_replace_name, update_import_names
 
 fixer = Fixer(
     __name__,
     min_version=(6, 1),
+    triggers=("savepoint",),
 )
 
 NAMES = {
@@ -25,11 +26,11 @@ NAMES = {
 }
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=("django.db.transaction",))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.module == "django.db.transaction"
@@ -42,11 +43,11 @@ def visit_ImportFrom(
         )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=NAMES)
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (name := node.id) in NAMES and name in state.from_imports[
         "django.db.transaction"
@@ -57,11 +58,11 @@ def visit_Name(
         )
 
 
-@fixer.register(ast.Attribute)
+@fixer.register(ast.Attribute, names=NAMES)
 def visit_Attribute(
     state: State,
     node: ast.Attribute,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     name = node.attr
     if (
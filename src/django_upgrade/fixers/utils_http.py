@@ -6,12 +6,12 @@ https://docs.djangoproject.com/en/3.0/releases/3.0/#features-deprecated-in-3-0
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset, is_rewritable_import_from
+from django_upgrade.ast import Parents, ast_start_offset, is_rewritable_import_from
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     extract_indent,
@@ -23,6 +23,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 0),
+    triggers=("is_safe_url", "urlquote", "urlunquote"),
 )
 
 MODULE = "django.utils.http"
@@ -37,11 +38,11 @@ URLLIB_NAMES = {
 }
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.module == MODULE and is_rewritable_import_from(node):
         name_map = {}
@@ -66,7 +67,7 @@ def visit_ImportFrom(
 
 
 def fix_import(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.ImportFrom,
@@ -92,11 +93,11 @@ def fix_import(
         )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=(*RENAMES, *URLLIB_NAMES))
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (name := node.id) in state.from_imports[MODULE]:
         new_name: str | None
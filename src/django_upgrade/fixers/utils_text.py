@@ -6,12 +6,12 @@ https://docs.djangoproject.com/en/3.0/releases/3.0/#features-deprecated-in-3-0
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 
 from tokenize_rt import Offset, Token
 
-from django_upgrade.ast import ast_start_offset
+from django_upgrade.ast import Parents, ast_start_offset
 from django_upgrade.data import Fixer, State, TokenFunc
 from django_upgrade.tokens import (
     extract_indent,
@@ -23,6 +23,7 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(3, 0),
+    triggers=("unescape_entities",),
 )
 
 MODULE = "django.utils.text"
@@ -32,11 +33,11 @@ NAME_MAP = {
 }
 
 
-@fixer.register(ast.ImportFrom)
+@fixer.register(ast.ImportFrom, names=(MODULE,))
 def visit_ImportFrom(
     state: State,
     node: ast.ImportFrom,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.level == 0
@@ -48,17 +49,17 @@ def visit_ImportFrom(
         yield ast_start_offset(node), partial(fix_import, node=node)
 
 
-def fix_import(tokens: list[Token], i: int, *, node: ast.ImportFrom) -> None:
+def fix_import(tokens: MutableSequence[Token], i: int, *, node: ast.ImportFrom) -> None:
     j, indent = extract_indent(tokens, i)
     update_import_names(tokens, i, node=node, name_map={OLD_NAME: ""})
     insert(tokens, j, new_src=f"{indent}import html\n")
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=(OLD_NAME,))
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if node.id == OLD_NAME and OLD_NAME in state.from_imports[MODULE]:
         yield (
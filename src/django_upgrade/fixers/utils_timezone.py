@@ -6,13 +6,14 @@ https://docs.djangoproject.com/en/4.1/releases/4.1/#id2
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable, MutableMapping
+from collections.abc import Iterable, MutableMapping, MutableSequence
 from functools import partial
 from weakref import WeakKeyDictionary
 
 from tokenize_rt import Offset, Token
 
 from django_upgrade.ast import (
+    Parents,
     ast_start_offset,
     get_module_names,
     is_rewritable_import_from,
@@ -29,14 +30,17 @@ from django_upgrade.tokens import (
 fixer = Fixer(
     __name__,
     min_version=(4, 1),
+    triggers=("utc",),
+    # Uses of utc rewrite the imports at the top of the file.
+    whole_file=True,
 )
 
 
-@fixer.register(ast.Name)
+@fixer.register(ast.Name, names=("utc",))
 def visit_Name(
     state: State,
     node: ast.Name,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.id == "utc"
@@ -51,11 +55,11 @@ def visit_Name(
         yield ast_start_offset(node), partial(replace, src=new_src)
 
 
-@fixer.register(ast.Attribute)
+@fixer.register(ast.Attribute, names=("utc",))
 def visit_Attribute(
     state: State,
     node: ast.Attribute,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         node.attr == "utc"
@@ -177,7 +181,7 @@ def maybe_rewrite_imports(
 
 
 def rewrite_imports(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.ImportFrom | None,
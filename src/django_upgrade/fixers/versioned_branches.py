@@ -9,13 +9,14 @@ else:
 from __future__ import annotations
 
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, MutableSequence
 from functools import partial
 from typing import Literal
 
 from tokenize_rt import Offset, Token
 
 from django_upgrade.ast import (
+    Parents,
     ast_start_offset,
     is_passing_comparison,
     is_sole_statement_in_block,
@@ -26,6 +27,7 @@ from django_upgrade.tokens import Block
 fixer = Fixer(
     __name__,
     min_version=(0, 0),
+    triggers=("VERSION",),
 )
 
 
@@ -33,7 +35,7 @@ fixer = Fixer(
 def visit_If(
     state: State,
     node: ast.If,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     if (
         isinstance(node.test, ast.Compare)
@@ -60,7 +62,7 @@ def visit_If(
 
 
 def _fix_block(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.If,
@@ -95,7 +97,9 @@ def _fix_block(
                 del tokens[if_block.start : if_block.end]
 
 
-def _erase_start(tokens: list[Token], if_block: Block, kept_block: Block) -> int:
+def _erase_start(
+    tokens: MutableSequence[Token], if_block: Block, kept_block: Block
+) -> int:
     """
     Index to erase the 'if ...:'/'else:' prefix from. When the kept suite is
     on the same line as its keyword, it stays there, so preserve the leading
@@ -106,7 +110,7 @@ def _erase_start(tokens: list[Token], if_block: Block, kept_block: Block) -> int
     return if_block.start
 
 
-def _find_if_else_block(tokens: list[Token], i: int) -> tuple[Block, Block]:
+def _find_if_else_block(tokens: MutableSequence[Token], i: int) -> tuple[Block, Block]:
     if_block = Block.find(tokens, i)
     i = if_block.end
     while tokens[i].src != "else":  # pragma: no cover
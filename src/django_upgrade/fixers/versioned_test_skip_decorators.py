@@ -30,6 +30,7 @@ from functools import partial
 from tokenize_rt import Offset
 
 from django_upgrade.ast import (
+    Parents,
     ast_start_offset,
     is_passing_comparison,
     is_sole_statement_in_block,
@@ -40,6 +41,7 @@ from django_upgrade.tokens import erase_decorator, erase_def
 fixer = Fixer(
     __name__,
     min_version=(0, 0),
+    triggers=("VERSION",),
 )
 
 
@@ -47,7 +49,7 @@ fixer = Fixer(
 def visit_AsyncFunctionDef(
     state: State,
     node: ast.AsyncFunctionDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     yield from _handle_decorator(state, node, parents)
 
@@ -56,7 +58,7 @@ def visit_AsyncFunctionDef(
 def visit_FunctionDef(
     state: State,
     node: ast.FunctionDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     yield from _handle_decorator(state, node, parents)
 
@@ -65,7 +67,7 @@ def visit_FunctionDef(
 def visit_ClassDef(
     state: State,
     node: ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     yield from _handle_decorator(state, node, parents)
 
@@ -73,7 +75,7 @@ def visit_ClassDef(
 def _handle_decorator(
     state: State,
     node: ast.AsyncFunctionDef | ast.FunctionDef | ast.ClassDef,
-    parents: tuple[ast.AST, ...],
+    parents: Parents,
 ) -> Iterable[tuple[Offset, TokenFunc]]:
     for decorator in node.decorator_list:
         if (
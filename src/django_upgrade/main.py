@@ -1,23 +1,51 @@
 from __future__ import annotations
 
 import argparse
+import ast
+import bisect
+import io
+import os
 import re
 import sys
-from collections.abc import Sequence
+from codecs import BOM_UTF8
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator, MutableSequence, Sequence
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
 from importlib import metadata
-from typing import Any, cast
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 from tokenize_rt import (
     UNIMPORTANT_WS,
+    Offset,
     Token,
-    reversed_enumerate,
     src_to_tokens,
     tokens_to_src,
 )
 
 from django_upgrade.ast import ast_parse
-from django_upgrade.data import FIXERS, Settings, visit
-from django_upgrade.tokens import DEDENT
+from django_upgrade.data import (
+    FIXERS,
+    Callbacks,
+    Settings,
+    TextEdit,
+    TokenFunc,
+    visit,
+)
+from django_upgrade.files import (
+    DEFAULT_EXCLUDES,
+    OverlappedIO,
+    get_changed_filenames,
+    iter_filenames,
+)
+from django_upgrade.manifest import MANIFEST
+from django_upgrade.tokens import CODE, DEDENT, GapBuffer, TokenList
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+    from django_upgrade.cache import Cache
 
 SUPPORTED_TARGET_VERSIONS = {
     (1, 7),
@@ -41,12 +69,68 @@ SUPPORTED_TARGET_VERSIONS = {
     (6, 1),
 }
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# The most passes --until-stable makes over a file, in case fixers' changes
+# never settle.
+MAX_PASSES = 10
+
+# The fewest files to start a process pool for. Fixing fewer files takes less
+# time than starting the workers.
+MIN_FILES_FOR_POOL = 16
+
+# The default for --read-ahead-bytes.
+READ_AHEAD_BYTES = 32 * 1024 * 1024
+
 
 def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["daemon"]:
+        # Modules only needed by some runs are imported where they're used,
+        # to keep startup fast for the common case of a few files.
+        from django_upgrade import daemon
+
+        return daemon.main(argv[1:])
+
     parser = argparse.ArgumentParser(prog="django-upgrade")
     parser.suggest_on_error = True
     parser.add_argument(
-        "filenames", nargs="+", help="Filenames to fix, or '-' for stdin."
+        "filenames",
+        nargs="*",
+        help="Filenames or directories to fix, or '-' for stdin.",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help=(
+            "Fix only Python files changed since the given git ref, limited to "
+            "any given filenames or directories."
+        ),
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help=(
+            "Glob pattern for files and directories to skip when walking "
+            "directories, replacing the defaults."
+        ),
+    )
+    parser.add_argument(
+        "--extend-exclude",
+        action="append",
+        metavar="PATTERN",
+        help="Glob pattern to skip when walking directories, added to the defaults.",
+    )
+    parser.add_argument(
+        "--stdin-protocol",
+        choices=["jsonl"],
+        help=(
+            "Fix many sources from stdin, as JSON lines of objects with 'path' "
+            "and 'source' keys, writing results to stdout as they finish."
+        ),
     )
     parser.add_argument(
         "--target-version",
@@ -62,11 +146,52 @@ def main(argv: Sequence[str] | None = None) -> int:
         action="store_true",
         help="Only output files to change, do not change files.",
     )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Output a unified diff of changes to stdout, do not change files.",
+    )
     parser.add_argument(
         "--exit-zero-even-if-changed",
         action="store_true",
         help="Exit with a zero return code even if files have changed.",
     )
+    parser.add_argument(
+        "--until-stable",
+        action="store_true",
+        help=(
+            "Repeatedly fix each file until it stops changing, since some fixers’ "
+            "changes enable others."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=jobs_type,
+        help="Number of parallel processes to use. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--read-ahead-bytes",
+        type=read_ahead_bytes_type,
+        metavar="N",
+        help=(
+            "When fixing files one at a time, read files ahead and write them "
+            "behind in background threads, holding at most about N bytes. "
+            "0 disables this."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            "Directory to cache results in, to skip unchanged files on later "
+            "runs. Defaults to django-upgrade in the user cache directory."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the cache.",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -91,24 +216,163 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     args = parser.parse_args(argv)
 
+    if args.stdin_protocol is not None and (
+        args.filenames or args.changed_since is not None
+    ):
+        parser.error(
+            "argument --stdin-protocol: not allowed with filenames or --changed-since"
+        )
+    if args.stdin_protocol is not None:
+        # Options that only apply to files, which would otherwise be ignored.
+        for option, given in (
+            ("--exclude", args.exclude is not None),
+            ("--extend-exclude", args.extend_exclude is not None),
+            ("--diff", args.diff),
+            ("--exit-zero-even-if-changed", args.exit_zero_even_if_changed),
+            ("--jobs", args.jobs is not None),
+            ("--read-ahead-bytes", args.read_ahead_bytes is not None),
+            ("--cache-dir", args.cache_dir is not None),
+            ("--no-cache", args.no_cache),
+        ):
+            if given:
+                parser.error(f"argument --stdin-protocol: not allowed with {option}")
+
+    if args.jobs is None:
+        args.jobs = os.cpu_count() or 1
+    if args.read_ahead_bytes is None:
+        args.read_ahead_bytes = READ_AHEAD_BYTES
+
+    if args.stdin_protocol is not None:
+        paths = []
+    elif args.changed_since is not None:
+        import subprocess
+
+        try:
+            paths = get_changed_filenames(args.changed_since, args.filenames)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            stderr = getattr(exc, "stderr", None)
+            detail = stderr.decode().strip() if stderr else str(exc)
+            parser.error(f"argument --changed-since: {detail}")
+    elif args.filenames:
+        paths = args.filenames
+    else:
+        parser.error("the following arguments are required: filenames")
+
     settings = Settings(
         target_version=get_target_version(args.target_version),
         only_fixers=set(args.only) if args.only else None,
         skip_fixers=set(args.skip) if args.skip else None,
     )
+    if args.stdin_protocol is not None:
+        return fix_stdin_jsonl(
+            settings, check=args.check, until_stable=args.until_stable
+        )
+
+    cache = None
+    if not args.no_cache:
+        from django_upgrade.cache import Cache, default_cache_dir
+
+        cache = Cache(args.cache_dir or default_cache_dir(), settings)
+
+    filenames = iter_filenames(
+        paths,
+        excludes=chain(
+            DEFAULT_EXCLUDES if args.exclude is None else args.exclude,
+            args.extend_exclude or (),
+        ),
+    )
+    # Peek so that small runs, such as single files from pre-commit, don't pay
+    # for starting a process pool.
+    first_filenames = list(islice(filenames, MIN_FILES_FOR_POOL))
+    filenames = chain(first_filenames, filenames)
 
     ret = 0
-    for filename in args.filenames:
-        ret |= fix_file(
-            filename,
-            settings,
-            exit_zero_even_if_changed=args.exit_zero_even_if_changed,
-            check=args.check,
-        )
+    if (
+        args.jobs > 1
+        and len(first_filenames) >= MIN_FILES_FOR_POOL
+        and "-" not in paths
+    ):
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=args.jobs, initializer=_init_worker, initargs=(settings,)
+        ) as executor:
+            results = map_in_order(
+                executor,
+                partial(
+                    _fix_files_captured,
+                    exit_zero_even_if_changed=args.exit_zero_even_if_changed,
+                    check=args.check,
+                    until_stable=args.until_stable,
+                    diff=args.diff,
+                    cache=cache,
+                ),
+                batched(filenames, 4),
+                window=4 * args.jobs,
+            )
+            # Results are yielded in input order, so output is deterministic
+            # however the work is scheduled.
+            for batch, added in results:
+                for returncode, out, err in batch:
+                    sys.stdout.write(out)
+                    sys.stderr.write(err)
+                    ret |= returncode
+                # Workers add to copies of the cache, so count their entries
+                # here for pruning.
+                if cache is not None:
+                    cache.added += added
+    elif args.read_ahead_bytes > 0 and len(first_filenames) > 1 and "-" not in paths:
+        with OverlappedIO(args.read_ahead_bytes) as overlapped_io:
+            for filename, contents_bytes in overlapped_io.read(filenames):
+                ret |= fix_file(
+                    filename,
+                    settings,
+                    exit_zero_even_if_changed=args.exit_zero_even_if_changed,
+                    check=args.check,
+                    until_stable=args.until_stable,
+                    diff=args.diff,
+                    cache=cache,
+                    contents_bytes=contents_bytes,
+                    overlapped_io=overlapped_io,
+                )
+    else:
+        for filename in filenames:
+            ret |= fix_file(
+                filename,
+                settings,
+                exit_zero_even_if_changed=args.exit_zero_even_if_changed,
+                check=args.check,
+                until_stable=args.until_stable,
+                diff=args.diff,
+                cache=cache,
+            )
+
+    if cache is not None:
+        cache.prune()
 
     return ret
 
 
+def jobs_type(string: str) -> int:
+    try:
+        jobs = int(string)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"Must be a positive integer: {string!r}")
+    return jobs
+
+
+def read_ahead_bytes_type(string: str) -> int:
+    try:
+        size = int(string)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"Must be a non-negative integer: {string!r}")
+    return size
+
+
 def fixer_type(string: str) -> str:
     if string not in FIXERS:
         raise argparse.ArgumentTypeError(f"Unknown fixer: {string!r}")
@@ -205,73 +469,587 @@ def get_target_version(string: str) -> tuple[int, int]:
     return default
 
 
+_worker_settings: Settings | None = None
+
+
+def _init_worker(settings: Settings) -> None:
+    # Send the settings once per worker, rather than with each batch of
+    # files, so their cached dispatch tables are reused for the whole run.
+    global _worker_settings
+    _worker_settings = settings
+    # Import the fixers that can run up front, rather than in the middle of
+    # the worker's first batch.
+    for name in settings.enabled_fixers:
+        if MANIFEST[name].min_version <= settings.target_version:
+            FIXERS[name]
+
+
+def _fix_files_captured(
+    filenames: list[str],
+    exit_zero_even_if_changed: bool,
+    check: bool,
+    until_stable: bool,
+    diff: bool,
+    cache: Cache | None,
+) -> tuple[list[tuple[int, str, str]], int]:
+    """
+    Run fix_file() on a batch of files in a worker process, returning each
+    one's exit code and stdout and stderr output, for the parent to print in
+    order, and the number of cache entries added.
+    """
+    assert _worker_settings is not None
+    added = cache.added if cache is not None else 0
+    results = []
+    for filename in filenames:
+        out = io.StringIO()
+        err = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            returncode = fix_file(
+                filename,
+                _worker_settings,
+                exit_zero_even_if_changed=exit_zero_even_if_changed,
+                check=check,
+                until_stable=until_stable,
+                diff=diff,
+                cache=cache,
+            )
+        results.append((returncode, out.getvalue(), err.getvalue()))
+    if cache is not None:
+        added = cache.added - added
+    return results, added
+
+
+def map_in_order(
+    executor: Executor,
+    fn: Callable[[T], R],
+    iterable: Iterable[T],
+    window: int,
+) -> Iterator[R]:
+    """
+    Like executor.map(), but only submit calls up to window ahead of the
+    result being waited for, so inputs and results held in memory are
+    bounded however long the input.
+    """
+    pending: deque[Future[R]] = deque()
+    for item in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def batched(iterable: Iterable[T], n: int) -> Iterator[list[T]]:
+    # Like itertools.batched(), new in Python 3.12.
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+
 def fix_file(
     filename: str,
     settings: Settings,
     exit_zero_even_if_changed: bool,
     check: bool,
+    until_stable: bool = False,
+    diff: bool = False,
+    cache: Cache | None = None,
+    contents_bytes: bytes | None = None,
+    overlapped_io: OverlappedIO | None = None,
 ) -> int:
-    if filename == "-":
-        contents_bytes = sys.stdin.buffer.read()
-    else:
-        with open(filename, "rb") as fb:
-            contents_bytes = fb.read()
+    """
+    Fix the file, or stdin for "-", and return the exit code. Pass
+    contents_bytes if the file has already been read, and overlapped_io to
+    write the file through it.
+    """
+    if contents_bytes is None:
+        if filename == "-":
+            contents_bytes = sys.stdin.buffer.read()
+        else:
+            with open(filename, "rb") as fb:
+                contents_bytes = fb.read()
 
-    try:
-        contents_text_orig = contents_text = contents_bytes.decode()
-    except UnicodeDecodeError:
-        print(f"{filename} is non-utf-8 (not supported)", file=sys.stderr)
-        return 1
+    if not contents_bytes.isascii():
+        try:
+            contents_bytes.decode()
+        except UnicodeDecodeError:
+            print(f"{filename} is non-utf-8 (not supported)", file=sys.stderr)
+            return 1
 
-    contents_text = apply_fixers(contents_text, settings, filename)
+    contents = contents_bytes
+    passes = 0
+    if cache is None or (cache_key := cache.key(filename, contents_bytes)) not in cache:
+        if until_stable:
+            contents, passes = apply_fixers_until_stable(contents, settings, filename)
+        else:
+            contents = apply_fixers_bytes(contents, settings, filename)
+        # Only record unchanged files, since a rewritten file is not
+        # guaranteed to be stable under a second run.
+        if cache is not None and contents is contents_bytes:
+            cache.add(cache_key)
 
     returncode = 0
-    if contents_text != contents_text_orig:
+    if contents is not contents_bytes:
+        passes_note = ""
+        if until_stable:
+            passes_note = f" ({passes} pass{'es' if passes > 1 else ''})"
+        display_name = "stdin" if filename == "-" else filename
         if check:
-            display_name = "stdin" if filename == "-" else filename
-            print(f"Would rewrite {display_name}", file=sys.stderr)
+            print(f"Would rewrite {display_name}{passes_note}", file=sys.stderr)
             returncode = 1
-        else:
+        if diff:
+            sys.stdout.write(unified_diff(display_name, contents_bytes, contents))
+            if not exit_zero_even_if_changed:
+                returncode = 1
+        elif not check:
             if filename == "-":
-                print(contents_text, end="")
+                print(contents.decode(), end="")
             else:
-                print(f"Rewriting {filename}", file=sys.stderr)
-                with open(filename, "w", encoding="UTF-8", newline="") as f:
-                    f.write(contents_text)
+                print(f"Rewriting {filename}{passes_note}", file=sys.stderr)
+                if overlapped_io is not None:
+                    overlapped_io.write(filename, contents)
+                else:
+                    with open(filename, "wb") as fb:
+                        fb.write(contents)
                 if not exit_zero_even_if_changed:
                     returncode = 1
     else:
-        if filename == "-" and not check:
-            print(contents_text, end="")
+        if filename == "-" and not check and not diff:
+            print(contents.decode(), end="")
 
     return returncode
 
 
-def apply_fixers(contents_text: str, settings: Settings, filename: str) -> str:
+def fix_stdin_jsonl(settings: Settings, check: bool, until_stable: bool) -> int:
+    """
+    Fix sources read from stdin as JSON lines, each an object with the keys
+    "path", used for filename-based fixer conditions, and "source". Write a
+    JSON line to stdout for each as soon as it is fixed, with the keys "path",
+    "source", "changed", and "fixers", the sorted names of the fixers that
+    changed it, or "error" if the line was invalid. Return the exit code.
+    """
+    # Imported here rather than at the top to keep startup cheap.
+    import json
+
+    returncode = 0
+    for line_number, line in enumerate(sys.stdin.buffer, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            path = record["path"]
+            source = record["source"]
+            if not isinstance(path, str) or not isinstance(source, str):
+                raise ValueError("path and source must be strings")
+            contents = source.encode()
+        except (KeyError, TypeError, ValueError) as exc:
+            result: dict[str, Any] = {
+                "error": f"Invalid record on line {line_number}: {exc}"
+            }
+            returncode = 1
+        else:
+            applied: set[str] = set()
+            if until_stable:
+                new_contents, _ = apply_fixers_until_stable(
+                    contents, settings, path, applied=applied
+                )
+            else:
+                new_contents = apply_fixers_bytes(contents, settings, path, applied)
+            changed = new_contents is not contents
+            result = {
+                "path": path,
+                "source": new_contents.decode() if changed else source,
+                "changed": changed,
+                "fixers": sorted(applied),
+            }
+            if changed and check:
+                returncode = 1
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+    return returncode
+
+
+def apply_fixers(
+    contents_text: str,
+    settings: Settings,
+    filename: str,
+    applied: set[str] | None = None,
+) -> str:
+    contents = contents_text.encode()
+    new_contents = apply_fixers_bytes(contents, settings, filename, applied)
+    if new_contents is contents:
+        return contents_text
+    return new_contents.decode()
+
+
+def apply_fixers_bytes(
+    contents: bytes,
+    settings: Settings,
+    filename: str,
+    applied: set[str] | None = None,
+) -> bytes:
+    """
+    Apply the fixers to UTF-8 source, decoding only the parts that need
+    tokenizing. Return the same object if nothing changed, so callers can
+    check for changes by identity. If the source changes, add the names of the
+    fixers that changed it to applied, if given.
+    """
+    if (
+        settings.triggers_re is not None
+        and settings.triggers_re.search(contents) is None
+    ):
+        return contents
+
+    if contents.startswith(BOM_UTF8):
+        # ast measures columns on the first line after a byte order mark,
+        # whilst tokens and byte offsets include it, so fix the source
+        # without it.
+        body = contents[len(BOM_UTF8) :]
+        new_body = apply_fixers_bytes(body, settings, filename, applied)
+        if new_body is body:
+            return contents
+        return BOM_UTF8 + new_body
+
     try:
-        ast_obj = ast_parse(contents_text)
+        ast_obj = ast_parse(contents)
     except SyntaxError:
-        return contents_text
+        return contents
 
     callbacks = visit(ast_obj, settings, filename)
 
-    if not callbacks:
-        return contents_text
+    if callbacks and lone_carriage_return_re.search(contents) is not None:
+        # ast counts a lone "\r" as a line break but tokenize doesn't, so
+        # tokens' positions can't be matched with nodes'. Skip token functions
+        # rather than apply them partially, and apply only text edits, which
+        # use node positions directly.
+        callbacks.clear()
+        callbacks.whole_file = False
+
+    if not callbacks and not callbacks.edits:
+        return contents
+
+    if callbacks.whole_file:
+        for edit in callbacks.edits:
+            callbacks[edit.start].append(partial(apply_text_edit, edit=edit))
+
+        tokens = src_to_tokens(contents.decode())
+
+        fixup_dedent_tokens(tokens)
+
+        new_tokens = apply_callbacks(tokens, callbacks)
+
+        new_contents: bytes = tokens_to_src(new_tokens).encode()
+    else:
+        new_contents = apply_callbacks_by_region(contents, ast_obj, callbacks, filename)
+
+    # Token functions may decline to change anything.
+    if new_contents == contents:
+        return contents
+    if applied is not None:
+        applied.update(callbacks.fixers)
+    return new_contents
+
+
+def apply_callbacks_by_region(
+    contents: bytes,
+    tree: ast.Module,
+    callbacks: Callbacks,
+    filename: str,
+) -> bytes:
+    """
+    Apply the callbacks, tokenizing only the regions of the file around the
+    top-level statements that they change, rather than the whole file. Each
+    statement's region extends over any blank lines and comments up to the
+    neighbouring statements, which token functions may change, so regions of
+    adjacent statements are merged.
+
+    Text edits in a region run as token functions, in order with the others.
+    Text edits elsewhere are applied directly at their byte offsets, and each
+    region's new source replaces it as another edit, in a single join. Text
+    edits that overlap are skipped, with a message naming their fixers.
+    """
+    # First and last lines of each top-level statement, grouping statements
+    # that share lines.
+    stmt_starts: list[int] = []
+    stmt_ends: list[int] = []
+    for stmt in tree.body:
+        start = stmt.lineno
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([start, *(d.lineno for d in stmt.decorator_list)])
+        end = cast(int, stmt.end_lineno)
+        if stmt_ends and start <= stmt_ends[-1]:
+            stmt_ends[-1] = end
+        else:
+            stmt_starts.append(start)
+            stmt_ends.append(end)
+
+    # Each region's first and last statement, and callbacks.
+    regions: list[tuple[int, int, dict[Offset, list[TokenFunc]]]] = []
+    for offset in sorted(callbacks):
+        index = bisect.bisect_right(stmt_starts, offset.line) - 1
+        if regions and index <= regions[-1][1] + 1:
+            first, _, region_callbacks = regions[-1]
+            regions[-1] = (first, index, region_callbacks)
+        else:
+            region_callbacks = {}
+            regions.append((index, index, region_callbacks))
+        region_callbacks[offset] = callbacks[offset]
+
+    line_starts = [0, *(match.end() for match in newline_re.finditer(contents))]
+    # Replacements by byte index: start, end, new source, and for text edits,
+    # the fixer they come from.
+    edit_replacements: list[tuple[int, int, bytes, str]] = []
+    for edit, fixer_name in callbacks.edits.items():
+        index = bisect.bisect_right(stmt_starts, edit.start.line) - 1
+        region = bisect.bisect_right(regions, index, key=lambda region: region[0]) - 1
+        if region >= 0 and index <= regions[region][1]:
+            region_callbacks = regions[region][2]
+            region_callbacks.setdefault(edit.start, []).append(
+                partial(apply_text_edit, edit=edit)
+            )
+        else:
+            edit_replacements.append(
+                (
+                    line_starts[edit.start.line - 1] + edit.start.utf8_byte_offset,
+                    line_starts[edit.end.line - 1] + edit.end.utf8_byte_offset,
+                    edit.src.encode(),
+                    fixer_name,
+                )
+            )
+    replacements, conflicting_fixers = drop_conflicting_replacements(edit_replacements)
+    if conflicting_fixers:
+        print(
+            f"{filename}: skipped overlapping changes from "
+            f"{', '.join(sorted(conflicting_fixers))}",
+            file=sys.stderr,
+        )
+
+    # Run regions from the end of the file backwards, as in a single token
+    # list, since token functions may rely on later ones having run.
+    for first, last, region_callbacks in reversed(regions):
+        start_line = stmt_ends[first - 1] + 1 if first > 0 else 1
+        start = line_starts[start_line - 1]
+        if last + 1 < len(stmt_starts):
+            end = line_starts[stmt_starts[last + 1] - 1]
+        else:
+            end = len(contents)
+
+        tokens = src_to_tokens(contents[start:end].decode())
+        # Number lines as in the whole file, to match the AST nodes that
+        # callbacks use.
+        if start_line > 1:
+            tokens = [
+                token._replace(line=token.line + start_line - 1) for token in tokens
+            ]
+        fixup_dedent_tokens(tokens)
+        new_tokens = apply_callbacks(tokens, region_callbacks)
+        replacements.append((start, end, tokens_to_src(new_tokens).encode()))
 
-    tokens = src_to_tokens(contents_text)
+    replacements.sort(key=lambda replacement: replacement[0])
+    parts = []
+    position = 0
+    for start, end, src in replacements:
+        parts.append(contents[position:start])
+        parts.append(src)
+        position = end
+    parts.append(contents[position:])
+    return b"".join(parts)
 
-    fixup_dedent_tokens(tokens)
 
-    for i, token in reversed_enumerate(tokens):
-        if not token.src:
+# Line breaks as ast counts them, to find the start of each of its lines.
+newline_re = re.compile(rb"\r\n|\r|\n")
+lone_carriage_return_re = re.compile(rb"\r(?!\n)")
+
+
+def drop_conflicting_replacements(
+    replacements: list[tuple[int, int, bytes, str]],
+) -> tuple[list[tuple[int, int, bytes]], set[str]]:
+    """
+    Sort the replacements, each with the name of its fixer, by position. Drop
+    duplicates, and any that overlap an earlier one, such as edits from
+    different fixers to the same node. Return the kept replacements and the
+    names of the fixers whose replacements conflicted. The next pass of
+    apply_fixers_until_stable() can redo a dropped edit if it still applies.
+    """
+    kept: list[tuple[int, int, bytes]] = []
+    kept_fixers: list[str] = []
+    conflicting_fixers: set[str] = set()
+    for start, end, src, fixer_name in sorted(replacements, key=lambda r: (r[0], r[1])):
+        if kept and (start, end, src) == kept[-1]:
+            continue
+        if kept and (start < kept[-1][1] or start == kept[-1][0] == kept[-1][1] == end):
+            conflicting_fixers.update((kept_fixers[-1], fixer_name))
             continue
-        # though this is a defaultdict, by using `.get()` this function's
-        # self time is almost 50% faster
-        for callback in callbacks.get(token.offset, ()):
-            callback(tokens, i)
+        kept.append((start, end, src))
+        kept_fixers.append(fixer_name)
+    return kept, conflicting_fixers
+
+
+def apply_text_edit(tokens: MutableSequence[Token], i: int, *, edit: TextEdit) -> None:
+    """
+    Token function to apply a text edit, for edits in tokenized source.
+    Replace the tokens from i, at the edit's start, up to its end.
+    """
+    j = i
+    while (token := tokens[j]).line is None or (
+        token.line,
+        token.utf8_byte_offset,
+    ) < edit.end:
+        j += 1
+    tokens[i:j] = [Token(CODE, edit.src)]
+
+
+def apply_fixers_until_stable(
+    contents: bytes,
+    settings: Settings,
+    filename: str,
+    max_passes: int = MAX_PASSES,
+    applied: set[str] | None = None,
+) -> tuple[bytes, int]:
+    """
+    Apply fixers repeatedly until a pass makes no changes, or max_passes
+    passes have made changes. Return the new source and the number of passes
+    that made changes.
+
+    After the first pass, only fixers that could act on the previous pass’s
+    changes are run: those with a trigger in the changed lines, before or
+    after the change, or without triggers.
+    """
+    passes = 0
+    pass_settings = settings
+    while passes < max_passes:
+        new_contents = apply_fixers_bytes(contents, pass_settings, filename, applied)
+        if new_contents is contents:
+            break
+        passes += 1
+
+        changed = changed_lines(contents, new_contents)
+        rerun_fixers = frozenset(
+            name
+            for name in settings.enabled_fixers
+            if (triggers := MANIFEST[name].triggers) is None
+            or any(trigger.encode() in changed for trigger in triggers)
+        )
+        contents = new_contents
+        if not rerun_fixers:
+            break
+        try:
+            pass_settings = settings.rerun_settings[rerun_fixers]
+        except KeyError:
+            pass_settings = settings.rerun_settings[rerun_fixers] = Settings(
+                target_version=settings.target_version,
+                only_fixers=set(rerun_fixers),
+            )
+    return contents, passes
+
+
+def unified_diff(name: str, old_contents: bytes, new_contents: bytes) -> str:
+    """
+    Return a unified diff of the change to the named file, marking a last
+    line without a newline as diff and patch do.
+    """
+    import difflib
+
+    parts = []
+    for line in difflib.unified_diff(
+        split_lines(old_contents.decode()),
+        split_lines(new_contents.decode()),
+        fromfile=name,
+        tofile=name,
+    ):
+        parts.append(line)
+        if not line.endswith("\n"):
+            parts.append("\n\\ No newline at end of file\n")
+    return "".join(parts)
+
+
+def split_lines(text: str) -> list[str]:
+    # Split on newlines only, unlike str.splitlines(), which also splits on
+    # characters like form feeds that Python source may contain.
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def changed_lines(old_contents: bytes, new_contents: bytes) -> bytes:
+    """
+    Return the lines that differ between the two sources, from both sides:
+    those removed from the old source and those added in the new one.
+    """
+    # Compare lines as multisets rather than diffing them, which takes
+    # quadratic time on large files. This only misses unchanged lines that
+    # moved, which fixers have already seen.
+    old_counts = Counter(old_contents.splitlines(keepends=True))
+    new_counts = Counter(new_contents.splitlines(keepends=True))
+    return b"".join(
+        chain(
+            (old_counts - new_counts).elements(),
+            (new_counts - old_counts).elements(),
+        )
+    )
+
 
-    # no types for tokenize-rt
-    return tokens_to_src(tokens)  # type: ignore [no-any-return]
+# Above this many tokens times callbacks, list inserts and deletes cost more
+# than indexing into a GapBuffer.
+GAP_BUFFER_THRESHOLD = 50_000_000
+
+
+def apply_callbacks(
+    tokens: list[Token], callbacks: dict[Offset, list[TokenFunc]]
+) -> MutableSequence[Token]:
+    """
+    Run the callbacks on the tokens at their offsets, from the end of the file
+    backwards, so each callback's changes don't move the tokens of those yet
+    to run. Return the changed tokens, which may be in a new container.
+    """
+    # Find each callback's token before any callback changes the tokens.
+    targets = [
+        (offset, i)
+        for offset in sorted(callbacks)
+        if (i := find_offset_index(tokens, offset)) is not None
+    ]
+    new_tokens: MutableSequence[Token]
+    if len(tokens) * len(targets) > GAP_BUFFER_THRESHOLD:
+        new_tokens = GapBuffer(tokens)
+    else:
+        new_tokens = TokenList(tokens)
+    limit = len(new_tokens)
+    for offset, i in reversed(targets):
+        if i >= limit or new_tokens[i].offset != offset:
+            # A callback changed tokens before its own, so search for the
+            # token again, as a backwards scan over the tokens would.
+            i = next(
+                (
+                    j
+                    for j in range(min(limit, len(new_tokens)) - 1, -1, -1)
+                    if new_tokens[j].src and new_tokens[j].offset == offset
+                ),
+                -1,
+            )
+            if i == -1:
+                continue
+        for callback in callbacks[offset]:
+            callback(new_tokens, i)
+        limit = i
+    return new_tokens
+
+
+def find_offset_index(tokens: list[Token], offset: Offset) -> int | None:
+    """
+    Return the index of the token with source at the given offset, or None if
+    there is no such token. Tokens are ordered by line, so bisect to the
+    line's first token, then scan along the line.
+    """
+    start = bisect.bisect_left(tokens, offset.line, key=lambda token: token.line)
+    for i in range(start, len(tokens)):
+        token = tokens[i]
+        if token.line != offset.line:
+            break
+        if token.utf8_byte_offset == offset.utf8_byte_offset and token.src:
+            return i
+    return None
 
 
 def fixup_dedent_tokens(tokens: list[Token]) -> None:
@@ -0,0 +1,448 @@
+"""
+Details of every fixer, for selecting fixers without importing them.
+
+Generated by render_manifest() in data.py - do not edit. Regenerate it after
+adding or changing fixers with:
+
+python -c "from django_upgrade.data import write_manifest; write_manifest()"
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class FixerInfo(NamedTuple):
+    min_version: tuple[int, int]
+    # Name of the State attribute that must be true for the fixer to apply,
+    # if any.
+    condition: str | None
+    node_types: tuple[str, ...]
+    triggers: tuple[str, ...] | None
+
+
+MANIFEST: dict[str, FixerInfo] = {
+    "admin_allow_tags": FixerInfo(
+        min_version=(2, 0),
+        condition=None,
+        node_types=("Assign",),
+        triggers=("allow_tags",),
+    ),
+    "admin_decorators": FixerInfo(
+        min_version=(3, 2),
+        condition=None,
+        node_types=(
+            "ClassDef",
+            "Module",
+        ),
+        triggers=(
+            "admin_order_field",
+            "allowed_permissions",
+            "boolean",
+            "empty_value_display",
+            "short_description",
+        ),
+    ),
+    "admin_lookup_needs_distinct": FixerInfo(
+        min_version=(4, 0),
+        condition=None,
+        node_types=(
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("lookup_needs_distinct",),
+    ),
+    "admin_register": FixerInfo(
+        min_version=(1, 7),
+        condition=None,
+        node_types=(
+            "Call",
+            "ClassDef",
+        ),
+        triggers=("register",),
+    ),
+    "assert_form_error": FixerInfo(
+        min_version=(4, 1),
+        condition="looks_like_test_file",
+        node_types=("Call",),
+        triggers=(
+            "assertFormError",
+            "assertFormsetError",
+        ),
+    ),
+    "assert_set_methods": FixerInfo(
+        min_version=(4, 2),
+        condition="looks_like_test_file",
+        node_types=("Call",),
+        triggers=(
+            "assertFormsetError",
+            "assertQuerysetEqual",
+        ),
+    ),
+    "check_constraint_condition": FixerInfo(
+        min_version=(5, 1),
+        condition=None,
+        node_types=("Call",),
+        triggers=("CheckConstraint",),
+    ),
+    "compatibility_imports": FixerInfo(
+        min_version=(0, 0),
+        condition=None,
+        node_types=("ImportFrom",),
+        triggers=("django",),
+    ),
+    "crypto_get_random_string": FixerInfo(
+        min_version=(3, 1),
+        condition=None,
+        node_types=("Call",),
+        triggers=("get_random_string",),
+    ),
+    "default_app_config": FixerInfo(
+        min_version=(3, 2),
+        condition="looks_like_dunder_init_file",
+        node_types=("Assign",),
+        triggers=("default_app_config",),
+    ),
+    "default_auto_field": FixerInfo(
+        min_version=(6, 0),
+        condition="looks_like_settings_file",
+        node_types=("Assign",),
+        triggers=("DEFAULT_AUTO_FIELD",),
+    ),
+    "django_urls": FixerInfo(
+        min_version=(2, 0),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+        ),
+        triggers=(
+            "re_path",
+            "url",
+        ),
+    ),
+    "email_validator": FixerInfo(
+        min_version=(3, 2),
+        condition=None,
+        node_types=("Call",),
+        triggers=("whitelist",),
+    ),
+    "format_html": FixerInfo(
+        min_version=(5, 0),
+        condition=None,
+        node_types=("Call",),
+        triggers=("format_html",),
+    ),
+    "forms_model_multiple_choice_field": FixerInfo(
+        min_version=(3, 1),
+        condition=None,
+        node_types=("Call",),
+        triggers=("ModelMultipleChoiceField",),
+    ),
+    "index_together": FixerInfo(
+        min_version=(4, 2),
+        condition="looks_like_models_file",
+        node_types=("ClassDef",),
+        triggers=("index_together",),
+    ),
+    "mail_api_kwargs": FixerInfo(
+        min_version=(6, 0),
+        condition=None,
+        node_types=("Call",),
+        triggers=(
+            "EmailMessage",
+            "EmailMultiAlternatives",
+            "get_connection",
+            "mail_admins",
+            "mail_managers",
+            "send_mail",
+            "send_mass_mail",
+        ),
+    ),
+    "mail_fail_silently": FixerInfo(
+        min_version=(6, 1),
+        condition=None,
+        node_types=("Call",),
+        triggers=("fail_silently",),
+    ),
+    "mail_get_connection": FixerInfo(
+        min_version=(6, 1),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+        ),
+        triggers=("get_connection",),
+    ),
+    "management_commands": FixerInfo(
+        min_version=(3, 2),
+        condition="looks_like_command_file",
+        node_types=("Assign",),
+        triggers=("requires_system_checks",),
+    ),
+    "model_field_choices": FixerInfo(
+        min_version=(5, 0),
+        condition="looks_like_models_file",
+        node_types=("Call",),
+        triggers=("Choices",),
+    ),
+    "null_boolean_field": FixerInfo(
+        min_version=(3, 1),
+        condition="looks_like_models_file",
+        node_types=(
+            "Call",
+            "ImportFrom",
+        ),
+        triggers=("NullBooleanField",),
+    ),
+    "on_delete": FixerInfo(
+        min_version=(1, 9),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+        ),
+        triggers=(
+            "ForeignKey",
+            "OneToOneField",
+        ),
+    ),
+    "password_reset_timeout_days": FixerInfo(
+        min_version=(3, 1),
+        condition="looks_like_settings_file",
+        node_types=("Assign",),
+        triggers=("PASSWORD_RESET_TIMEOUT_DAYS",),
+    ),
+    "permalink": FixerInfo(
+        min_version=(1, 11),
+        condition=None,
+        node_types=(
+            "FunctionDef",
+            "ImportFrom",
+        ),
+        triggers=("permalink",),
+    ),
+    "postgres_aggregate_order_by": FixerInfo(
+        min_version=(5, 2),
+        condition=None,
+        node_types=("Call",),
+        triggers=("ordering",),
+    ),
+    "postgres_float_range_field": FixerInfo(
+        min_version=(2, 2),
+        condition=None,
+        node_types=(
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("FloatRangeField",),
+    ),
+    "queryset_paginator": FixerInfo(
+        min_version=(2, 2),
+        condition=None,
+        node_types=(
+            "Attribute",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("QuerySetPaginator",),
+    ),
+    "render_to_response": FixerInfo(
+        min_version=(2, 0),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+        ),
+        triggers=("render_to_response",),
+    ),
+    "request_headers": FixerInfo(
+        min_version=(2, 2),
+        condition=None,
+        node_types=(
+            "Call",
+            "Compare",
+            "Subscript",
+        ),
+        triggers=("META",),
+    ),
+    "request_user_attributes": FixerInfo(
+        min_version=(1, 10),
+        condition=None,
+        node_types=("Call",),
+        triggers=(
+            "is_anonymous",
+            "is_authenticated",
+        ),
+    ),
+    "settings_admins_managers": FixerInfo(
+        min_version=(6, 0),
+        condition="looks_like_settings_file",
+        node_types=("Assign",),
+        triggers=(
+            "ADMINS",
+            "MANAGERS",
+        ),
+    ),
+    "settings_database_postgresql": FixerInfo(
+        min_version=(1, 9),
+        condition="looks_like_settings_file",
+        node_types=("Dict",),
+        triggers=("DATABASES",),
+    ),
+    "settings_forms_urlfield_assume_https": FixerInfo(
+        min_version=(6, 0),
+        condition="looks_like_settings_file",
+        node_types=("Assign",),
+        triggers=("FORMS_URLFIELD_ASSUME_HTTPS",),
+    ),
+    "settings_storages": FixerInfo(
+        min_version=(4, 2),
+        condition="looks_like_settings_file",
+        node_types=(
+            "Assign",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=(
+            "DEFAULT_FILE_STORAGE",
+            "STATICFILES_STORAGE",
+        ),
+    ),
+    "signal_providing_args": FixerInfo(
+        min_version=(3, 1),
+        condition=None,
+        node_types=("Call",),
+        triggers=("Signal",),
+    ),
+    "staticfiles_find_all": FixerInfo(
+        min_version=(5, 2),
+        condition=None,
+        node_types=("Call",),
+        triggers=("staticfiles",),
+    ),
+    "stringagg": FixerInfo(
+        min_version=(6, 0),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("StringAgg",),
+    ),
+    "test_http_headers": FixerInfo(
+        min_version=(4, 2),
+        condition="looks_like_test_file",
+        node_types=("Call",),
+        triggers=("HTTP_",),
+    ),
+    "testcase_databases": FixerInfo(
+        min_version=(2, 2),
+        condition="looks_like_test_file",
+        node_types=("Assign",),
+        triggers=(
+            "allow_database_queries",
+            "multi_db",
+        ),
+    ),
+    "timezone_fixedoffset": FixerInfo(
+        min_version=(2, 2),
+        condition=None,
+        node_types=(
+            "Call",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("FixedOffset",),
+    ),
+    "transaction_savepoint": FixerInfo(
+        min_version=(6, 1),
+        condition=None,
+        node_types=(
+            "Attribute",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("savepoint",),
+    ),
+    "use_l10n": FixerInfo(
+        min_version=(4, 0),
+        condition="looks_like_settings_file",
+        node_types=("Assign",),
+        triggers=("USE_L10N",),
+    ),
+    "utils_encoding": FixerInfo(
+        min_version=(3, 0),
+        condition=None,
+        node_types=(
+            "Attribute",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=(
+            "force_text",
+            "smart_text",
+        ),
+    ),
+    "utils_http": FixerInfo(
+        min_version=(3, 0),
+        condition=None,
+        node_types=(
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=(
+            "is_safe_url",
+            "urlquote",
+            "urlunquote",
+        ),
+    ),
+    "utils_text": FixerInfo(
+        min_version=(3, 0),
+        condition=None,
+        node_types=(
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=("unescape_entities",),
+    ),
+    "utils_timezone": FixerInfo(
+        min_version=(4, 1),
+        condition=None,
+        node_types=(
+            "Attribute",
+            "Name",
+        ),
+        triggers=("utc",),
+    ),
+    "utils_translation": FixerInfo(
+        min_version=(3, 0),
+        condition=None,
+        node_types=(
+            "Attribute",
+            "ImportFrom",
+            "Name",
+        ),
+        triggers=(
+            "ugettext",
+            "ungettext",
+        ),
+    ),
+    "versioned_branches": FixerInfo(
+        min_version=(0, 0),
+        condition=None,
+        node_types=("If",),
+        triggers=("VERSION",),
+    ),
+    "versioned_test_skip_decorators": FixerInfo(
+        min_version=(0, 0),
+        condition=None,
+        node_types=(
+            "AsyncFunctionDef",
+            "ClassDef",
+            "FunctionDef",
+        ),
+        triggers=("VERSION",),
+    ),
+}
@@ -3,6 +3,8 @@ from __future__ import annotations
 import ast
 import re
 from collections import defaultdict
+from collections.abc import Iterable, Iterator, MutableSequence
+from typing import overload
 
 from tokenize_rt import NON_CODING_TOKENS, UNIMPORTANT_WS, Token
 
@@ -17,10 +19,144 @@ OP = "OP"
 PHYSICAL_NEWLINE = "NL"
 STRING = "STRING"
 
+
+# For each line, the index of its first token and the token itself.
+LineStarts = dict[int, tuple[int, Token]]
+# For each opening bracket or INDENT found so far, its token, and the index
+# and token of its closing bracket or DEDENT.
+BracketPairs = dict[int, tuple[Token, int, Token]]
+
+
+class TokenList(list[Token]):
+    """
+    A list of tokens with slots for find_line_start() and find_closing() to
+    cache indexes of where each line starts and where each bracket closes.
+    """
+
+    __slots__ = ("line_starts", "bracket_pairs")
+
+    def __init__(self, tokens: Iterable[Token] = ()) -> None:
+        super().__init__(tokens)
+        self.line_starts: LineStarts | None = None
+        self.bracket_pairs: BracketPairs | None = None
+
+
+class GapBuffer(MutableSequence[Token]):
+    """
+    A token sequence that is cheap to edit near the last edit. Tokens are
+    kept in two lists either side of a gap, the tail reversed, so inserting
+    or deleting at the gap is O(1) and moving the gap costs the distance it
+    moves. Callbacks run from the end of the file backwards, so the gap moves
+    O(n) in total, whereas each edit to a list moves all following tokens.
+
+    Indexing costs more than for a list, so this only pays off for many
+    edits to a long sequence.
+    """
+
+    __slots__ = ("_head", "_tail", "line_starts", "bracket_pairs")
+
+    def __init__(self, tokens: Iterable[Token] = ()) -> None:
+        self._head: list[Token] = list(tokens)
+        self._tail: list[Token] = []
+        self.line_starts: LineStarts | None = None
+        self.bracket_pairs: BracketPairs | None = None
+
+    def _move_gap(self, index: int) -> None:
+        head = self._head
+        tail = self._tail
+        if index < len(head):
+            tail.extend(reversed(head[index:]))
+            del head[index:]
+        elif index > len(head):
+            count = index - len(head)
+            head.extend(reversed(tail[-count:]))
+            del tail[-count:]
+
+    def _locate(self, index: int) -> tuple[list[Token], int]:
+        """
+        Return the list holding the token at index and its position there.
+        """
+        head = self._head
+        if 0 <= index < len(head):
+            return head, index
+        length = len(head) + len(self._tail)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("GapBuffer index out of range")
+        if index < len(head):
+            return head, index
+        return self._tail, ~(index - len(head))
+
+    def _slice_bounds(self, key: slice) -> tuple[int, int]:
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            raise ValueError("GapBuffer slices cannot have a step.")
+        return start, max(start, stop)
+
+    def __len__(self) -> int:
+        return len(self._head) + len(self._tail)
+
+    def __iter__(self) -> Iterator[Token]:
+        yield from self._head
+        yield from reversed(self._tail)
+
+    @overload
+    def __getitem__(self, key: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[Token]: ...
+
+    def __getitem__(self, key: int | slice) -> Token | list[Token]:
+        if isinstance(key, slice):
+            start, stop = self._slice_bounds(key)
+            self._move_gap(stop)
+            return self._head[start:stop]
+        container, index = self._locate(key)
+        return container[index]
+
+    @overload
+    def __setitem__(self, key: int, value: Token) -> None: ...
+
+    @overload
+    def __setitem__(self, key: slice, value: Iterable[Token]) -> None: ...
+
+    def __setitem__(self, key: int | slice, value: Token | Iterable[Token]) -> None:
+        if isinstance(key, slice):
+            assert not isinstance(value, Token)
+            start, stop = self._slice_bounds(key)
+            self._move_gap(stop)
+            del self._head[start:]
+            self._head.extend(value)
+            return
+        assert isinstance(value, Token)
+        container, index = self._locate(key)
+        container[index] = value
+
+    def __delitem__(self, key: int | slice) -> None:
+        if isinstance(key, slice):
+            start, stop = self._slice_bounds(key)
+        else:
+            container, index = self._locate(key)
+            start = index if container is self._head else len(self._head) + ~index
+            stop = start + 1
+        self._move_gap(stop)
+        del self._head[start:]
+
+    def insert(self, index: int, value: Token) -> None:
+        length = len(self)
+        if index < 0:
+            index = max(0, index + length)
+        self._move_gap(min(index, length))
+        self._head.append(value)
+
+
 # Basic functions
 
 
-def find(tokens: list[Token], i: int, *, name: str, src: str | None = None) -> int:
+def find(
+    tokens: MutableSequence[Token], i: int, *, name: str, src: str | None = None
+) -> int:
     """
     Find the next token matching name and src.
     """
@@ -30,7 +166,7 @@ def find(tokens: list[Token], i: int, *, name: str, src: str | None = None) -> i
 
 
 def reverse_find(
-    tokens: list[Token], i: int, *, name: str, src: str | None = None
+    tokens: MutableSequence[Token], i: int, *, name: str, src: str | None = None
 ) -> int:
     """
     Find the previous token matching name and src.
@@ -40,7 +176,9 @@ def reverse_find(
     return i
 
 
-def consume(tokens: list[Token], i: int, *, name: str, src: str | None = None) -> int:
+def consume(
+    tokens: MutableSequence[Token], i: int, *, name: str, src: str | None = None
+) -> int:
     """
     Move past any tokens matching name and src.
     """
@@ -50,7 +188,7 @@ def consume(tokens: list[Token], i: int, *, name: str, src: str | None = None) -
 
 
 def reverse_consume(
-    tokens: list[Token], i: int, *, name: str, src: str | None = None
+    tokens: MutableSequence[Token], i: int, *, name: str, src: str | None = None
 ) -> int:
     """
     Rewind past any tokens matching name and src.
@@ -60,12 +198,40 @@ def reverse_consume(
     return i
 
 
+def find_line_start(tokens: MutableSequence[Token], i: int, line: int) -> int:
+    """
+    Return an index at or after i from which to scan for the first token on
+    the given line. Use an index of line starts, built on first use, for
+    containers that can cache one. Callbacks edit tokens after the index is
+    built, so only use an entry if its token is still in place.
+    """
+    if (line_i := tokens[i].line) is not None and line_i >= line - 1:
+        # A short scan, as for most nodes near the callback's token.
+        return i
+    if not isinstance(tokens, (TokenList, GapBuffer)):
+        return i
+    if tokens.line_starts is None:
+        line_starts: LineStarts = {}
+        for j, token in enumerate(tokens):
+            if token.line is not None and token.line not in line_starts:
+                line_starts[token.line] = (j, token)
+        tokens.line_starts = line_starts
+    try:
+        j, token = tokens.line_starts[line]
+    except KeyError:
+        return i
+    if i <= j < len(tokens) and tokens[j] is token:
+        return j
+    return i
+
+
 def find_first_token(
-    tokens: list[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
+    tokens: MutableSequence[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
 ) -> int:
     """
     Find the first token corresponding to the given ast node.
     """
+    i = find_line_start(tokens, i, node.lineno)
     while tokens[i].line is None or tokens[i].line < node.lineno:
         i += 1
     while (
@@ -77,11 +243,13 @@ def find_first_token(
 
 
 def find_last_token(
-    tokens: list[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
+    tokens: MutableSequence[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
 ) -> int:
     """
     Find the last token corresponding to the given ast node.
     """
+    assert node.end_lineno is not None
+    i = find_line_start(tokens, i, node.end_lineno)
     while tokens[i].line is None or tokens[i].line < node.end_lineno:
         i += 1
     while (
@@ -92,7 +260,7 @@ def find_last_token(
     return i - 1
 
 
-def extract_indent(tokens: list[Token], i: int) -> tuple[int, str]:
+def extract_indent(tokens: MutableSequence[Token], i: int) -> tuple[int, str]:
     """
     If the previous token is an indent, return its position and the
     indentation string. Otherwise return the current position and "".
@@ -105,7 +273,7 @@ def extract_indent(tokens: list[Token], i: int) -> tuple[int, str]:
     return (i, indent)
 
 
-def alone_on_line(tokens: list[Token], start_idx: int, end_idx: int) -> bool:
+def alone_on_line(tokens: MutableSequence[Token], start_idx: int, end_idx: int) -> bool:
     """
     Return if the given set of tokens is on its own physical line.
     """
@@ -123,8 +291,49 @@ BRACES = {"(": ")", "[": "]", "{": "}"}
 OPENING, CLOSING = frozenset(BRACES), frozenset(BRACES.values())
 
 
+# Pairs spanning fewer tokens are quicker to scan again than to record.
+MIN_RECORDED_PAIR = 32
+
+
+def find_closing(tokens: MutableSequence[Token], i: int) -> int:
+    """
+    Given the index of an opening bracket or INDENT, return the index of its
+    closing bracket or DEDENT. Containers that can cache a table of pairs
+    record the longer pairs found on the way, so later lookups within the
+    same brackets take one step. Callbacks edit tokens after pairs are recorded,
+    so only use a pair if both its tokens are still in place.
+    """
+    pairs: BracketPairs | None = None
+    if isinstance(tokens, (TokenList, GapBuffer)):
+        if tokens.bracket_pairs is None:
+            tokens.bracket_pairs = {}
+        pairs = tokens.bracket_pairs
+        pair = pairs.get(i)
+        if (
+            pair is not None
+            and pair[0] is tokens[i]
+            and pair[1] < len(tokens)
+            and tokens[pair[1]] is pair[2]
+        ):
+            return pair[1]
+
+    stack = []
+    while True:
+        token = tokens[i]
+        name = token.name
+        if (name == OP and token.src in OPENING) or name == INDENT:
+            stack.append(i)
+        elif (name == OP and token.src in CLOSING) or name == DEDENT:
+            start = stack.pop()
+            if pairs is not None and i - start >= MIN_RECORDED_PAIR:
+                pairs[start] = (tokens[start], i, token)
+            if not stack:
+                return i
+        i += 1
+
+
 def parse_call_args(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
 ) -> tuple[list[tuple[int, int]], int]:
     """
@@ -133,31 +342,28 @@ def parse_call_args(
     Return this list plus the position of the token after.
     """
     args = []
-    stack = [i]
     i += 1
     arg_start = i
 
-    while stack:
+    while True:
         token = tokens[i]
-
-        if len(stack) == 1 and token.src == ",":
+        if token.src == ",":
             args.append((arg_start, i))
             arg_start = i + 1
-        elif token.src in BRACES:
-            stack.append(i)
-        elif token.src == BRACES[tokens[stack[-1]].src]:
-            stack.pop()
-            # if we're at the end, append that argument, unless it contains
-            # no code tokens, e.g. only a comment
-            if not stack and any(
-                tokens[k].name not in CALL_ARGUMENT_PREFIX_TOKENS
-                for k in range(arg_start, i)
-            ):
-                args.append((arg_start, i))
-
+        elif token.name == OP and token.src in OPENING:
+            i = find_closing(tokens, i)
+        elif token.name == OP and token.src in CLOSING:
+            break
         i += 1
 
-    return args, i
+    # Append the last argument, unless it contains no code tokens, e.g. only
+    # a comment.
+    if any(
+        tokens[k].name not in CALL_ARGUMENT_PREFIX_TOKENS for k in range(arg_start, i)
+    ):
+        args.append((arg_start, i))
+
+    return args, i + 1
 
 
 CALL_ARGUMENT_PREFIX_TOKENS = frozenset(
@@ -171,7 +377,7 @@ CALL_ARGUMENT_PREFIX_TOKENS = frozenset(
 
 
 def find_call_arg(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     func_args: list[tuple[int, int]],
     node: ast.expr | ast.keyword,
 ) -> tuple[int, int]:
@@ -195,7 +401,9 @@ def find_call_arg(
     )  # pragma: no cover
 
 
-def remove_call_arg(tokens: list[Token], start_idx: int, end_idx: int) -> None:
+def remove_call_arg(
+    tokens: MutableSequence[Token], start_idx: int, end_idx: int
+) -> None:
     start_idx = reverse_consume(tokens, start_idx, name=UNIMPORTANT_WS)
     start_idx = reverse_consume(tokens, start_idx, name=INDENT)
 
@@ -218,13 +426,10 @@ def remove_call_arg(tokens: list[Token], start_idx: int, end_idx: int) -> None:
     del tokens[start_idx:end_idx]
 
 
-def find_block_start(tokens: list[Token], i: int) -> int:
-    depth = 0
-    while depth or tokens[i].src != ":":
-        if tokens[i].src in OPENING:
-            depth += 1
-        elif tokens[i].src in CLOSING:
-            depth -= 1
+def find_block_start(tokens: MutableSequence[Token], i: int) -> int:
+    while tokens[i].src != ":":
+        if tokens[i].name == OP and tokens[i].src in OPENING:
+            i = find_closing(tokens, i)
         i += 1
     return i
 
@@ -250,13 +455,13 @@ class Block:  # pragma: no cover
         self.end = end
         self.line = line
 
-    def _initial_indent(self, tokens: list[Token]) -> int:
+    def _initial_indent(self, tokens: MutableSequence[Token]) -> int:
         if tokens[self.start].src.isspace():
             return len(tokens[self.start].src)
         else:
             return 0
 
-    def _minimum_indent(self, tokens: list[Token]) -> int:
+    def _minimum_indent(self, tokens: MutableSequence[Token]) -> int:
         block_indent: int | None = None
         for i in range(self.block, self.end):
             if (
@@ -275,7 +480,7 @@ class Block:  # pragma: no cover
         assert block_indent is not None
         return block_indent
 
-    def dedent(self, tokens: list[Token]) -> None:
+    def dedent(self, tokens: MutableSequence[Token]) -> None:
         if self.line:
             return
         initial_indent = self._initial_indent(tokens)
@@ -290,13 +495,15 @@ class Block:  # pragma: no cover
                 s = s[:initial_indent] + s[initial_indent + diff :]
                 tokens[i] = tokens[i]._replace(src=s)
 
-    def replace_condition(self, tokens: list[Token], new: list[Token]) -> None:
+    def replace_condition(
+        self, tokens: MutableSequence[Token], new: list[Token]
+    ) -> None:
         start = self.start
         while tokens[start].name == "UNIMPORTANT_WS":
             start += 1
         tokens[start : self.colon] = new
 
-    def _trim_end(self, tokens: list[Token]) -> Block:
+    def _trim_end(self, tokens: MutableSequence[Token]) -> Block:
         """the tokenizer reports the end of the block at the beginning of
         the next block
         """
@@ -324,7 +531,7 @@ class Block:  # pragma: no cover
     @classmethod
     def find(
         cls,
-        tokens: list[Token],
+        tokens: MutableSequence[Token],
         i: int,
         trim_end: bool = False,
     ) -> Block:
@@ -341,11 +548,7 @@ class Block:  # pragma: no cover
             block = j + 1
             while tokens[j].name != "INDENT":
                 j += 1
-            level = 1
-            j += 1
-            while level:
-                level += {"INDENT": 1, "DEDENT": -1}.get(tokens[j].name, 0)
-                j += 1
+            j = find_closing(tokens, j) + 1
             ret = cls(start, colon, block, j, line=False)
             if trim_end:
                 return ret._trim_end(tokens)
@@ -357,7 +560,7 @@ class Block:  # pragma: no cover
             return cls(start, colon, block, j, line=True)
 
 
-def find_end(tokens: list[Token], i: int) -> int:  # pragma: no cover
+def find_end(tokens: MutableSequence[Token], i: int) -> int:  # pragma: no cover
     while tokens[i].name not in {"NEWLINE", "ENDMARKER"}:
         i += 1
 
@@ -375,14 +578,14 @@ def find_end(tokens: list[Token], i: int) -> int:  # pragma: no cover
 # Rewriting functions
 
 
-def insert(tokens: list[Token], i: int, *, new_src: str) -> None:
+def insert(tokens: MutableSequence[Token], i: int, *, new_src: str) -> None:
     """
     Insert a generated token with the given new source.
     """
     tokens.insert(i, Token(CODE, new_src))
 
 
-def replace(tokens: list[Token], i: int, *, src: str) -> None:
+def replace(tokens: MutableSequence[Token], i: int, *, src: str) -> None:
     """
     Replace the token at position i with a generated token with the given new
     source.
@@ -391,7 +594,7 @@ def replace(tokens: list[Token], i: int, *, src: str) -> None:
 
 
 def find_node(
-    tokens: list[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
+    tokens: MutableSequence[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
 ) -> tuple[int, int]:
     """
     Return bounds of tokens corresponding to the given node, minus any indent.
@@ -408,7 +611,7 @@ def find_node(
 
 
 def erase_node(
-    tokens: list[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
+    tokens: MutableSequence[Token], i: int, *, node: ast.expr | ast.keyword | ast.stmt
 ) -> None:
     """
     Erase all tokens corresponding to the given node.
@@ -440,7 +643,7 @@ def erase_node(
     del tokens[i : j + 1]
 
 
-def erase_decorator(tokens: list[Token], i: int, *, node: ast.Call) -> None:
+def erase_decorator(tokens: MutableSequence[Token], i: int, *, node: ast.Call) -> None:
     """
     Specialized version of erase_node for removing decorators, since they don't
     include the @ in their bounds.
@@ -453,7 +656,7 @@ def erase_decorator(tokens: list[Token], i: int, *, node: ast.Call) -> None:
 
 
 def erase_def(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.AsyncFunctionDef | ast.FunctionDef | ast.ClassDef,
@@ -479,13 +682,15 @@ def erase_def(
         del tokens[i : j + 1]
 
 
-def find_and_replace_name(tokens: list[Token], i: int, *, name: str, new: str) -> None:
+def find_and_replace_name(
+    tokens: MutableSequence[Token], i: int, *, name: str, new: str
+) -> None:
     j = find(tokens, i, name=NAME, src=name)
     tokens[j] = tokens[j]._replace(name=CODE, src=new)
 
 
 def replace_argument_names(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.Call,
@@ -531,7 +736,7 @@ def str_repr_matching(text: str, *, match_quotes: str) -> str:
 
 
 def update_import_names(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.ImportFrom,
@@ -610,7 +815,7 @@ def update_import_names(
 
 
 def update_import_modules(
-    tokens: list[Token],
+    tokens: MutableSequence[Token],
     i: int,
     *,
     node: ast.ImportFrom,
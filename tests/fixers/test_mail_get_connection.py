@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from functools import partial
+from unittest import mock
 
+from django_upgrade.ast import get_module_facts
 from django_upgrade.data import Settings
 from tests.fixers import tools
 
@@ -404,3 +406,20 @@ def test_send_mail_direct_import_all_functions():
         mail_managers("s", "m")
         """,
     )
+
+
+def test_direct_import_many_calls_checked_once():
+    # The module is only checked once, rather than once per call.
+    count = 2_000
+    with mock.patch(
+        "django_upgrade.fixers.mail_get_connection.get_module_facts",
+        wraps=get_module_facts,
+    ) as mock_get_module_facts:
+        check_transformed(
+            "from django.core.mail import get_connection\n"
+            + "".join(f"c{i} = get_connection()\n" for i in range(count)),
+            "from django.core.mail import mailers\n"
+            + "".join(f"c{i} = mailers.default\n" for i in range(count)),
+        )
+
+    assert mock_get_module_facts.call_count == 1
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from functools import partial
+from unittest import mock
 
+from django_upgrade.ast import get_module_facts
 from django_upgrade.data import Settings
 from tests.fixers import tools
 
@@ -322,3 +324,21 @@ def test_transform_comment_only_parens():
         """,
         filename="models/blog.py",
     )
+
+
+def test_many_fields_checked_once():
+    # The module is only checked once, rather than once per field.
+    count = 2_000
+    with mock.patch(
+        "django_upgrade.fixers.null_boolean_field.get_module_facts",
+        wraps=get_module_facts,
+    ) as mock_get_module_facts:
+        check_transformed(
+            "from django.db.models import NullBooleanField\n"
+            + "".join(f"field{i} = NullBooleanField()\n" for i in range(count)),
+            "from django.db.models import BooleanField\n"
+            + "".join(f"field{i} = BooleanField(null=True)\n" for i in range(count)),
+            filename="models/blog.py",
+        )
+
+    assert mock_get_module_facts.call_count == 1
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from functools import partial
+from unittest import mock
 
+from django_upgrade.ast import get_module_facts
 from django_upgrade.data import Settings
 from tests.fixers import tools
 
@@ -355,3 +357,26 @@ def test_nested_function():
                 return render(request, "t.html")
         """,
     )
+
+
+def test_many_views_checked_once():
+    # The module is only checked once, rather than once per call.
+    count = 2_000
+    with mock.patch(
+        "django_upgrade.fixers.render_to_response.get_module_facts",
+        wraps=get_module_facts,
+    ) as mock_get_module_facts:
+        check_transformed(
+            "from django.shortcuts import render_to_response\n"
+            + "".join(
+                f'def view{i}(request):\n    return render_to_response("t{i}.html")\n'
+                for i in range(count)
+            ),
+            "from django.shortcuts import render\n"
+            + "".join(
+                f'def view{i}(request):\n    return render(request, "t{i}.html")\n'
+                for i in range(count)
+            ),
+        )
+
+    assert mock_get_module_facts.call_count == 1
@@ -4,7 +4,12 @@ import ast
 
 import pytest
 
-from django_upgrade.ast import get_module_names
+from django_upgrade.ast import (
+    Parents,
+    get_ast_grammar,
+    get_module_facts,
+    get_module_names,
+)
 
 
 class TestGetModuleNames:
@@ -76,3 +81,111 @@ class TestGetModuleNames:
     def test_caching(self) -> None:
         module = ast.parse("x = 1")
         assert get_module_names(module) is get_module_names(module)
+
+
+class TestGetModuleFacts:
+    def test_cached(self) -> None:
+        module = ast.parse("x")
+
+        assert get_module_facts(module) is get_module_facts(module)
+
+    def test_name_usages(self) -> None:
+        module = ast.parse("def f():\n    return x\nx = 1\n")
+
+        usages = get_module_facts(module).name_usages["x"]
+
+        assert sorted(node.lineno for node, _ in usages) == [2, 3]
+        parent_types = {
+            node.lineno: [type(p).__name__ for p in parents] for node, parents in usages
+        }
+        assert parent_types == {
+            2: ["Module", "FunctionDef", "Return"],
+            3: ["Module", "Assign"],
+        }
+
+    def test_calls(self) -> None:
+        module = ast.parse("f(g(1))\nobj.f()\n")
+
+        calls = get_module_facts(module).calls
+
+        assert set(calls) == {"f", "g"}
+        ((call, parents),) = calls["g"]
+        assert call.args[0].value == 1  # type: ignore[attr-defined]
+        assert parents[-1] is calls["f"][0][0]
+
+    def test_missing_name(self) -> None:
+        facts = get_module_facts(ast.parse("x"))
+
+        assert "y" not in facts.name_usages
+        assert "y" not in facts.calls
+
+
+class TestGetAstGrammar:
+    def test_every_field_known(self) -> None:
+        grammar = get_ast_grammar()
+
+        for type_ in (ast.Module, ast.FunctionDef, ast.Call, ast.Compare, ast.alias):
+            assert tuple(grammar[type_]) == type_._fields
+            assert None not in grammar[type_].values()
+
+    def test_sum_type(self) -> None:
+        field_types = get_ast_grammar()[ast.BinOp]
+
+        assert ast.Name in (field_types["left"] or ())
+        assert ast.Add in (field_types["op"] or ())
+
+    def test_product_type(self) -> None:
+        field_types = get_ast_grammar()[ast.FunctionDef]
+
+        assert field_types["args"] == (ast.arguments,)
+
+    def test_builtin_type(self) -> None:
+        field_types = get_ast_grammar()[ast.Name]
+
+        assert field_types["id"] == ()
+
+    def test_no_fields(self) -> None:
+        assert get_ast_grammar()[ast.Load] == {}
+
+
+def test_parents_empty() -> None:
+    parents = Parents()
+
+    assert len(parents) == 0
+    assert not parents
+    assert list(parents) == []
+    with pytest.raises(IndexError):
+        parents[0]
+    with pytest.raises(IndexError):
+        parents[-1]
+
+
+def test_parents() -> None:
+    nodes = [ast.Constant(value=i) for i in range(4)]
+    parents = Parents()
+    for node in nodes:
+        parents = parents.push(node)
+
+    assert len(parents) == 4
+    assert list(parents) == nodes
+    assert list(reversed(parents)) == nodes[::-1]
+    assert [parents[i] for i in range(-4, 4)] == nodes + nodes
+    assert parents[1:] == tuple(nodes[1:])
+    assert nodes[2] in parents
+    assert repr(parents) == f"Parents({tuple(nodes)!r})"
+    with pytest.raises(IndexError):
+        parents[4]
+    with pytest.raises(IndexError):
+        parents[-5]
+
+
+def test_parents_shared() -> None:
+    root, first_child, second_child = (ast.Constant(value=i) for i in range(3))
+    parents = Parents().push(root)
+
+    first = parents.push(first_child)
+    second = parents.push(second_child)
+
+    assert list(parents) == [root]
+    assert list(first) == [root, first_child]
+    assert list(second) == [root, second_child]
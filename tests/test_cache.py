@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from importlib import metadata
+
+from django_upgrade.cache import PRUNE_INTERVAL, Cache, default_cache_dir
+from django_upgrade.data import Settings
+
+settings = Settings(target_version=(4, 0))
+
+
+def test_default_cache_dir_xdg(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert default_cache_dir() == os.path.join(tmp_path, "django-upgrade")
+
+
+def test_default_cache_dir_home(monkeypatch, tmp_path):
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    assert default_cache_dir() == os.path.join(tmp_path, ".cache", "django-upgrade")
+
+
+def test_add_contains(tmp_path):
+    cache = Cache(str(tmp_path), settings)
+    key = cache.key("example.py", b"x = 1\n")
+
+    assert key not in cache
+    cache.add(key)
+    assert key in cache
+
+
+def test_key_varies():
+    cache = Cache("unused", settings)
+    key = cache.key("example.py", b"x = 1\n")
+
+    assert cache.key("example.py", b"x = 2\n") != key
+    assert cache.key("settings.py", b"x = 1\n") != key
+    assert (
+        Cache("unused", Settings(target_version=(4, 1))).key("example.py", b"x = 1\n")
+        != key
+    )
+    assert (
+        Cache(
+            "unused", Settings(target_version=(4, 0), skip_fixers={"request_headers"})
+        ).key("example.py", b"x = 1\n")
+        != key
+    )
+
+
+def test_key_varies_python_version(monkeypatch):
+    key = Cache("unused", settings).key("example.py", b"x = 1\n")
+    monkeypatch.setattr(sys, "version_info", (3, 99, 0, "final", 0))
+
+    assert Cache("unused", settings).key("example.py", b"x = 1\n") != key
+
+
+def test_key_varies_tokenize_rt_version(monkeypatch):
+    key = Cache("unused", settings).key("example.py", b"x = 1\n")
+    version = metadata.version
+    monkeypatch.setattr(
+        metadata,
+        "version",
+        lambda name: "0.0" if name == "tokenize-rt" else version(name),
+    )
+
+    assert Cache("unused", settings).key("example.py", b"x = 1\n") != key
+
+
+def test_add_unwritable(tmp_path):
+    (tmp_path / "file").touch()
+    cache = Cache(str(tmp_path / "file"), settings)
+    key = cache.key("example.py", b"")
+
+    cache.add(key)
+
+    assert key not in cache
+
+
+def test_prune_under_limit(tmp_path):
+    cache = Cache(str(tmp_path), settings, max_entries=2)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(2)]
+    for key in keys:
+        cache.add(key)
+
+    cache.prune()
+
+    assert all(key in cache for key in keys)
+
+
+def test_prune_least_recently_used(tmp_path):
+    cache = Cache(str(tmp_path), settings, max_entries=10)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(12)]
+    for i, key in enumerate(keys):
+        cache.add(key)
+        os.utime(cache._path(key), (i, i))
+
+    cache.prune()
+
+    assert [key in cache for key in keys] == [False] * 3 + [True] * 9
+
+
+def test_prune_nothing_added(tmp_path):
+    cache = Cache(str(tmp_path), settings, max_entries=10)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(12)]
+    for key in keys:
+        cache.add(key)
+
+    Cache(str(tmp_path), settings, max_entries=10).prune()
+
+    assert all(key in cache for key in keys)
+    assert not (tmp_path / "pruned").exists()
+
+
+def test_prune_recently_pruned(tmp_path):
+    cache = Cache(str(tmp_path), settings, max_entries=20)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(22)]
+    for key in keys[:21]:
+        cache.add(key)
+    (tmp_path / "pruned").touch()
+    cache = Cache(str(tmp_path), settings, max_entries=20)
+    cache.add(keys[21])
+
+    cache.prune()
+
+    assert all(key in cache for key in keys)
+
+
+def test_prune_stale_marker(tmp_path):
+    cache = Cache(str(tmp_path), settings, max_entries=10)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(12)]
+    for i, key in enumerate(keys[:11]):
+        cache.add(key)
+        os.utime(cache._path(key), (i, i))
+    (tmp_path / "pruned").touch()
+    os.utime(tmp_path / "pruned", (0, 0))
+    cache = Cache(str(tmp_path), settings, max_entries=10)
+    cache.add(keys[11])
+
+    cache.prune()
+
+    assert [key in cache for key in keys] == [False] * 3 + [True] * 9
+    assert time.time() - (tmp_path / "pruned").stat().st_mtime < PRUNE_INTERVAL
+
+
+def test_prune_recently_pruned_many_added(tmp_path):
+    (tmp_path / "pruned").touch()
+    cache = Cache(str(tmp_path), settings, max_entries=10)
+    keys = [cache.key("example.py", str(i).encode()) for i in range(12)]
+    for i, key in enumerate(keys):
+        cache.add(key)
+        os.utime(cache._path(key), (i, i))
+
+    cache.prune()
+
+    assert [key in cache for key in keys] == [False] * 3 + [True] * 9
+
+
+def test_prune_missing_directory(tmp_path):
+    Cache(str(tmp_path / "missing"), settings).prune()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from django_upgrade import daemon
+from django_upgrade.main import main
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "daemon.sock")
+    thread = threading.Thread(
+        target=daemon.serve, args=(path,), kwargs={"idle_timeout": 0.5}
+    )
+    thread.start()
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+        except OSError:
+            time.sleep(0.001)
+        else:
+            break
+    yield path
+    thread.join()
+
+
+def test_default_socket_path_runtime_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+
+    assert daemon.default_socket_path() == "/run/user/1000/django-upgrade.sock"
+
+
+def test_default_socket_path_temp_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+
+    result = daemon.default_socket_path()
+
+    assert result.endswith(
+        os.path.join(f"django-upgrade-{os.getuid()}", "django-upgrade.sock")
+    )
+
+
+def test_make_private_directory(tmp_path: Path) -> None:
+    directory = tmp_path / "private"
+
+    daemon.make_private_directory(str(directory))
+    daemon.make_private_directory(str(directory))
+
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+
+def test_make_private_directory_shared(tmp_path: Path) -> None:
+    directory = tmp_path / "shared"
+    directory.mkdir(mode=0o777)
+    directory.chmod(0o777)
+
+    with pytest.raises(daemon.InsecureSocket) as excinfo:
+        daemon.make_private_directory(str(directory))
+
+    assert str(excinfo.value) == (
+        f"{directory} must be a directory accessible only to the current user"
+    )
+
+
+def test_socket_permissions(socket_path: str) -> None:
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+
+def test_request_socket_owned_by_other_user(
+    socket_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(socket_path).st_uid + 1)
+
+    with pytest.raises(daemon.InsecureSocket) as excinfo:
+        daemon.request(socket_path, "example.py", "x = 1\n")
+
+    assert str(excinfo.value) == f"{socket_path} is owned by another user"
+
+
+def test_serve_socket_owned_by_other_user(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = str(tmp_path / "daemon.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other:
+        other.bind(path)
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+
+    with pytest.raises(daemon.InsecureSocket):
+        daemon.serve(path, idle_timeout=0.01)
+
+    assert os.path.exists(path)
+
+
+def test_request(socket_path: str) -> None:
+    response = daemon.request(
+        socket_path,
+        "example.py",
+        "from django.core.paginator import QuerySetPaginator\n",
+    )
+
+    assert response == {
+        "source": "from django.core.paginator import Paginator\n",
+        "changed": True,
+    }
+
+
+def test_request_unchanged(socket_path: str) -> None:
+    response = daemon.request(socket_path, "example.py", "x = 1\n")
+
+    assert response == {"source": "x = 1\n", "changed": False}
+
+
+def test_request_target_version(socket_path: str) -> None:
+    source = "from django.core.paginator import QuerySetPaginator\n"
+
+    response = daemon.request(socket_path, "example.py", source, target_version="2.0")
+
+    assert response == {"source": source, "changed": False}
+
+
+def test_request_filename_condition(socket_path: str) -> None:
+    source = "PASSWORD_RESET_TIMEOUT_DAYS = 4\n"
+
+    response = daemon.request(socket_path, "example.py", source, target_version="3.1")
+    settings_response = daemon.request(
+        socket_path, "settings.py", source, target_version="3.1"
+    )
+
+    assert response == {"source": source, "changed": False}
+    assert settings_response == {
+        "source": "PASSWORD_RESET_TIMEOUT = 60 * 60 * 24 * 4\n",
+        "changed": True,
+    }
+
+
+def test_request_only(socket_path: str) -> None:
+    source = "from django.core.paginator import QuerySetPaginator\n"
+
+    response = daemon.request(
+        socket_path, "example.py", source, only=["request_headers"]
+    )
+
+    assert response == {"source": source, "changed": False}
+
+
+def test_request_skip(socket_path: str) -> None:
+    source = "from django.core.paginator import QuerySetPaginator\n"
+
+    response = daemon.request(
+        socket_path, "example.py", source, skip=["queryset_paginator"]
+    )
+
+    assert response == {"source": source, "changed": False}
+
+
+def test_request_unknown_fixer(socket_path: str) -> None:
+    response = daemon.request(socket_path, "example.py", "", only=["nope"])
+
+    assert response == {"error": "Invalid request: Unknown fixer: 'nope'"}
+
+
+@pytest.mark.parametrize(
+    ("target_version", "message"),
+    (
+        ("x", "Invalid target_version: 'x'"),
+        ("1.0", "Unsupported target_version: '1.0'"),
+    ),
+)
+def test_request_bad_target_version(
+    socket_path: str, target_version: str, message: str
+) -> None:
+    response = daemon.request(
+        socket_path, "example.py", "", target_version=target_version
+    )
+
+    assert response == {"error": f"Invalid request: {message}"}
+
+
+def test_request_failure(socket_path: str) -> None:
+    response = daemon.request(socket_path, "example.py", "x = '\ud800'\n")
+    next_response = daemon.request(socket_path, "example.py", "x = 1\n")
+
+    assert response["error"].startswith("Failed to fix source: UnicodeEncodeError(")
+    assert next_response == {"source": "x = 1\n", "changed": False}
+
+
+def test_multiple_requests_per_connection(socket_path: str) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write(b"not json\n")
+            stream.write(json.dumps({"path": "a.py", "source": "x = 1\n"}).encode())
+            stream.write(b"\n")
+            stream.flush()
+            client.shutdown(socket.SHUT_WR)
+            responses = [json.loads(line) for line in stream]
+
+    assert len(responses) == 2
+    assert responses[0]["error"].startswith("Invalid request: ")
+    assert responses[1] == {"source": "x = 1\n", "changed": False}
+
+
+def test_stalled_connection_does_not_block(socket_path: str) -> None:
+    with (
+        socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled,
+        socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client,
+    ):
+        stalled.connect(socket_path)
+        client.connect(socket_path)
+        # Well within the stalled connection's timeout, 0.5 seconds.
+        client.settimeout(0.25)
+        with client.makefile("rwb") as stream:
+            stream.write(b'{"path": "a.py", "source": ""}\n')
+            stream.flush()
+            response = json.loads(stream.readline())
+
+    assert response == {"source": "", "changed": False}
+
+
+def test_idle_timeout_waits_for_open_connections(tmp_path: Path) -> None:
+    path = str(tmp_path / "daemon.sock")
+    thread = threading.Thread(
+        target=daemon.serve, args=(path,), kwargs={"idle_timeout": 0.2}
+    )
+    thread.start()
+    while not os.path.exists(path):
+        time.sleep(0.001)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        with client.makefile("rwb") as stream:
+            for _ in range(3):
+                time.sleep(0.1)
+                stream.write(b'{"path": "a.py", "source": ""}\n')
+                stream.flush()
+                assert json.loads(stream.readline()) == {
+                    "source": "",
+                    "changed": False,
+                }
+    thread.join()
+
+    assert not os.path.exists(path)
+
+
+def test_idle_timeout_removes_socket(tmp_path: Path) -> None:
+    path = str(tmp_path / "daemon.sock")
+
+    daemon.serve(path, idle_timeout=0.01)
+
+    assert not os.path.exists(path)
+
+
+def test_stale_socket(tmp_path: Path) -> None:
+    path = str(tmp_path / "daemon.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+
+    daemon.serve(path, idle_timeout=0.01)
+
+    assert not os.path.exists(path)
+
+
+def test_main_daemon_already_running(
+    socket_path: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    returncode = main(["daemon", "--socket", socket_path, "--idle-timeout", "0.01"])
+
+    assert returncode == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == f"A daemon is already listening on {socket_path}\n"
+
+
+def test_main_daemon_default_socket(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    returncode = main(["daemon", "--idle-timeout", "0.01"])
+
+    assert returncode == 0
+    directory = tmp_path / f"django-upgrade-{os.getuid()}"
+    assert directory.stat().st_mode & 0o777 == 0o700
+    assert list(directory.iterdir()) == []
+
+
+def test_main_daemon_insecure_default_socket(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    directory = tmp_path / f"django-upgrade-{os.getuid()}"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    returncode = main(["daemon", "--idle-timeout", "0.01"])
+
+    assert returncode == 1
+    out, err = capsys.readouterr()
+    assert err == (
+        f"Refusing to listen: {directory} must be a directory accessible only "
+        "to the current user\n"
+    )
+
+
+def test_main_daemon(tmp_path: Path) -> None:
+    path = str(tmp_path / "daemon.sock")
+
+    returncode = main(["daemon", "--socket", path, "--idle-timeout", "0.01"])
+
+    assert returncode == 0
+    assert not os.path.exists(path)
@@ -1,12 +1,30 @@
 from __future__ import annotations
 
+import ast
 import re
+import subprocess
+import sys
 from collections import defaultdict
+from collections.abc import Iterable
 from pathlib import Path
 
 import pytest
-
-from django_upgrade.data import FIXERS, Settings, State
+from tokenize_rt import Offset
+
+import django_upgrade.manifest
+from django_upgrade.ast import Parents, get_ast_grammar
+from django_upgrade.data import (
+    FIXERS,
+    Fixer,
+    Settings,
+    State,
+    TokenFunc,
+    get_ast_funcs,
+    get_dispatch_name,
+    plan_traversal,
+    render_manifest,
+    visit,
+)
 
 settings = Settings(target_version=(4, 0))
 
@@ -263,3 +281,302 @@ def test_all_fixers_are_documented() -> None:
 
     undocumented = names - docs
     assert not undocumented
+
+
+def test_all_fixers_have_triggers() -> None:
+    missing = {name for name, fixer in FIXERS.items() if not fixer.triggers}
+
+    assert not missing
+
+
+def test_settings_triggers_re() -> None:
+    settings = Settings(target_version=(2, 2), only_fixers={"queryset_paginator"})
+
+    assert settings.triggers_re is not None
+    assert settings.triggers_re.pattern == b"QuerySetPaginator"
+
+
+def test_settings_triggers_re_version_ineligible() -> None:
+    settings = Settings(target_version=(2, 0), only_fixers={"queryset_paginator"})
+
+    assert settings.triggers_re is not None
+    assert settings.triggers_re.search(b"QuerySetPaginator") is None
+
+
+def test_manifest_up_to_date() -> None:
+    path = Path(django_upgrade.manifest.__file__)
+
+    assert path.read_text() == render_manifest(), (
+        "The manifest is out of date. Regenerate it with:\n"
+        'python -c "from django_upgrade.data import write_manifest; write_manifest()"'
+    )
+
+
+def test_fixers_unknown() -> None:
+    with pytest.raises(KeyError):
+        FIXERS["nope"]
+
+    assert "nope" not in FIXERS
+
+
+def test_fixers_imported_lazily(tmp_path: Path) -> None:
+    example = tmp_path / "example.py"
+    example.write_text("request.META['HTTP_HOST']\n")
+    code = (
+        "import sys\n"
+        "from django_upgrade.main import main\n"
+        f"main(['--no-cache', '--only', 'request_headers', {str(example)!r}])\n"
+        "print(sorted(m for m in sys.modules if m.startswith('django_upgrade.fixers.')))"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout == "['django_upgrade.fixers.request_headers']\n"
+    assert example.read_text() == "request.headers['host']\n"
+
+
+def test_fixer_condition_attr_unknown() -> None:
+    with pytest.raises(ValueError) as excinfo:
+        Fixer("example", min_version=(0, 0), condition_attr="looks_like_a_file")
+
+    assert str(excinfo.value) == "State has no condition 'looks_like_a_file'."
+    assert "example" not in FIXERS.loaded
+
+
+def test_render_manifest_condition_attr() -> None:
+    Fixer("example", min_version=(0, 0), condition_attr="looks_like_test_file")
+    try:
+        rendered = render_manifest()
+    finally:
+        del FIXERS.loaded["example"]
+
+    assert (
+        '    "example": FixerInfo(\n'
+        "        min_version=(0, 0),\n"
+        '        condition="looks_like_test_file",\n'
+    ) in rendered
+
+
+def test_settings_condition_names() -> None:
+    settings = Settings(
+        target_version=(4, 0),
+        only_fixers={"use_l10n", "assert_form_error", "request_headers"},
+    )
+
+    assert settings.condition_names == ("looks_like_settings_file",)
+
+
+def test_get_ast_funcs_cached_per_classification() -> None:
+    settings = Settings(target_version=(4, 0))
+
+    def get(filename: str) -> object:
+        return get_ast_funcs(
+            State(settings=settings, filename=filename, from_imports=defaultdict(set)),
+            settings,
+        )
+
+    example = get("example.py")
+    settings_file = get("myproject/settings.py")
+
+    assert get("other.py") is example
+    assert get("other/settings.py") is settings_file
+    assert settings_file is not example
+    assert len(settings.ast_funcs_tables) == 2
+
+
+def test_get_ast_funcs_names() -> None:
+    settings = Settings(
+        target_version=(5, 0),
+        only_fixers={"model_field_choices", "request_headers"},
+    )
+    model_field_choices = FIXERS["model_field_choices"].ast_funcs[ast.Call][0]
+    request_headers = FIXERS["request_headers"].ast_funcs[ast.Call][0]
+
+    table = get_ast_funcs(make_state("myapp/models.py"), settings)
+
+    assert table[ast.Call] == (
+        (model_field_choices,),
+        {"get": (model_field_choices, request_headers)},
+    )
+
+
+def test_register_names_unsupported_type() -> None:
+    fixer = Fixer.__new__(Fixer)
+
+    with pytest.raises(ValueError) as excinfo:
+        fixer.register(ast.Assign, names=("x",))
+
+    assert str(excinfo.value) == "Cannot register Assign by name."
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    (
+        ("f()", "f"),
+        ("a.b.f()", "f"),
+        ("f()()", ""),
+        ("x[0]()", ""),
+        ("x", "x"),
+        ("a.b", "b"),
+        ("1", ""),
+    ),
+)
+def test_get_dispatch_name(source: str, expected: str) -> None:
+    node = ast.parse(source, mode="eval").body
+
+    assert get_dispatch_name(node) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    (
+        ("from django.db import models", "django.db"),
+        ("from .models import Book", "models"),
+        ("from . import models", ""),
+    ),
+)
+def test_get_dispatch_name_import_from(source: str, expected: str) -> None:
+    node = ast.parse(source).body[0]
+
+    assert get_dispatch_name(node) == expected
+
+
+def test_visit_names() -> None:
+    tree = ast.parse("f(x)\ng(x)\nobj.f()\n")
+    seen = []
+
+    def visit_call(
+        state: State, node: ast.Call, parents: Parents
+    ) -> Iterable[tuple[Offset, TokenFunc]]:
+        seen.append(ast.unparse(node))
+        return ()
+
+    settings = Settings(target_version=(6, 1), only_fixers=set())
+    settings.ast_funcs_tables[0] = {ast.Call: ((), {"f": (visit_call,)})}
+
+    visit(tree, settings, "example.py")
+
+    assert seen == ["f(x)", "obj.f()"]
+
+
+@pytest.mark.parametrize(
+    ("fixer_name", "whole_file"),
+    (
+        ("queryset_paginator", False),
+        ("utils_timezone", True),
+    ),
+)
+def test_visit_whole_file(fixer_name: str, whole_file: bool) -> None:
+    tree = ast.parse(
+        "from django.core.paginator import QuerySetPaginator\n"
+        "from django.utils.timezone import utc\n"
+        "QuerySetPaginator(utc)\n"
+    )
+    settings = Settings(target_version=(4, 1), only_fixers={fixer_name})
+
+    callbacks = visit(tree, settings, "example.py")
+
+    assert callbacks
+    assert callbacks.whole_file is whole_file
+
+
+def test_visit_text_edits() -> None:
+    tree = ast.parse(
+        "from django.contrib.staticfiles import finders\nfinders.find('a', all=True)\n"
+    )
+    settings = Settings(target_version=(5, 2), only_fixers={"staticfiles_find_all"})
+
+    callbacks = visit(tree, settings, "example.py")
+
+    assert not callbacks
+    assert len(callbacks.edits) == 1
+    ((edit, fixer_name),) = callbacks.edits.items()
+    assert fixer_name == "staticfiles_find_all"
+    assert (edit.start, edit.end, edit.src) == (
+        Offset(2, 18),
+        Offset(2, 21),
+        "find_all",
+    )
+    assert repr(edit) == (
+        "TextEdit(Offset(line=2, utf8_byte_offset=18), "
+        "Offset(line=2, utf8_byte_offset=21), 'find_all')"
+    )
+
+
+def test_visit_fixers() -> None:
+    tree = ast.parse(
+        "from django.contrib.staticfiles import finders\n"
+        "from django.core.paginator import QuerySetPaginator\n"
+        "finders.find('a', all=True)\n"
+    )
+    settings = Settings(target_version=(5, 2))
+
+    callbacks = visit(tree, settings, "example.py")
+
+    assert callbacks.fixers == {"queryset_paginator", "staticfiles_find_all"}
+
+
+def test_plan_traversal_skips_leaves() -> None:
+    fields_by_type, skip_types = plan_traversal(frozenset({ast.Call}))
+
+    assert {ast.Load, ast.Add, ast.Eq, ast.Constant} <= skip_types
+    assert ast.Call not in skip_types
+    assert fields_by_type[ast.Compare] == ("comparators", "left")
+    assert fields_by_type[ast.Constant] == ()
+
+
+def test_plan_traversal_unparseable_product_type(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # If a product type's signature cannot be read, its fields may hold any
+    # node, so must not be skipped.
+    monkeypatch.setattr(ast.keyword, "__doc__", "Unparseable")
+    get_ast_grammar.cache_clear()
+    plan_traversal.cache_clear()
+    try:
+        fields_by_type, skip_types = plan_traversal(frozenset({ast.Name}))
+        tree = ast.parse(
+            "from django.utils.encoding import force_text\nf(x=force_text('a'))\n"
+        )
+        settings = Settings(target_version=(3, 0), only_fixers={"utils_encoding"})
+        callbacks = visit(tree, settings, "example.py")
+    finally:
+        get_ast_grammar.cache_clear()
+        plan_traversal.cache_clear()
+
+    assert ast.keyword not in skip_types
+    assert fields_by_type[ast.keyword] == ("value", "arg")
+    assert Offset(2, 4) in callbacks
+
+
+def test_plan_traversal_statements_only() -> None:
+    fields_by_type, skip_types = plan_traversal(frozenset({ast.ClassDef}))
+
+    assert ast.Call in skip_types
+    assert ast.Name in skip_types
+    assert fields_by_type[ast.FunctionDef] == ("body",)
+    assert fields_by_type[ast.If] == ("orelse", "body")
+
+
+def test_visit_parents_with_skipped_nodes() -> None:
+    tree = ast.parse(
+        "def f():\n"
+        "    if x == 1:\n"
+        "        from django.core.paginator import QuerySetPaginator\n"
+    )
+    seen = []
+
+    def visit_alias(
+        state: State, node: ast.alias, parents: Parents
+    ) -> Iterable[tuple[Offset, TokenFunc]]:
+        seen.append([type(parent).__name__ for parent in parents])
+        return ()
+
+    settings = Settings(target_version=(6, 1), only_fixers=set())
+    settings.ast_funcs_tables[0] = {ast.alias: ((visit_alias,), {})}
+
+    visit(tree, settings, "example.py")
+
+    assert seen == [["Module", "FunctionDef", "If", "ImportFrom"]]
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from django_upgrade.files import (
+    DEFAULT_EXCLUDES,
+    OverlappedIO,
+    get_changed_filenames,
+    iter_filenames,
+)
+from tests.compat import chdir
+
+
+def test_iter_filenames_files():
+    result = list(iter_filenames(["a.py", "-", "b.txt"], excludes=DEFAULT_EXCLUDES))
+
+    assert result == ["a.py", "-", "b.txt"]
+
+
+def test_iter_filenames_directory(tmp_path):
+    (tmp_path / "b.py").touch()
+    (tmp_path / "a.py").touch()
+    (tmp_path / "c.txt").touch()
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").touch()
+
+    result = list(iter_filenames([str(tmp_path)], excludes=DEFAULT_EXCLUDES))
+
+    assert result == [
+        os.path.join(tmp_path, "a.py"),
+        os.path.join(tmp_path, "b.py"),
+        os.path.join(tmp_path, "pkg", "__init__.py"),
+    ]
+
+
+def test_iter_filenames_default_excludes(tmp_path):
+    for name in (".git", "node_modules", ".venv"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "example.py").touch()
+
+    result = list(iter_filenames([str(tmp_path)], excludes=DEFAULT_EXCLUDES))
+
+    assert result == []
+
+
+def test_iter_filenames_virtualenv(tmp_path):
+    (tmp_path / "env").mkdir()
+    (tmp_path / "env" / "pyvenv.cfg").touch()
+    (tmp_path / "env" / "example.py").touch()
+
+    result = list(iter_filenames([str(tmp_path)], excludes=()))
+
+    assert result == []
+
+
+def test_iter_filenames_exclude_name(tmp_path):
+    (tmp_path / "a.py").touch()
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "migrations" / "0001_initial.py").touch()
+
+    result = list(iter_filenames([str(tmp_path)], excludes=["migrations"]))
+
+    assert result == [os.path.join(tmp_path, "a.py")]
+
+
+def test_iter_filenames_exclude_relative_path(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "models.py").touch()
+    (tmp_path / "app" / "views.py").touch()
+
+    result = list(iter_filenames([str(tmp_path)], excludes=["app/v*.py"]))
+
+    assert result == [os.path.join(tmp_path, "app", "models.py")]
+
+
+def test_iter_filenames_exclude_not_applied_to_given_files():
+    result = list(iter_filenames(["node_modules/a.py"], excludes=["node_modules"]))
+
+    assert result == ["node_modules/a.py"]
+
+
+def test_iter_filenames_streams(tmp_path):
+    (tmp_path / "a.py").touch()
+    (tmp_path / "b.py").touch()
+
+    result = iter_filenames([str(tmp_path)], excludes=())
+
+    assert next(result) == os.path.join(tmp_path, "a.py")
+    (tmp_path / "a.py").unlink()
+    assert next(result) == os.path.join(tmp_path, "b.py")
+
+
+def git(*args: str) -> None:
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=Example",
+            "-c",
+            "user.email=example@example.com",
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    with chdir(tmp_path):
+        git("init", "--initial-branch", "main")
+        (tmp_path / "unchanged.py").touch()
+        (tmp_path / "modified.py").touch()
+        (tmp_path / "deleted.py").touch()
+        (tmp_path / "renamed.py").touch()
+        git("add", ".")
+        git("commit", "--message", "Initial")
+        yield tmp_path
+
+
+def test_get_changed_filenames(git_repo):
+    (git_repo / "modified.py").write_text("x = 1\n")
+    (git_repo / "deleted.py").unlink()
+    git("mv", "renamed.py", "renamed2.py")
+    (git_repo / "sub").mkdir()
+    (git_repo / "sub" / "added.py").touch()
+    git("add", "sub/added.py")
+    (git_repo / "untracked.py").touch()
+    (git_repo / "notes.txt").touch()
+
+    result = get_changed_filenames("main", [])
+
+    assert result == [
+        "modified.py",
+        "renamed2.py",
+        "sub/added.py",
+        "untracked.py",
+    ]
+
+
+def test_get_changed_filenames_committed(git_repo):
+    git("switch", "--create", "feature")
+    (git_repo / "modified.py").write_text("x = 1\n")
+    git("commit", "--all", "--message", "Change")
+
+    result = get_changed_filenames("main", [])
+
+    assert result == ["modified.py"]
+
+
+def test_get_changed_filenames_paths(git_repo):
+    (git_repo / "modified.py").write_text("x = 1\n")
+    (git_repo / "sub").mkdir()
+    (git_repo / "sub" / "untracked.py").touch()
+
+    result = get_changed_filenames("main", ["sub"])
+
+    assert result == ["sub/untracked.py"]
+
+
+def test_get_changed_filenames_subdirectory(git_repo):
+    (git_repo / "modified.py").write_text("x = 1\n")
+    (git_repo / "sub").mkdir()
+    (git_repo / "sub" / "example.py").write_text("x = 1\n")
+    git("add", "sub/example.py")
+
+    with chdir(git_repo / "sub"):
+        result = get_changed_filenames("main", [])
+
+    assert result == ["example.py"]
+
+
+def test_get_changed_filenames_bad_ref(git_repo):
+    with pytest.raises(subprocess.CalledProcessError):
+        get_changed_filenames("nonexistent", [])
+
+
+def test_overlapped_io_read(tmp_path):
+    paths = [tmp_path / f"example{i}.py" for i in range(10)]
+    for i, path in enumerate(paths):
+        path.write_bytes(b"x" * i)
+
+    with OverlappedIO(budget=4, readers=2) as overlapped_io:
+        result = list(overlapped_io.read(str(p) for p in paths))
+
+    assert result == [(str(p), b"x" * i) for i, p in enumerate(paths)]
+
+
+def test_overlapped_io_read_within_budget(tmp_path):
+    paths = [tmp_path / f"example{i}.py" for i in range(10)]
+    for path in paths:
+        path.write_bytes(b"x" * 10)
+
+    with OverlappedIO(budget=15, readers=4) as overlapped_io:
+        for _ in overlapped_io.read(str(p) for p in paths):
+            # Reads are scheduled only while under budget, up to two per
+            # reader, though those in progress may finish over it.
+            assert overlapped_io._buffered <= 2 * 4 * 10
+
+
+def test_overlapped_io_read_error(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_bytes(b"x")
+
+    with OverlappedIO(budget=100) as overlapped_io:
+        result = overlapped_io.read([str(path), str(tmp_path / "missing.py")])
+        assert next(result) == (str(path), b"x")
+        with pytest.raises(FileNotFoundError):
+            next(result)
+
+
+def test_overlapped_io_write(tmp_path):
+    paths = [tmp_path / f"example{i}.py" for i in range(3)]
+
+    with OverlappedIO(budget=100) as overlapped_io:
+        for i, path in enumerate(paths):
+            overlapped_io.write(str(path), b"x" * i)
+
+    assert [p.read_bytes() for p in paths] == [b"", b"x", b"xx"]
+
+
+def test_overlapped_io_write_error(tmp_path):
+    with pytest.raises(FileNotFoundError), OverlappedIO(budget=100) as overlapped_io:
+        overlapped_io.write(str(tmp_path / "missing" / "example.py"), b"x")
+
+
+def test_overlapped_io_read_repeated(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_bytes(b"a")
+    other = tmp_path / "other.py"
+    other.write_bytes(b"o")
+
+    with OverlappedIO(budget=100) as overlapped_io:
+        result = []
+        for filename, contents in overlapped_io.read(
+            [str(path), str(other), str(path)]
+        ):
+            result.append((filename, contents))
+            overlapped_io.write(filename, contents + b"!")
+
+    assert result == [
+        (str(path), b"a"),
+        (str(other), b"o"),
+        (str(path), b"a!"),
+    ]
+    assert path.read_bytes() == b"a!!"
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
 import io
+import json
 import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from textwrap import dedent
 from unittest import mock
 
 import pytest
-from tokenize_rt import UNIMPORTANT_WS, src_to_tokens
+from tokenize_rt import UNIMPORTANT_WS, Offset, Token, src_to_tokens, tokens_to_src
 
 from django_upgrade import __main__  # noqa: F401
-from django_upgrade.main import fixup_dedent_tokens, get_target_version, main
-from django_upgrade.tokens import DEDENT
+from django_upgrade.ast import ast_parse
+from django_upgrade.cache import Cache
+from django_upgrade.data import Callbacks, Settings, TextEdit
+from django_upgrade.main import (
+    apply_callbacks,
+    apply_callbacks_by_region,
+    apply_fixers,
+    apply_fixers_bytes,
+    apply_fixers_until_stable,
+    apply_text_edit,
+    batched,
+    changed_lines,
+    drop_conflicting_replacements,
+    find_offset_index,
+    fixup_dedent_tokens,
+    get_target_version,
+    main,
+    map_in_order,
+    unified_diff,
+)
+from django_upgrade.tokens import DEDENT, GapBuffer
 from tests.compat import chdir
 
 
@@ -155,6 +176,130 @@ def test_main_stdin_with_changes(capsys):
     assert err == ""
 
 
+def test_main_stdin_protocol_jsonl(capsys):
+    records = [
+        {
+            "path": "example.py",
+            "source": "from django.core.paginator import QuerySetPaginator\n",
+        },
+        {"path": "other.py", "source": 'print("hi")\n'},
+        {
+            "path": "settings.py",
+            "source": 'ADMINS = [("Admin", "admin@example.com")]\n',
+        },
+    ]
+    stdin = io.TextIOWrapper(
+        io.BytesIO("".join(json.dumps(r) + "\n" for r in records).encode()), "UTF-8"
+    )
+
+    with mock.patch.object(sys, "stdin", stdin):
+        result = main(["--stdin-protocol", "jsonl", "--target-version", "6.0"])
+
+    assert result == 0
+    out, err = capsys.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {
+            "path": "example.py",
+            "source": "from django.core.paginator import Paginator\n",
+            "changed": True,
+            "fixers": ["queryset_paginator"],
+        },
+        {
+            "path": "other.py",
+            "source": 'print("hi")\n',
+            "changed": False,
+            "fixers": [],
+        },
+        {
+            "path": "settings.py",
+            "source": 'ADMINS = ["admin@example.com"]\n',
+            "changed": True,
+            "fixers": ["settings_admins_managers"],
+        },
+    ]
+    assert err == ""
+
+
+def test_main_stdin_protocol_jsonl_check_until_stable(capsys):
+    record = {"path": "example.py", "source": UNSTABLE_CONTENTS}
+    stdin = io.TextIOWrapper(io.BytesIO(json.dumps(record).encode()), "UTF-8")
+
+    with mock.patch.object(sys, "stdin", stdin):
+        result = main(
+            [
+                "--stdin-protocol",
+                "jsonl",
+                "--target-version",
+                "6.1",
+                "--until-stable",
+                "--check",
+            ]
+        )
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    response = json.loads(out)
+    assert response["source"] == STABLE_CONTENTS
+    assert response["fixers"] == ["mail_api_kwargs", "mail_fail_silently"]
+
+
+def test_main_stdin_protocol_jsonl_invalid(capsys):
+    stdin = io.TextIOWrapper(
+        io.BytesIO(b'{"path": "example.py"}\n\n[]\n{"path": "a.py", "source": ""}\n'),
+        "UTF-8",
+    )
+
+    with mock.patch.object(sys, "stdin", stdin):
+        result = main(["--stdin-protocol", "jsonl"])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {"error": "Invalid record on line 1: 'source'"},
+        {
+            "error": (
+                "Invalid record on line 3: list indices must be integers or "
+                "slices, not str"
+            )
+        },
+        {"path": "a.py", "source": "", "changed": False, "fixers": []},
+    ]
+
+
+def test_main_stdin_protocol_filenames(capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--stdin-protocol", "jsonl", "example.py"])
+
+    assert excinfo.value.code == 2
+    out, err = capsys.readouterr()
+    assert (
+        "error: argument --stdin-protocol: not allowed with filenames or "
+        "--changed-since\n"
+    ) in err
+
+
+@pytest.mark.parametrize(
+    "args,option",
+    [
+        (["--exclude", "app"], "--exclude"),
+        (["--extend-exclude", "app"], "--extend-exclude"),
+        (["--diff"], "--diff"),
+        (["--exit-zero-even-if-changed"], "--exit-zero-even-if-changed"),
+        (["--jobs", "1"], "--jobs"),
+        (["--read-ahead-bytes", "0"], "--read-ahead-bytes"),
+        (["--cache-dir", "cache"], "--cache-dir"),
+        (["--no-cache"], "--no-cache"),
+    ],
+)
+def test_main_stdin_protocol_file_options(capsys, args, option):
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--stdin-protocol", "jsonl", *args])
+
+    assert excinfo.value.code == 2
+    out, err = capsys.readouterr()
+    assert f"error: argument --stdin-protocol: not allowed with {option}\n" in err
+
+
 @pytest.mark.parametrize(
     "string,expected",
     [
@@ -241,6 +386,329 @@ dependencies = [
     assert err == ""
 
 
+def test_apply_fixers_no_triggers():
+    settings = Settings(target_version=(5, 2))
+
+    with mock.patch("django_upgrade.main.ast_parse") as mock_ast_parse:
+        result = apply_fixers('print("hi")\n', settings, "example.py")
+
+    assert result == 'print("hi")\n'
+    mock_ast_parse.assert_not_called()
+
+
+def test_apply_fixers_regions():
+    settings = Settings(target_version=(3, 1))
+    contents = dedent(
+        """\
+        from django.core.paginator import QuerySetPaginator
+
+        # Untouched, including the unusual spacing:
+        x   =  [
+          1,2 ]
+
+
+        @decorator
+        class Pages(QuerySetPaginator):
+            pass
+            # trailing comment
+
+        y = QuerySetPaginator ; z = QuerySetPaginator
+        """
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == contents.replace("QuerySetPaginator", "Paginator")
+
+
+def test_apply_fixers_whole_file():
+    settings = Settings(target_version=(4, 1))
+    contents = dedent(
+        """\
+        from django.utils.timezone import utc
+
+        x = 1
+
+        calculate_some_datetime(utc)
+        """
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == dedent(
+        """\
+        import datetime as dt
+
+        x = 1
+
+        calculate_some_datetime(dt.timezone.utc)
+        """
+    )
+
+
+def test_apply_fixers_gap_buffer():
+    settings = Settings(target_version=(4, 1))
+    contents = "from django.utils.timezone import utc\n\ncalculate(utc, utc)\n"
+
+    with mock.patch("django_upgrade.main.GAP_BUFFER_THRESHOLD", 0):
+        result = apply_fixers(contents, settings, "example.py")
+
+    assert result == (
+        "import datetime as dt\n\ncalculate(dt.timezone.utc, dt.timezone.utc)\n"
+    )
+
+
+FIND_ALL_CONTENTS = dedent(
+    """\
+    from django.contrib.staticfiles import finders
+
+    x = "é"; finders.find("a", all=True)
+
+    def f():
+        return finders.find("b", all=False)
+    """
+)
+
+
+def test_apply_fixers_carriage_return_line_endings():
+    settings = Settings(target_version=(5, 2))
+    contents = "from django.core.paginator import QuerySetPaginator\rx = 1\r"
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    # Token positions don't match node positions, so token functions are
+    # skipped.
+    assert result == contents
+
+
+def test_apply_fixers_carriage_return_in_statement():
+    settings = Settings(target_version=(5, 2))
+    contents = (
+        "from django.contrib.staticfiles import finders\n"
+        "from django.core.paginator import QuerySetPaginator\n"
+        "x = f(QuerySetPaginator,\rfinders.find(1, all=True))\n"
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    # The import isn't renamed without the later use, and text edits apply.
+    assert result == contents.replace("all=", "find_all=")
+
+
+def test_apply_fixers_byte_order_mark_whole_file():
+    settings = Settings(target_version=(5, 2))
+    contents = "\ufefffrom django.utils.timezone import utc\n\nx = utc\n"
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == "\ufeffimport datetime as dt\n\nx = dt.timezone.utc\n"
+
+
+def test_apply_fixers_byte_order_mark_region():
+    settings = Settings(target_version=(5, 2))
+    contents = (
+        "\ufefffrom django.core.paginator import QuerySetPaginator; "
+        "from django.contrib.staticfiles import finders; "
+        "finders.find(QuerySetPaginator, all=True)\n"
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == (
+        "\ufefffrom django.core.paginator import Paginator; "
+        "from django.contrib.staticfiles import finders; "
+        "finders.find(Paginator, find_all=True)\n"
+    )
+
+
+def test_apply_fixers_byte_order_mark_text_edits():
+    settings = Settings(target_version=(5, 2))
+    contents = (
+        "\ufefffrom django.contrib.staticfiles import finders; "
+        "finders.find('x', all=True)\n"
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == contents.replace("all=", "find_all=")
+
+
+def test_apply_fixers_byte_order_mark_unchanged():
+    settings = Settings(target_version=(5, 2))
+    contents = "\ufefffrom django.contrib.staticfiles import finders\n".encode()
+
+    result = apply_fixers_bytes(contents, settings, "example.py")
+
+    assert result is contents
+
+
+def test_apply_fixers_crlf_line_endings():
+    settings = Settings(target_version=(5, 2))
+    contents = "from django.core.paginator import QuerySetPaginator\r\nx = 1\r\n"
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == "from django.core.paginator import Paginator\r\nx = 1\r\n"
+
+
+def test_apply_fixers_text_edits():
+    settings = Settings(target_version=(5, 2))
+
+    with mock.patch(
+        "django_upgrade.main.src_to_tokens", side_effect=src_to_tokens
+    ) as mock_src_to_tokens:
+        result = apply_fixers(FIND_ALL_CONTENTS, settings, "example.py")
+
+    assert result == FIND_ALL_CONTENTS.replace("all=", "find_all=")
+    mock_src_to_tokens.assert_not_called()
+
+
+def test_apply_fixers_text_edits_carriage_return_in_comment():
+    settings = Settings(target_version=(5, 2))
+    contents = FIND_ALL_CONTENTS.replace("\n\n", "\n# a\rb\n", 1)
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == contents.replace("all=", "find_all=")
+
+
+def test_apply_fixers_text_edits_carriage_return_line_endings():
+    settings = Settings(target_version=(5, 2))
+    contents = FIND_ALL_CONTENTS.replace("\n", "\r")
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == contents.replace("all=", "find_all=")
+
+
+def test_apply_fixers_text_edits_in_region():
+    settings = Settings(target_version=(5, 2))
+    contents = dedent(
+        """\
+        from django.contrib.staticfiles import finders
+
+        def view(request):
+            finders.find(request.META["HTTP_ACCEPT"], all=True)
+        """
+    )
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == dedent(
+        """\
+        from django.contrib.staticfiles import finders
+
+        def view(request):
+            finders.find(request.headers["accept"], find_all=True)
+        """
+    )
+
+
+def test_apply_fixers_text_edits_whole_file():
+    settings = Settings(target_version=(5, 2))
+    contents = FIND_ALL_CONTENTS.replace(
+        "from django.contrib.staticfiles import finders\n",
+        "from django.contrib.staticfiles import finders\n"
+        "from django.utils.timezone import utc\n",
+    ).replace('"a"', "utc")
+
+    result = apply_fixers(contents, settings, "example.py")
+
+    assert result == dedent(
+        """\
+        import datetime as dt
+        from django.contrib.staticfiles import finders
+
+        x = "é"; finders.find(dt.timezone.utc, find_all=True)
+
+        def f():
+            return finders.find("b", find_all=False)
+        """
+    )
+
+
+def test_apply_fixers_bytes_unchanged():
+    settings = Settings(target_version=(5, 2))
+    contents = FIND_ALL_CONTENTS.replace("all=", "find_all=").encode()
+
+    assert apply_fixers_bytes(contents, settings, "example.py") is contents
+
+
+def test_apply_fixers_bytes_callbacks_unchanged():
+    settings = Settings(target_version=(4, 2))
+    contents = dedent(
+        """\
+        import django
+
+        if x:
+            pass
+        elif django.VERSION >= (3, 2):
+            pass
+        """
+    ).encode()
+
+    assert apply_fixers_bytes(contents, settings, "example.py") is contents
+
+
+def test_apply_fixers_bytes_text_edits():
+    settings = Settings(target_version=(5, 2))
+
+    result = apply_fixers_bytes(FIND_ALL_CONTENTS.encode(), settings, "example.py")
+
+    assert result == FIND_ALL_CONTENTS.replace("all=", "find_all=").encode()
+
+
+def test_drop_conflicting_replacements():
+    assert drop_conflicting_replacements(
+        [
+            (5, 8, b"b", "f2"),
+            (0, 2, b"a", "f1"),
+            (6, 9, b"c", "f3"),
+            (8, 8, b"d", "f4"),
+            (5, 5, b"e", "f5"),
+        ]
+    ) == ([(0, 2, b"a"), (5, 5, b"e"), (5, 8, b"b"), (8, 8, b"d")], {"f2", "f3"})
+
+
+def test_drop_conflicting_replacements_same_insertion_point():
+    assert drop_conflicting_replacements([(3, 3, b"a", "f1"), (3, 3, b"b", "f2")]) == (
+        [(3, 3, b"a")],
+        {"f1", "f2"},
+    )
+
+
+def test_drop_conflicting_replacements_duplicates():
+    assert drop_conflicting_replacements([(3, 5, b"a", "f1"), (3, 5, b"a", "f2")]) == (
+        [(3, 5, b"a")],
+        set(),
+    )
+
+
+def test_apply_callbacks_by_region_conflicting_edits(capsys):
+    contents = b"f(all=True)\n"
+    callbacks = Callbacks()
+    callbacks.edits[TextEdit(Offset(1, 2), Offset(1, 5), "find_all")] = "fixer_a"
+    callbacks.edits[TextEdit(Offset(1, 4), Offset(1, 10), "l=False")] = "fixer_b"
+
+    result = apply_callbacks_by_region(
+        contents, ast_parse(contents), callbacks, "example.py"
+    )
+
+    assert result == b"f(find_all=True)\n"
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "example.py: skipped overlapping changes from fixer_a, fixer_b\n"
+
+
+def test_apply_text_edit():
+    tokens = src_to_tokens("f(all=True)\n")
+    edit = TextEdit(Offset(1, 2), Offset(1, 5), "find_all")
+
+    apply_text_edit(tokens, 2, edit=edit)
+
+    assert tokens_to_src(tokens) == "f(find_all=True)\n"
+
+
 def test_fixup_dedent_tokens():
     code = dedent(
         """\
@@ -409,3 +877,687 @@ def test_main_list_fixers_filename(tmp_path, capsys):
     assert excinfo.value.code == 0
     # No change
     assert path.read_text() == source
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_jobs(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(6)]
+    for i, path in enumerate(paths):
+        if i % 2:
+            path.write_text("from django.core.paginator import QuerySetPaginator\n")
+        else:
+            path.write_text('print("hi")\n')
+
+    result = main(["--jobs", "3", *(str(p) for p in paths)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "".join(f"Rewriting {p}\n" for p in paths[1::2])
+    for path in paths[1::2]:
+        assert path.read_text() == "from django.core.paginator import Paginator\n"
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_jobs_check(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(4)]
+    for path in paths:
+        path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--jobs", "2", "--check", *(str(p) for p in paths)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "".join(f"Would rewrite {p}\n" for p in paths)
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_jobs_no_changes(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(2)]
+    for path in paths:
+        path.write_text('print("hi")\n')
+
+    result = main(["--jobs", "2", *(str(p) for p in paths)])
+
+    assert result == 0
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == ""
+
+
+def test_main_jobs_few_files(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(3)]
+    for path in paths:
+        path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    with mock.patch("concurrent.futures.ProcessPoolExecutor") as mock_executor:
+        result = main(["--jobs", "8", "--check", *(str(p) for p in paths)])
+
+    assert result == 1
+    mock_executor.assert_not_called()
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "".join(f"Would rewrite {p}\n" for p in paths)
+
+
+def test_init_worker_imports_fixers():
+    code = (
+        "import sys\n"
+        "from django_upgrade.data import Settings\n"
+        "from django_upgrade.main import _init_worker\n"
+        "_init_worker(Settings(target_version=(2, 2), "
+        "only_fixers={'queryset_paginator', 'use_l10n'}))\n"
+        "print(sorted(m for m in sys.modules "
+        "if m.startswith('django_upgrade.fixers.')))"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout == "['django_upgrade.fixers.queryset_paginator']\n"
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1", "x"])
+def test_main_jobs_invalid(capsys, jobs):
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--jobs", jobs, "example.py"])
+
+    assert excinfo.value.code == 2
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert f"error: argument --jobs/-j: Must be a positive integer: {jobs!r}\n" in err
+
+
+@pytest.mark.parametrize("read_ahead_bytes", ["0", "1", "33554432"])
+def test_main_read_ahead(tmp_path, capsys, read_ahead_bytes):
+    paths = [tmp_path / f"example{i}.py" for i in range(6)]
+    for i, path in enumerate(paths):
+        if i % 2:
+            path.write_text("from django.core.paginator import QuerySetPaginator\n")
+        else:
+            path.write_text('print("hi")\n')
+
+    result = main(
+        [
+            "--jobs",
+            "1",
+            "--read-ahead-bytes",
+            read_ahead_bytes,
+            *(str(p) for p in paths),
+        ]
+    )
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "".join(f"Rewriting {p}\n" for p in paths[1::2])
+    for path in paths[1::2]:
+        assert path.read_text() == "from django.core.paginator import Paginator\n"
+
+
+def test_main_read_ahead_missing_file(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    with pytest.raises(FileNotFoundError):
+        main(["--jobs", "1", str(path), str(tmp_path / "missing.py")])
+
+    out, err = capsys.readouterr()
+    assert err == f"Rewriting {path}\n"
+    assert path.read_text() == "from django.core.paginator import Paginator\n"
+
+
+@pytest.mark.parametrize("read_ahead_bytes", ["-1", "x"])
+def test_main_read_ahead_invalid(capsys, read_ahead_bytes):
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--read-ahead-bytes", read_ahead_bytes, "example.py"])
+
+    assert excinfo.value.code == 2
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert (
+        "error: argument --read-ahead-bytes: Must be a non-negative integer: "
+        f"{read_ahead_bytes!r}\n"
+    ) in err
+
+
+QSP_DIFF = """\
+--- {name}
++++ {name}
+@@ -1 +1 @@
+-from django.core.paginator import QuerySetPaginator
++from django.core.paginator import Paginator
+"""
+
+
+def test_main_diff(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+    other = tmp_path / "other.py"
+    other.write_text('print("hi")\n')
+
+    result = main(["--diff", str(path), str(other)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == QSP_DIFF.format(name=path)
+    assert err == ""
+    assert path.read_text() == "from django.core.paginator import QuerySetPaginator\n"
+
+
+def test_main_diff_exit_zero_even_if_changed(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--diff", "--exit-zero-even-if-changed", str(path)])
+
+    assert result == 0
+    out, err = capsys.readouterr()
+    assert out == QSP_DIFF.format(name=path)
+
+
+def test_main_diff_check(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--diff", "--check", "--exit-zero-even-if-changed", str(path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == QSP_DIFF.format(name=path)
+    assert err == f"Would rewrite {path}\n"
+
+
+def test_main_diff_stdin(capsys):
+    input_ = "from django.core.paginator import QuerySetPaginator\n"
+    stdin = io.TextIOWrapper(io.BytesIO(input_.encode()), "UTF-8")
+
+    with mock.patch.object(sys, "stdin", stdin):
+        result = main(["--diff", "-"])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == QSP_DIFF.format(name="stdin")
+
+
+def test_main_diff_stdin_no_changes(capsys):
+    stdin = io.TextIOWrapper(io.BytesIO(b'print("hi")\n'), "UTF-8")
+
+    with mock.patch.object(sys, "stdin", stdin):
+        result = main(["--diff", "-"])
+
+    assert result == 0
+    out, err = capsys.readouterr()
+    assert out == ""
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_main_diff_jobs(tmp_path, capsys, jobs):
+    paths = [tmp_path / f"example{i}.py" for i in range(10)]
+    for i, path in enumerate(paths):
+        if i % 3:
+            path.write_text("from django.core.paginator import QuerySetPaginator\n")
+        else:
+            path.write_text('print("hi")\n')
+
+    result = main(["--diff", "--jobs", jobs, *(str(p) for p in paths)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    changed = [p for i, p in enumerate(paths) if i % 3]
+    assert out == "".join(QSP_DIFF.format(name=p) for p in changed)
+    assert err == ""
+    assert all(
+        p.read_text() == "from django.core.paginator import QuerySetPaginator\n"
+        for p in changed
+    )
+
+
+def test_unified_diff_no_newline_at_end_of_file():
+    result = unified_diff("example.py", b"a\nb", b"a\nc\x0cd")
+
+    assert result == dedent(
+        """\
+        --- example.py
+        +++ example.py
+        @@ -1,2 +1,2 @@
+         a
+        -b
+        \\ No newline at end of file
+        +c\x0cd
+        \\ No newline at end of file
+        """
+    )
+
+
+def test_map_in_order():
+    submitted = []
+
+    def record(item):
+        submitted.append(item)
+        return item * 2
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = map_in_order(executor, record, range(10), window=3)
+        assert next(results) == 0
+        # Only one window ahead of the first result has been submitted.
+        assert len(submitted) <= 4
+        assert list(results) == [i * 2 for i in range(1, 10)]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
+
+
+def test_main_directory(tmp_path, capsys):
+    (tmp_path / "app").mkdir()
+    path = tmp_path / "app" / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+    (tmp_path / "node_modules").mkdir()
+    excluded = tmp_path / "node_modules" / "example.py"
+    excluded.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main([str(tmp_path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == f"Rewriting {path}\n"
+    assert path.read_text() == "from django.core.paginator import Paginator\n"
+    assert excluded.read_text() == (
+        "from django.core.paginator import QuerySetPaginator\n"
+    )
+
+
+def test_main_directory_exclude(tmp_path, capsys):
+    (tmp_path / "app").mkdir()
+    path = tmp_path / "app" / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+    (tmp_path / "node_modules").mkdir()
+    included = tmp_path / "node_modules" / "example.py"
+    included.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--exclude", "app", "--jobs", "1", str(tmp_path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == f"Rewriting {included}\n"
+    assert path.read_text() == "from django.core.paginator import QuerySetPaginator\n"
+
+
+def test_main_directory_extend_exclude(tmp_path, capsys):
+    (tmp_path / "app").mkdir()
+    path = tmp_path / "app" / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "example.py").write_text(
+        "from django.core.paginator import QuerySetPaginator\n"
+    )
+
+    result = main(["--extend-exclude", "app", str(tmp_path)])
+
+    assert result == 0
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == ""
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_directory_jobs(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(3)]
+    for path in paths:
+        path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--jobs", "2", "--check", str(tmp_path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "".join(f"Would rewrite {p}\n" for p in paths)
+
+
+def test_main_cache(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "example.py"
+    path.write_text('print("hi")\n')
+
+    result = main(["--cache-dir", str(cache_dir), str(path)])
+
+    assert result == 0
+    assert len(list(cache_dir.glob("*/*"))) == 1
+
+    with mock.patch("django_upgrade.main.apply_fixers") as mock_apply_fixers:
+        result = main(["--cache-dir", str(cache_dir), str(path)])
+
+    assert result == 0
+    mock_apply_fixers.assert_not_called()
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == ""
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_cache_jobs_counts_added(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    paths = [tmp_path / f"example{i}.py" for i in range(10)]
+    for i, path in enumerate(paths):
+        path.write_text(f"print({i})\n")
+
+    with mock.patch.object(Cache, "prune", autospec=True) as mock_prune:
+        result = main(["--jobs", "2", "--cache-dir", str(cache_dir), *map(str, paths)])
+
+    assert result == 0
+    assert len(list(cache_dir.glob("*/*"))) == 10
+    # Entries added in worker processes count towards pruning.
+    (cache,) = mock_prune.call_args.args
+    assert cache.added == 10
+
+
+def test_main_cache_changed_not_cached(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--check", "--cache-dir", str(cache_dir), str(path)])
+
+    assert result == 1
+    assert not cache_dir.exists()
+
+
+def test_main_cache_stdin(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    for _ in range(2):
+        stdin = io.TextIOWrapper(io.BytesIO(b'print("hi")\n'), "UTF-8")
+        with mock.patch.object(sys, "stdin", stdin):
+            result = main(["--cache-dir", str(cache_dir), "-"])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == 'print("hi")\n'
+        assert err == ""
+
+
+def test_main_no_cache(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "example.py"
+    path.write_text('print("hi")\n')
+
+    result = main(["--no-cache", "--cache-dir", str(cache_dir), str(path)])
+
+    assert result == 0
+    assert not cache_dir.exists()
+
+
+def test_main_single_file_imports(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_text('print("hi")\n')
+    modules = [
+        "concurrent.futures",
+        "difflib",
+        "django_upgrade.cache",
+        "django_upgrade.daemon",
+        "multiprocessing",
+        "subprocess",
+    ]
+    code = (
+        "import sys\n"
+        "from django_upgrade.main import main\n"
+        f"main(['--no-cache', {str(path)!r}])\n"
+        f"print([m for m in {modules!r} if m in sys.modules])\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    # Modules for other kinds of run aren't imported.
+    assert result.stdout == "[]\n"
+
+
+def test_main_changed_since(tmp_path, capsys):
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=A", "-c", "user.email=a@example.com", *args],
+            check=True,
+            capture_output=True,
+        )
+
+    with chdir(tmp_path):
+        git("init", "--initial-branch", "main")
+        unchanged = tmp_path / "unchanged.py"
+        unchanged.write_text("from django.core.paginator import QuerySetPaginator\n")
+        git("add", ".")
+        git("commit", "--message", "Initial")
+        (tmp_path / "changed.py").write_text(
+            "from django.core.paginator import QuerySetPaginator\n"
+        )
+
+        result = main(["--changed-since", "main"])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "Rewriting changed.py\n"
+    assert unchanged.read_text() == (
+        "from django.core.paginator import QuerySetPaginator\n"
+    )
+
+
+def test_main_changed_since_bad_ref(tmp_path, capsys):
+    with chdir(tmp_path):
+        subprocess.run(["git", "init"], check=True, capture_output=True)
+
+        with pytest.raises(SystemExit) as excinfo:
+            main(["--changed-since", "nonexistent"])
+
+    assert excinfo.value.code == 2
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert "error: argument --changed-since: fatal: " in err
+
+
+UNSTABLE_CONTENTS = (
+    "from django.core.mail import send_mail\n"
+    'send_mail("S", "M", "f@example.com", ["t@example.com"], True, fail_silently=False)\n'
+)
+STABLE_CONTENTS = (
+    "from django.core.mail import send_mail\n"
+    'send_mail("S", "M", "f@example.com", ["t@example.com"], fail_silently=True)\n'
+)
+
+
+def test_main_until_stable(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text(UNSTABLE_CONTENTS)
+
+    result = main(["--target-version", "6.1", "--until-stable", str(path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == f"Rewriting {path} (2 passes)\n"
+    assert path.read_text() == STABLE_CONTENTS
+
+
+def test_main_until_stable_one_pass(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text("from django.core.paginator import QuerySetPaginator\n")
+
+    result = main(["--until-stable", str(path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert err == f"Rewriting {path} (1 pass)\n"
+    assert path.read_text() == "from django.core.paginator import Paginator\n"
+
+
+def test_main_until_stable_check(tmp_path, capsys):
+    path = tmp_path / "example.py"
+    path.write_text(UNSTABLE_CONTENTS)
+
+    result = main(["--target-version", "6.1", "--until-stable", "--check", str(path)])
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert err == f"Would rewrite {path} (2 passes)\n"
+    assert path.read_text() == UNSTABLE_CONTENTS
+
+
+@mock.patch("django_upgrade.main.MIN_FILES_FOR_POOL", 2)
+def test_main_until_stable_jobs(tmp_path, capsys):
+    paths = [tmp_path / f"example{i}.py" for i in range(2)]
+    for path in paths:
+        path.write_text(UNSTABLE_CONTENTS)
+
+    result = main(
+        ["--target-version", "6.1", "--until-stable", "--jobs", "2", *map(str, paths)]
+    )
+
+    assert result == 1
+    out, err = capsys.readouterr()
+    assert err == "".join(f"Rewriting {p} (2 passes)\n" for p in paths)
+    assert all(p.read_text() == STABLE_CONTENTS for p in paths)
+
+
+def test_apply_fixers_until_stable_max_passes():
+    settings = Settings(target_version=(6, 1))
+
+    result = apply_fixers_until_stable(
+        UNSTABLE_CONTENTS.encode(), settings, "example.py", max_passes=1
+    )
+
+    assert result == (
+        apply_fixers(UNSTABLE_CONTENTS, settings, "example.py").encode(),
+        1,
+    )
+
+
+def test_apply_fixers_until_stable_reruns_triggered_fixers():
+    settings = Settings(target_version=(6, 1))
+
+    with mock.patch(
+        "django_upgrade.main.apply_fixers_bytes", wraps=apply_fixers_bytes
+    ) as mock_apply_fixers:
+        result = apply_fixers_until_stable(
+            UNSTABLE_CONTENTS.encode(), settings, "example.py"
+        )
+
+    assert result == (STABLE_CONTENTS.encode(), 2)
+    assert len(mock_apply_fixers.mock_calls) == 3
+    rerun_settings = mock_apply_fixers.mock_calls[1].args[1]
+    assert "mail_api_kwargs" in rerun_settings.enabled_fixers
+    assert "queryset_paginator" not in rerun_settings.enabled_fixers
+
+
+def test_apply_fixers_until_stable_reuses_rerun_settings():
+    settings = Settings(target_version=(6, 1))
+
+    with mock.patch(
+        "django_upgrade.main.apply_fixers_bytes", wraps=apply_fixers_bytes
+    ) as mock_apply_fixers:
+        apply_fixers_until_stable(UNSTABLE_CONTENTS.encode(), settings, "a.py")
+        apply_fixers_until_stable(UNSTABLE_CONTENTS.encode(), settings, "b.py")
+
+    pass_settings = [call.args[1] for call in mock_apply_fixers.mock_calls]
+    assert len(pass_settings) == 6
+    assert pass_settings[0] is pass_settings[3] is settings
+    assert pass_settings[1] is pass_settings[4]
+    assert list(settings.rerun_settings.values()) == [pass_settings[1]]
+
+
+def test_changed_lines():
+    result = changed_lines(b"a\nb\nc\n", b"a\nB\nc\nd\n")
+
+    assert result == b"b\nB\nd\n"
+
+
+def test_changed_lines_large_file():
+    # Changes at both ends of a large file with many repeated lines, which a
+    # line diff takes quadratic time over.
+    lines = [b"def f(request):\n", b"    return None\n", b"\n", b"\n"] * 5_000
+    old_contents = b"".join(lines)
+    new_contents = b"".join([b"y = 0\n", *lines[1:-1], b"y = 1\n"])
+
+    result = changed_lines(old_contents, new_contents)
+
+    assert result == b"def f(request):\n\ny = 0\ny = 1\n"
+
+
+def test_find_offset_index():
+    tokens = src_to_tokens("if x:\n    y = 1\nz = 2\n")
+    fixup_dedent_tokens(tokens)
+
+    assert tokens[find_offset_index(tokens, Offset(2, 8))].src == "1"
+    assert tokens[find_offset_index(tokens, Offset(3, 0))].src == "z"
+    assert find_offset_index(tokens, Offset(2, 3)) is None
+    assert find_offset_index(tokens, Offset(9, 0)) is None
+
+
+def test_apply_callbacks():
+    tokens = src_to_tokens("a = b\n")
+    calls = []
+
+    def upper(tokens, i):
+        calls.append(tokens[i].src)
+        tokens.insert(i + 1, Token("CODE", "!"))
+
+    new_tokens = apply_callbacks(tokens, {Offset(1, 0): [upper], Offset(1, 4): [upper]})
+
+    assert calls == ["b", "a"]
+    assert tokens_to_src(new_tokens) == "a! = b!\n"
+
+
+def test_apply_callbacks_gap_buffer():
+    tokens = src_to_tokens("a = b\nc = d\n")
+
+    def append(tokens, i):
+        tokens.insert(i + 1, Token("CODE", "!"))
+
+    def erase(tokens, i):
+        del tokens[i : i + 2]
+
+    with mock.patch("django_upgrade.main.GAP_BUFFER_THRESHOLD", 0):
+        new_tokens = apply_callbacks(
+            tokens,
+            {Offset(1, 0): [append], Offset(1, 4): [erase], Offset(2, 4): [append]},
+        )
+
+    assert isinstance(new_tokens, GapBuffer)
+    assert tokens_to_src(new_tokens) == "a! = c = d!\n"
+
+
+def test_apply_callbacks_earlier_tokens_changed():
+    tokens = src_to_tokens("a = b\nc\n")
+
+    def add_comment(tokens, i):
+        tokens.insert(0, Token("CODE", "# x\n"))
+
+    def mark(tokens, i):
+        tokens[i] = tokens[i]._replace(src="B")
+
+    new_tokens = apply_callbacks(
+        tokens, {Offset(1, 4): [mark], Offset(2, 0): [add_comment]}
+    )
+
+    assert tokens_to_src(new_tokens) == "# x\na = B\nc\n"
+
+
+def test_apply_callbacks_earlier_token_removed():
+    tokens = src_to_tokens("a = b\n")
+    calls = []
+
+    def remove_a(tokens, i):
+        calls.append("remove_a")
+        del tokens[0]
+
+    def never(tokens, i):  # pragma: no cover
+        calls.append("never")
+
+    apply_callbacks(tokens, {Offset(1, 0): [never], Offset(1, 4): [remove_a]})
+
+    assert calls == ["remove_a"]
@@ -6,9 +6,16 @@ import pytest
 from tokenize_rt import Token, src_to_tokens, tokens_to_src
 
 from django_upgrade.tokens import (
+    MIN_RECORDED_PAIR,
+    Block,
+    GapBuffer,
+    TokenList,
     erase_def,
     find_call_arg,
+    find_closing,
     find_first_token,
+    find_last_token,
+    find_line_start,
     parse_call_args,
     remove_call_arg,
     replace_argument_names,
@@ -32,10 +39,220 @@ def test_str_repr_matching(text, match_quotes, expected):
     assert str_repr_matching(text, match_quotes=match_quotes) == expected
 
 
+class TestGapBuffer:
+    def make(self, size: int = 6) -> tuple[list[Token], GapBuffer]:
+        tokens = [Token("CODE", str(n)) for n in range(size)]
+        return tokens, GapBuffer(tokens)
+
+    def test_empty(self):
+        buffer = GapBuffer()
+        assert len(buffer) == 0
+        assert list(buffer) == []
+
+    def test_getitem(self):
+        tokens, buffer = self.make()
+        buffer.insert(3, Token("CODE", "x"))
+        tokens.insert(3, Token("CODE", "x"))
+        assert [buffer[i] for i in range(-7, 7)] == [tokens[i] for i in range(-7, 7)]
+
+    @pytest.mark.parametrize("index", (7, -8))
+    def test_getitem_out_of_range(self, index):
+        _, buffer = self.make()
+        buffer.insert(3, Token("CODE", "x"))
+        with pytest.raises(IndexError):
+            buffer[index]
+
+    def test_getitem_slice(self):
+        tokens, buffer = self.make()
+        assert buffer[1:4] == tokens[1:4]
+        assert buffer[4:1] == []
+        assert buffer[-2:] == tokens[-2:]
+        assert list(buffer) == tokens
+
+    def test_getitem_slice_step(self):
+        _, buffer = self.make()
+        with pytest.raises(ValueError) as excinfo:
+            buffer[::2]
+        assert excinfo.value.args[0] == "GapBuffer slices cannot have a step."
+
+    def test_setitem(self):
+        tokens, buffer = self.make()
+        buffer.insert(3, Token("CODE", "x"))
+        tokens.insert(3, Token("CODE", "x"))
+        for i in (0, 4, -1, -6):
+            buffer[i] = tokens[i] = Token("CODE", f"y{i}")
+        assert list(buffer) == tokens
+
+    def test_setitem_slice(self):
+        tokens, buffer = self.make()
+        new = [Token("CODE", "x"), Token("CODE", "y")]
+        buffer[1:4] = new
+        tokens[1:4] = new
+        assert list(buffer) == tokens
+        buffer[0:0] = new
+        tokens[0:0] = new
+        assert list(buffer) == tokens
+
+    def test_delitem(self):
+        tokens, buffer = self.make()
+        buffer.insert(3, Token("CODE", "x"))
+        tokens.insert(3, Token("CODE", "x"))
+        for i in (5, 0, -1, 2):
+            del buffer[i]
+            del tokens[i]
+            assert list(buffer) == tokens
+
+    def test_delitem_out_of_range(self):
+        _, buffer = self.make()
+        with pytest.raises(IndexError):
+            del buffer[6]
+
+    def test_delitem_slice(self):
+        tokens, buffer = self.make()
+        del buffer[4:]
+        del tokens[4:]
+        del buffer[1:2]
+        del tokens[1:2]
+        assert list(buffer) == tokens
+
+    def test_insert(self):
+        tokens, buffer = self.make()
+        for i in (6, 0, 3, -2, 100, -100):
+            buffer.insert(i, Token("CODE", f"x{i}"))
+            tokens.insert(i, Token("CODE", f"x{i}"))
+            assert list(buffer) == tokens
+        assert len(buffer) == len(tokens)
+
+    def test_tokens_to_src(self):
+        tokens = src_to_tokens("a = b\n")
+        buffer = GapBuffer(tokens)
+        buffer.insert(1, Token("CODE", "!"))
+        assert tokens_to_src(buffer) == "a! = b\n"
+
+
 def tokenize_and_parse(source: str) -> tuple[list[Token], ast.Module]:
     return src_to_tokens(source), ast.parse(source)
 
 
+class TestFindLineStart:
+    source = "x = [\n    1,\n    2,\n]\ny = 3\n"
+
+    def test_list(self):
+        tokens = src_to_tokens(self.source)
+        assert find_line_start(tokens, 0, 5) == 0
+
+    @pytest.mark.parametrize("container", (TokenList, GapBuffer))
+    def test_index(self, container):
+        tokens = container(src_to_tokens(self.source))
+        assert find_line_start(tokens, 0, 5) == 16
+        assert tokens.line_starts is not None
+        assert find_line_start(tokens, 0, 3) == 10
+
+    def test_nearby_line(self):
+        tokens = TokenList(src_to_tokens(self.source))
+        assert find_line_start(tokens, 0, 2) == 0
+        assert tokens.line_starts is None
+
+    def test_line_without_tokens(self):
+        tokens = TokenList(src_to_tokens('x = """\n\n\n"""\ny = 1\n'))
+        assert find_line_start(tokens, 0, 3) == 0
+        assert find_line_start(tokens, 0, 5) == 6
+
+    def test_stale_entry(self):
+        tokens = TokenList(src_to_tokens(self.source))
+        assert find_line_start(tokens, 0, 5) == 16
+        tokens.insert(1, Token("CODE", "!"))
+        assert find_line_start(tokens, 0, 5) == 0
+
+    def test_find_tokens(self):
+        tokens = TokenList(src_to_tokens(self.source))
+        node = ast.parse(self.source).body[0]
+        assert isinstance(node, ast.Assign)
+        assert isinstance(node.value, ast.List)
+        assert find_first_token(tokens, 0, node=node.value) == 4
+        assert find_last_token(tokens, 0, node=node.value) == 14
+        assert find_first_token(tokens, 0, node=node.value.elts[1]) == 11
+        tokens.insert(7, Token("CODE", "!"))
+        assert find_last_token(tokens, 0, node=node.value) == 15
+
+
+class TestFindClosing:
+    source = "f(a, [b, (c)], {d: e})\n"
+
+    def test_list(self):
+        tokens = src_to_tokens(self.source)
+        assert find_closing(tokens, 1) == 21
+        assert find_closing(tokens, 5) == 12
+        assert find_closing(tokens, 9) == 11
+
+    def test_indent(self):
+        tokens = src_to_tokens("if x:\n    if y:\n        z\nw\n")
+        assert [token.name for token in tokens[5:7]] == ["INDENT", "NAME"]
+        assert find_closing(tokens, 5) == 15
+        assert find_closing(tokens, 11) == 14
+
+    def test_records_long_pairs(self):
+        elements = ", ".join(["(x)"] * MIN_RECORDED_PAIR)
+        tokens = TokenList(src_to_tokens(f"f([{elements}])\n"))
+        end = find_closing(tokens, 1)
+        assert tokens[end].src == ")"
+        assert tokens.bracket_pairs is not None
+        assert sorted(tokens.bracket_pairs) == [1, 2]
+        assert tokens.bracket_pairs[1] == (tokens[1], end, tokens[end])
+
+    @pytest.mark.parametrize("container", (TokenList, GapBuffer))
+    def test_stale_pair(self, container):
+        elements = ", ".join(["x"] * MIN_RECORDED_PAIR)
+        tokens = container(src_to_tokens(f"f({elements})\n"))
+        end = find_closing(tokens, 1)
+        assert tokens.bracket_pairs is not None
+        tokens.insert(2, Token("CODE", "y, "))
+        assert find_closing(tokens, 1) == end + 1
+        del tokens[end - 1 :]
+        tokens.insert(end - 1, Token("OP", ")"))
+        assert find_closing(tokens, 1) == end - 1
+
+
+class TestParseCallArgs:
+    def test_nested(self):
+        tokens = src_to_tokens("f(a, [b, (c)], {d: e})\n")
+        args, end = parse_call_args(tokens, 1)
+        assert [tokens_to_src(tokens[start:stop]) for start, stop in args] == [
+            "a",
+            " [b, (c)]",
+            " {d: e}",
+        ]
+        assert end == 22
+
+    def test_empty(self):
+        tokens = src_to_tokens("f()\n")
+        assert parse_call_args(tokens, 1) == ([], 3)
+
+    def test_trailing_comment(self):
+        tokens = src_to_tokens("f(\n    a,\n    # comment\n)\n")
+        args, end = parse_call_args(tokens, 1)
+        assert [tokens_to_src(tokens[start:stop]) for start, stop in args] == [
+            "\n    a"
+        ]
+        assert tokens[end - 1].src == ")"
+
+
+class TestBlockFind:
+    def test_multi_line(self):
+        tokens = src_to_tokens("if f(a,\n  b):\n    x\n    if y:\n        z\nw\n")
+        block = Block.find(tokens, 0)
+        assert tokens[block.colon - 1].src == ")"
+        assert tokens[block.end].src == "w"
+        assert not block.line
+
+    def test_single_line(self):
+        tokens = src_to_tokens("if {a: b}: x\nw\n")
+        block = Block.find(tokens, 0)
+        assert tokens[block.colon - 1].src == "}"
+        assert tokens[block.end].src == "w"
+        assert block.line
+
+
 class TestRemoveCallArg:
     def check_transformed(self, *, before: str, arg_index: int, after: str) -> None:
         tokens, mod = tokenize_and_parse(before)